@@ -0,0 +1,100 @@
+"""
+Кеш сутностей: затримка get_user з кешем і без, а також перевірка, що
+update_user, оновлення і видалення обміну не лишають у кеші застарілих записів.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.entity_cache 2000
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from settings import Base
+from src.enum_models import SkillLevel
+from src.models import Exchange, Skill, User
+from src.repository import exchanges as repository_exchanges
+from src.repository import users as repository_users
+from src.repository.entity_cache import EntityCache, entity_cache
+from src.schemas import UserUpdate
+
+
+def check_lru_and_ttl() -> None:
+    now = [0.0]
+    cache = EntityCache(max_size=4, ttl=10, clock=lambda: now[0])
+    for user_id in range(1, 4):
+        cache.put("User", f"user{user_id}", {"id": user_id, "email": f"u{user_id}@ex.com"}, 0)
+    # 6 ключів при ліміті 4: витіснено найстаріші (обидва ключі user1)
+    assert cache.get("User", "id", 1) is None and cache.get("User", "email", "u3@ex.com") == "user3"
+    assert cache.evictions == 2
+    now[0] = 11
+    assert cache.get("User", "id", 3) is None and cache.expirations == 1
+
+
+async def check_users(session_factory, users: int) -> None:
+    async with session_factory() as db:
+        started = time.perf_counter()
+        for user_id in range(1, users + 1):
+            await repository_users.get_user(db, user_id)
+        cold = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for user_id in range(1, users + 1):
+            await repository_users.get_user(db, user_id)
+        warm = time.perf_counter() - started
+
+        assert (await repository_users.get_user_by_email(db, "u1@ex.com")).bio is None
+        await repository_users.update_user(db, 1, UserUpdate(bio="updated"))
+        assert (await repository_users.get_user(db, 1)).bio == "updated"
+        assert (await repository_users.get_user_by_email(db, "u1@ex.com")).bio == "updated"
+
+    print(f"\nget_user x{users}: БД {cold / users * 1e6:7.1f} us, кеш {warm / users * 1e6:7.1f} us")
+
+
+async def check_exchanges(session_factory) -> None:
+    async with session_factory() as db:
+        assert (await repository_exchanges.get_exchange_details(db, 1)).message == "hello there"
+        assert (await repository_exchanges.get_exchange_details(db, 1)).message == "hello there"
+
+        exchange = await db.get(Exchange, 1)
+        exchange.message = "changed message"
+        await db.commit()
+        assert (await repository_exchanges.get_exchange_details(db, 1)).message == "changed message"
+
+        await db.delete(await db.get(Exchange, 1))
+        await db.commit()
+        assert await repository_exchanges.get_exchange_details(db, 1) is None
+
+
+async def run(users: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine)
+    async with session_factory() as db:
+        await db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, users + 1)])
+        await db.execute(
+            insert(Skill),
+            [{"id": 1, "title": "Python", "description": "description", "category": "other", "level": SkillLevel.beginner}],
+        )
+        await db.execute(insert(Exchange), [{"id": 1, "sender_id": 1, "receiver_id": 2, "skill_id": 1, "message": "hello there"}])
+        await db.commit()
+
+    check_lru_and_ttl()
+    await check_users(session_factory, users)
+    await check_exchanges(session_factory)
+    print("інвалідація: update_user, оновлення та видалення обміну - без застарілих записів")
+    print("лічильники:", entity_cache.stats())
+
+    await engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [2000]))
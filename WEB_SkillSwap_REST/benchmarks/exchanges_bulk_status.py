@@ -0,0 +1,98 @@
+"""
+Зміна статусів пакетами по 1000: update_exchange_status для кожного обміну
+(як PATCH /exchanges/{id}/status у циклі) проти одного UPDATE ... RETURNING
+з update_exchange_statuses.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_bulk_status 5 1000
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from settings import Base
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Exchange, Skill, User
+from src.repository import exchanges as repository_exchanges
+
+USERS = 100
+RECEIVER = 1
+
+
+def populate(path: str, size: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, USERS + 1)])
+        db.execute(
+            insert(Skill),
+            [{"id": 1, "title": "Python", "description": "description", "category": "other", "level": SkillLevel.beginner}],
+        )
+        db.execute(
+            insert(Exchange),
+            [
+                {"id": i, "sender_id": i % (USERS - 1) + 2, "receiver_id": RECEIVER, "skill_id": 1,
+                 "message": "let's exchange", "status": ExchangeStatus.pending}
+                for i in range(1, size + 1)
+            ],
+        )
+        db.commit()
+    engine.dispose()
+
+
+def batch(rnd: random.Random, ids: list) -> dict:
+    return {exchange_id: rnd.choice((ExchangeStatus.accepted, ExchangeStatus.rejected)) for exchange_id in ids}
+
+
+async def run(batches: int, batch_size: int) -> None:
+    size = 2 * batches * batch_size
+    path = os.path.join(tempfile.mkdtemp(), "bulk_status.db")
+    populate(path, size)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(bind=engine)
+    rnd = random.Random(20)
+    ids = list(range(1, size + 1))
+    rnd.shuffle(ids)
+    one_by_one_ids, bulk_ids = ids[: size // 2], ids[size // 2 :]
+
+    started = time.perf_counter()
+    for start in range(0, len(one_by_one_ids), batch_size):
+        async with session_factory() as db:
+            for exchange_id, status in batch(rnd, one_by_one_ids[start : start + batch_size]).items():
+                await repository_exchanges.update_exchange_status(db, exchange_id, status, RECEIVER)
+    single_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for start in range(0, len(bulk_ids), batch_size):
+        async with session_factory() as db:
+            changes = batch(rnd, bulk_ids[start : start + batch_size])
+            updated, skipped = await repository_exchanges.update_exchange_statuses(db, changes, RECEIVER)
+            assert len(updated) == len(changes) and not skipped
+    bulk_time = time.perf_counter() - started
+
+    async with session_factory() as db:
+        # Повтор пакета: всі переходи вже недозволені, нічого не змінюється
+        updated, skipped = await repository_exchanges.update_exchange_statuses(db, changes, RECEIVER)
+        assert not updated and set(skipped.values()) == {"invalid_transition"}
+        pending = await db.scalar(select(func.count()).where(Exchange.status == ExchangeStatus.pending))
+        assert pending == 0
+
+    items = batches * batch_size
+    print(f"\n{batches} пакетів по {batch_size} змін статусу:")
+    print(f"по одному обміну:   {items / single_time:9.0f} змін/с  ({single_time / batches * 1000:8.1f} ms на пакет)")
+    print(f"один UPDATE:        {items / bulk_time:9.0f} змін/с  ({bulk_time / batches * 1000:8.1f} ms на пакет)")
+
+    await engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [5, 1000]))
@@ -0,0 +1,166 @@
+"""
+Навантажувальний тест GET /exchanges/user/{id}: 500 одночасних клієнтів.
+
+Порівнюється колишня схема (sync def-обробник із синхронною Session, що
+виконується в пулі потоків) з async-репозиторієм обмінів. Клієнти ходять в
+застосунок через ASGI-транспорт httpx, без мережі; обидві схеми мають
+однаковий пул з'єднань до тимчасової SQLite-бази.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_concurrency 500 10
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, insert, or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from benchmarks.exchanges_listing import EXCHANGE_WITH_DETAILS
+from benchmarks.exchanges_pagination import participants
+from settings import Base, get_db
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Exchange, Skill, User
+from src.routes import exchanges as exchange_routes
+from src.schemas.exchange import ExchangeWithDetailsResponse
+
+USERS = 1000
+SKILLS = 100
+EXCHANGES = 20_000
+PAGE = 20
+POOL = {"pool_size": 10, "max_overflow": 10, "pool_timeout": 120}
+
+
+def populate(engine) -> None:
+    rnd = random.Random(16)
+    start = datetime(2024, 1, 1)
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, USERS + 1)])
+        db.execute(
+            insert(Skill),
+            [
+                {"id": i, "title": f"skill {i}", "description": "description", "category": "other",
+                 "level": SkillLevel.beginner}
+                for i in range(1, SKILLS + 1)
+            ],
+        )
+        db.execute(
+            insert(Exchange),
+            [
+                {"id": i, **participants(rnd, USERS),
+                 "skill_id": rnd.randint(1, SKILLS), "message": "let's exchange",
+                 "status": rnd.choice(list(ExchangeStatus)), "hours_proposed": rnd.randint(1, 10),
+                 "created_at": start + timedelta(minutes=i), "updated_at": start + timedelta(minutes=i)}
+                for i in range(1, EXCHANGES + 1)
+            ],
+        )
+        db.commit()
+
+
+def sync_app(path: str) -> FastAPI:
+    """Як було до переходу на async: def-обробник і db.query-подібний запит у пулі потоків."""
+    engine = create_engine(f"sqlite:///{path}", **POOL)
+    app = FastAPI()
+
+    @app.get("/exchanges/user/{user_id}")
+    def get_user_exchanges(user_id: int, limit: int = PAGE):
+        with Session(engine) as db:
+            exchanges = db.scalars(
+                select(Exchange)
+                .options(*EXCHANGE_WITH_DETAILS)
+                .where(or_(Exchange.sender_id == user_id, Exchange.receiver_id == user_id))
+                .order_by(Exchange.created_at.desc(), Exchange.id.desc())
+                .limit(limit)
+            )
+            return [
+                ExchangeWithDetailsResponse(
+                    id=exchange.id,
+                    sender_id=exchange.sender_id,
+                    receiver_id=exchange.receiver_id,
+                    skill_id=exchange.skill_id,
+                    message=exchange.message,
+                    hours_proposed=exchange.hours_proposed,
+                    status=exchange.status,
+                    version=exchange.version,
+                    created_at=exchange.created_at,
+                    updated_at=exchange.updated_at,
+                    sender_username=exchange.sender.username,
+                    receiver_username=exchange.receiver.username,
+                    skill_title=exchange.skill.title,
+                )
+                for exchange in exchanges
+            ]
+
+    return app
+
+
+def async_app(path: str) -> FastAPI:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", **POOL)
+    session_factory = async_sessionmaker(bind=engine)
+
+    async def override_db():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(exchange_routes.router)
+    app.dependency_overrides[get_db] = override_db
+    return app
+
+
+async def load(app: FastAPI, clients: int, requests: int) -> dict:
+    rnd = random.Random(7)
+    latencies: List[float] = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    transport = httpx.ASGITransport(app=app)
+
+    async def client(http: httpx.AsyncClient) -> None:
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = await http.get(f"/exchanges/user/{rnd.randint(1, USERS)}", params={"limit": PAGE})
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", limits=limits, timeout=None) as http:
+        # Прогрів: з'єднання пулу і кеш сторінок SQLite
+        await asyncio.gather(*(http.get("/exchanges/user/1") for _ in range(20)))
+        started = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def run(clients: int, requests: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "exchanges.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    populate(engine)
+    engine.dispose()
+
+    print(f"\n{clients} клієнтів x {requests} запитів GET /exchanges/user/{{id}}?limit={PAGE}")
+    for name, app in (("sync + пул потоків", sync_app(path)), ("async", async_app(path))):
+        result = await load(app, clients, requests)
+        print(f"{name:20} {result['rps']:8.0f} запитів/с   p50 {result['p50']:8.1f} ms   p99 {result['p99']:8.1f} ms")
+
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(run(*(args or [500, 10])))
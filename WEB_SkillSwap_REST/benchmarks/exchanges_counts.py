@@ -0,0 +1,201 @@
+"""
+Лічильники обмінів користувача (GET /users/{id}/exchange-counts).
+
+Порівнюється читання лічильників із таблиці user_exchange_counts з колишнім
+шляхом - усі обміни через get_user_exchanges і підрахунок у Python - та з
+агрегатом COUNT по exchanges для користувачів з різною довжиною історії.
+Міряються також ціна підтримки лічильників на записі (створення і прийняття
+обміну з лічильниками і без) та повна звірка, яка виправляє розбіжності.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_counts 1000000
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from benchmarks.exchanges_pagination import participants
+from settings import Base
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Exchange, Skill, User, UserExchangeCounts
+from src.repository import exchange_counts
+from src.repository import exchanges as repository_exchanges
+from src.schemas.exchange import ExchangeCreate
+
+USERS = 20_000
+SKILLS = 500
+BATCH = 50_000
+# Користувач з довгою історією: кожен 20-й обмін - його
+HEAVY_USER = 1
+WRITES = 2000
+
+
+def populate(engine, size: int) -> None:
+    rnd = random.Random(25)
+    start = datetime(2024, 1, 1)
+    # Більшість обмінів завершені, pending і accepted - невелика частка
+    statuses = [ExchangeStatus.completed] * 6 + [ExchangeStatus.rejected] * 2 + [
+        ExchangeStatus.pending, ExchangeStatus.accepted
+    ]
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, USERS + 1)])
+        db.execute(
+            insert(Skill),
+            [
+                {"id": i, "title": f"skill {i}", "description": "description", "category": "other",
+                 "level": SkillLevel.beginner}
+                for i in range(1, SKILLS + 1)
+            ],
+        )
+        for offset in range(0, size, BATCH):
+            rows = []
+            for i in range(offset + 1, min(offset + BATCH, size) + 1):
+                if i % 20 == 0:
+                    pair = {"sender_id": HEAVY_USER, "receiver_id": rnd.randint(2, USERS)}
+                    if i % 40 == 0:
+                        pair = {"sender_id": pair["receiver_id"], "receiver_id": HEAVY_USER}
+                else:
+                    pair = participants(rnd, USERS)
+                rows.append(
+                    {"id": i, **pair, "skill_id": rnd.randint(1, SKILLS), "message": "let's exchange",
+                     "status": rnd.choice(statuses), "hours_proposed": 1,
+                     "created_at": start + timedelta(seconds=i), "updated_at": start + timedelta(seconds=i)}
+                )
+            db.execute(insert(Exchange), rows)
+        db.commit()
+
+
+async def listed_counts(db, user_id: int) -> tuple:
+    """Як було: усі обміни користувача сторінками get_user_exchanges і підрахунок у Python."""
+    incoming = outgoing = accepted = 0
+    cursor = None
+    while True:
+        page = await repository_exchanges.get_user_exchanges(db, user_id, 1000, cursor)
+        for exchange in page:
+            if exchange.status == ExchangeStatus.pending:
+                if exchange.receiver_id == user_id:
+                    incoming += 1
+                else:
+                    outgoing += 1
+            elif exchange.status == ExchangeStatus.accepted:
+                accepted += 1
+        if len(page) < 1000:
+            return incoming, outgoing, accepted
+        cursor = repository_exchanges.exchange_cursor(page[-1])
+
+
+async def aggregated_counts(db, user_id: int) -> tuple:
+    """COUNT по exchanges - індексами учасника, але все одно пропорційно історії."""
+    actual = {name: 0 for name in exchange_counts.COUNTERS}
+    for row in await db.execute(exchange_counts._actual_counts([user_id])):
+        actual[row.counter] += row.value
+    return tuple(actual.values())
+
+
+async def stored_counts(db, user_id: int) -> tuple:
+    counts = await exchange_counts.get_exchange_counts(db, user_id)
+    return tuple(counts)[1:]
+
+
+async def timed(session_factory, func, user_id: int, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            result = await func(db, user_id)
+            best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+async def writes(session_factory, rnd: random.Random) -> float:
+    """Створити й прийняти WRITES обмінів; повертає операцій/с."""
+    started = time.perf_counter()
+    for _ in range(WRITES):
+        pair = participants(rnd, USERS)
+        async with session_factory() as db:
+            exchange = await repository_exchanges.create_exchange(
+                db, ExchangeCreate(receiver_id=pair["receiver_id"], skill_id=1, message="let's exchange"),
+                pair["sender_id"],
+            )
+            await repository_exchanges.update_exchange_status(db, exchange.id, ExchangeStatus.accepted, pair["receiver_id"])
+    return 2 * WRITES / (time.perf_counter() - started)
+
+
+async def run(size: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "counts.db")
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    started = time.perf_counter()
+    populate(sync_engine, size)
+    with sync_engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    print(f"\n{size} обмінів, {USERS} користувачів (заповнення {time.perf_counter() - started:.1f} s)")
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(bind=engine)
+
+    # Порожня таблиця лічильників - та сама звірка, що й фонова, заповнює її повністю
+    async with session_factory() as db:
+        started = time.perf_counter()
+        repaired = await exchange_counts.reconcile_exchange_counts(db)
+    print(f"повна звірка: {time.perf_counter() - started:.1f} s, заповнено {repaired} користувачів")
+
+    async with session_factory() as db:
+        history = await db.scalar(
+            select(func.count()).where((Exchange.sender_id == HEAVY_USER) | (Exchange.receiver_id == HEAVY_USER))
+        )
+    print(f"\nчитання лічильників (користувач {HEAVY_USER} - {history} обмінів, користувач 2 - звичайний):")
+    for user_id in (HEAVY_USER, 2):
+        listed, listed_time = await timed(session_factory, listed_counts, user_id, repeat=1)
+        aggregated, aggregated_time = await timed(session_factory, aggregated_counts, user_id)
+        stored, stored_time = await timed(session_factory, stored_counts, user_id)
+        assert listed == aggregated == stored, f"користувач {user_id}: лічильники різняться"
+        print(f"користувач {user_id:5}: усі обміни {listed_time * 1000:9.1f} ms   COUNT {aggregated_time * 1000:7.2f} ms"
+              f"   лічильники {stored_time * 1000:6.2f} ms   {stored}")
+
+    # Запис без лічильників - для оцінки їх ціни
+    maintained = exchange_counts.apply_count_changes
+
+    async def skipped(db, changes):
+        return None
+
+    repository_exchanges.apply_count_changes = skipped
+    plain = await writes(session_factory, random.Random(1))
+    repository_exchanges.apply_count_changes = maintained
+    async with session_factory() as db:
+        await exchange_counts.reconcile_exchange_counts(db)
+    counted = await writes(session_factory, random.Random(2))
+    print(f"\nстворення + прийняття ({WRITES} обмінів): без лічильників {plain:6.0f} оп/с,"
+          f" з лічильниками {counted:6.0f} оп/с")
+
+    async with session_factory() as db:
+        assert await exchange_counts.reconcile_exchange_counts(db) == 0, "лічильники розійшлися з обмінами"
+        # Розбіжність після запису в обхід репозиторію
+        result = await db.execute(
+            update(UserExchangeCounts)
+            .where(UserExchangeCounts.user_id.in_(range(1, 101)))
+            .values(accepted=UserExchangeCounts.accepted + 1)
+        )
+        drifted = result.rowcount
+        await db.commit()
+        started = time.perf_counter()
+        repaired = await exchange_counts.reconcile_exchange_counts(db)
+        assert repaired == drifted
+    print(f"звірка після ручної правки: виправлено {repaired} користувачів за {time.perf_counter() - started:.1f} s")
+
+    await engine.dispose()
+    sync_engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [1_000_000]))
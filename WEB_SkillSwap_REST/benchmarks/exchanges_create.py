@@ -0,0 +1,153 @@
+"""
+Створення обмінів 200 одночасними записувачами: колишній create_exchange
+(SELECT отримувача, SELECT навички, INSERT, COMMIT і SELECT деталей) проти
+одного INSERT ... RETURNING з іменами учасників і назвою навички.
+
+Перевірки існування учасників і навички та заборону обміну із самим собою
+тепер виконують FOREIGN KEY і ck_exchanges_not_self; наприкінці перевіряється,
+що помилки перекладаються в ті самі повідомлення.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_create 200 20
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from benchmarks.exchanges_pagination import participants
+from settings import Base, enable_sqlite_foreign_keys
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Exchange, Skill, User
+from src.repository import exchanges as repository_exchanges
+from src.schemas.exchange import ExchangeCreate
+
+USERS = 1000
+SKILLS = 200
+POOL = {"pool_size": 10, "max_overflow": 10, "pool_timeout": 120, "connect_args": {"timeout": 60}}
+
+
+def populate(path: str) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, USERS + 1)])
+        db.execute(
+            insert(Skill),
+            [
+                {"id": i, "title": f"skill {i}", "description": "description", "category": "other",
+                 "level": SkillLevel.beginner}
+                for i in range(1, SKILLS + 1)
+            ],
+        )
+        db.commit()
+    engine.dispose()
+
+
+async def select_check_insert(db, exchange: ExchangeCreate, sender_id: int):
+    """Як було: окремі SELECT для перевірок, INSERT, COMMIT і читання деталей."""
+    if await db.scalar(select(User.id).where(User.id == exchange.receiver_id)) is None:
+        raise ValueError("Отримувач не знайдений")
+    if await db.scalar(select(Skill.id).where(Skill.id == exchange.skill_id)) is None:
+        raise ValueError("Навичка не знайдена")
+    if sender_id == exchange.receiver_id:
+        raise ValueError("Не можна створити обмін із самим собою")
+    db_exchange = Exchange(
+        sender_id=sender_id,
+        receiver_id=exchange.receiver_id,
+        skill_id=exchange.skill_id,
+        message=exchange.message,
+        hours_proposed=exchange.hours_proposed,
+        status=ExchangeStatus.pending,
+    )
+    db.add(db_exchange)
+    await db.flush()
+    exchange_id = db_exchange.id
+    await db.commit()
+    return await repository_exchanges.get_exchange_details(db, exchange_id)
+
+
+def requests(seed: int, writers: int, per_writer: int) -> list:
+    rnd = random.Random(seed)
+    return [
+        [
+            (pair["sender_id"], ExchangeCreate(receiver_id=pair["receiver_id"], skill_id=rnd.randint(1, SKILLS),
+                                               message="let's exchange", hours_proposed=2))
+            for pair in (participants(rnd, USERS) for _ in range(per_writer))
+        ]
+        for _ in range(writers)
+    ]
+
+
+async def measure(engine, session_factory, create, batches: list) -> tuple:
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    async def writer(batch):
+        for sender_id, exchange in batch:
+            # Сесія на запит, як get_db у маршруті
+            async with session_factory() as db:
+                created = await create(db, exchange, sender_id)
+                assert created.sender_username == f"user{sender_id}"
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(batch) for batch in batches))
+    elapsed = time.perf_counter() - started
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return elapsed, statements
+
+
+async def check_errors(session_factory) -> None:
+    cases = [
+        (1, ExchangeCreate(receiver_id=USERS + 1, skill_id=1, message="hello there"), "Отримувач не знайдений"),
+        (1, ExchangeCreate(receiver_id=2, skill_id=SKILLS + 1, message="hello there"), "Навичка не знайдена"),
+        (1, ExchangeCreate(receiver_id=1, skill_id=1, message="hello there"), "Не можна створити обмін із самим собою"),
+    ]
+    for sender_id, exchange, message in cases:
+        async with session_factory() as db:
+            try:
+                await repository_exchanges.create_exchange(db, exchange, sender_id)
+            except ValueError as e:
+                assert str(e) == message, str(e)
+            else:
+                raise AssertionError(f"обмін створено всупереч обмеженню: {message}")
+
+
+async def run(writers: int, per_writer: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "create.db")
+    populate(path)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", **POOL)
+    event.listen(engine.sync_engine, "connect", enable_sqlite_foreign_keys)
+    session_factory = async_sessionmaker(bind=engine)
+    total = writers * per_writer
+
+    print(f"\n{writers} одночасних записувачів по {per_writer} обмінів:")
+    for name, create, seed in (
+        ("SELECT-перевірки + INSERT", select_check_insert, 1),
+        ("INSERT ... RETURNING", repository_exchanges.create_exchange, 2),
+    ):
+        elapsed, statements = await measure(engine, session_factory, create, requests(seed, writers, per_writer))
+        print(f"{name:26} {total / elapsed:7.0f} обмінів/с, {statements / total:.1f} SQL-операторів на обмін")
+
+    await check_errors(session_factory)
+    async with session_factory() as db:
+        assert await db.scalar(select(func.count()).select_from(Exchange)) == 2 * total
+    print("помилки обмежень перекладаються в колишні повідомлення")
+
+    await engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [200, 20]))
@@ -0,0 +1,160 @@
+"""
+Потік подій обмінів (SSE): 10 000 тихих підписників і сплеск записів.
+
+Підписники відкривають GET /exchanges/user/{id}/events напряму через ASGI (по
+кілька на користувача). Потім одночасні записувачі створюють обміни і
+приймають їх; для кожної доставленої події міряється затримка від повернення
+з репозиторію до отримання клієнтом, а також пам'ять на одне з'єднання.
+Наприкінці підписки, що не читають, перевіряються на resync замість
+переповнення черги.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_events 10000 1000 20
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from benchmarks.exchanges_export import rss
+from settings import Base, enable_sqlite_foreign_keys, get_db
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Skill, User
+from src.repository import exchanges as repository_exchanges
+from src.repository.exchange_events import exchange_events
+from src.routes import exchanges as exchange_routes
+from src.schemas.exchange import ExchangeCreate
+
+USERS = 1000
+
+
+def populate(path: str) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, USERS + 1)])
+        db.execute(
+            insert(Skill),
+            [{"id": 1, "title": "Python", "description": "description", "category": "other", "level": SkillLevel.beginner}],
+        )
+        db.commit()
+    engine.dispose()
+
+
+class Subscriber:
+    """Клієнт SSE поверх ASGI: розбирає події й запам'ятовує час отримання."""
+
+    def __init__(self, app: FastAPI, user_id: int, received: list):
+        self.app = app
+        self.user_id = user_id
+        self.received = received
+        self.connected = asyncio.Event()
+        self.disconnected = asyncio.Event()
+        self.requested = False
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] != "http.response.body":
+            return
+        self.connected.set()
+        body = message.get("body", b"")
+        if body.startswith(b"id:"):
+            fields = dict(line.split(": ", 1) for line in body.decode().strip().split("\n"))
+            self.received.append((time.perf_counter(), fields["event"], json.loads(fields["data"]).get("id")))
+
+    async def run(self) -> None:
+        path = f"/exchanges/user/{self.user_id}/events"
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": b"", "headers": [], "server": ("test", 80), "client": ("test", 1),
+        }
+        await self.app(scope, self.receive, self.send)
+
+
+async def burst(session_factory, exchanges: int, writers: int, sent_at: dict) -> float:
+    """Створити й прийняти обміни; sent_at[(подія, id)] - момент повернення з репозиторію."""
+    async def writer(offset: int):
+        for n in range(offset, exchanges, writers):
+            sender_id, receiver_id = n % USERS + 1, (n + 1) % USERS + 1
+            async with session_factory() as db:
+                created = await repository_exchanges.create_exchange(
+                    db, ExchangeCreate(receiver_id=receiver_id, skill_id=1, message="let's exchange"), sender_id
+                )
+                sent_at[("created", created.id)] = time.perf_counter()
+                await repository_exchanges.update_exchange_status(db, created.id, ExchangeStatus.accepted, receiver_id)
+                sent_at[("status_changed", created.id)] = time.perf_counter()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(offset) for offset in range(writers)))
+    return time.perf_counter() - started
+
+
+async def run(subscribers: int, exchanges: int, writers: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "events.db")
+    populate(path)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=writers, connect_args={"timeout": 60})
+    event.listen(engine.sync_engine, "connect", enable_sqlite_foreign_keys)
+    session_factory = async_sessionmaker(bind=engine)
+    app = FastAPI()
+    app.include_router(exchange_routes.router)
+
+    received: list = []
+    clients = [Subscriber(app, i % USERS + 1, received) for i in range(subscribers)]
+    before = rss("VmRSS")
+    tasks = [asyncio.create_task(client.run()) for client in clients]
+    await asyncio.gather(*(client.connected.wait() for client in clients))
+    per_connection = (rss("VmRSS") - before) / subscribers
+    print(f"\n{subscribers} підписників на {USERS} користувачів: {per_connection / 1024:.1f} KiB RSS на з'єднання")
+
+    sent_at: dict = {}
+    elapsed = await burst(session_factory, exchanges, writers, sent_at)
+    await asyncio.sleep(0.5)  # дочитати останні події
+    latencies = sorted(
+        (at - sent_at[(kind, exchange_id)]) * 1000 for at, kind, exchange_id in received if (kind, exchange_id) in sent_at
+    )
+    # Кожна подія - відправнику й отримувачу, у кожного subscribers / USERS з'єднань
+    expected = 2 * exchanges * 2 * (subscribers // USERS)
+    assert len(latencies) == expected, (len(latencies), expected)
+    print(f"сплеск: {2 * exchanges} записів за {elapsed:.2f} s ({writers} записувачів), доставлено {len(latencies)} подій")
+    print(f"затримка доставки: p50 {statistics.median(latencies):.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:.2f} ms, max {latencies[-1]:.2f} ms")
+
+    # Клієнт, що не читає: замість необмеженої черги - одна подія resync.
+    # Окремий користувач, щоб не переповнити черги живих підписників
+    stalled = exchange_events.subscribe(USERS + 1)
+    for exchange_id in range(exchange_events.max_queue * 2):
+        exchange_events.publish("updated", {"id": exchange_id}, (USERS + 1,))
+    kinds = [stalled.queue.get_nowait().type for _ in range(stalled.queue.qsize())]
+    assert kinds[0] == "resync" and len(kinds) <= exchange_events.max_queue, kinds[:3]
+    print(f"клієнт, що не читає: черга {len(kinds)} з {exchange_events.max_queue}, відкинуто {stalled.dropped}, "
+          f"перша подія - {kinds[0]}")
+    exchange_events.unsubscribe(stalled)
+
+    for client in clients:
+        client.disconnected.set()
+    await asyncio.gather(*tasks)
+    assert exchange_events.stats()["subscriptions"] == 0
+    print(f"лічильники: {exchange_events.stats()}")
+
+    await engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [10_000, 1000, 20]))
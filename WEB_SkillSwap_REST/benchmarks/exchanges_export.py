@@ -0,0 +1,164 @@
+"""
+Експорт обмінів: GET /exchanges/?limit=N (увесь список у пам'яті) проти
+потокового GET /exchanges/export у NDJSON і CSV на 5 мільйонах рядків.
+
+Застосунок викликається напряму через ASGI: тіло відповіді лише рахується, а
+не накопичується, тож пік RSS процесу - це пам'ять самого обробника. Пік
+скидається перед кожним прогоном (/proc/self/clear_refs, лише Linux).
+Повний список міряється на меншій кількості рядків - на 5 мільйонах він не
+вміщується в пам'ять звичайного воркера.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_export 5000000 200000
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from settings import Base, get_db
+from src.routes import exchanges as exchange_routes
+
+USERS = 10_000
+SKILLS = 1000
+BATCH = 100_000
+
+
+def populate(path: str, size: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    rnd = random.Random(23)
+    start = datetime(2024, 1, 1)
+    # Напряму через sqlite3 пакетами: заповнення не роздуває пік RSS процесу
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, is_active) VALUES (?, ?, ?, 1)",
+            ((i, f"user{i}", f"u{i}@ex.com") for i in range(1, USERS + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO skills (id, title, description, category, level, can_teach, want_learn) "
+            "VALUES (?, ?, 'description', 'other', 'beginner', 1, 0)",
+            ((i, f"skill {i}") for i in range(1, SKILLS + 1)),
+        )
+        for offset in range(0, size, BATCH):
+            rows = []
+            for i in range(offset + 1, min(offset + BATCH, size) + 1):
+                sender, receiver = rnd.sample(range(1, USERS + 1), 2)
+                created = (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S")
+                rows.append((i, sender, receiver, rnd.randint(1, SKILLS), "let's exchange skills", "pending",
+                             rnd.randint(1, 10), created, created))
+            conn.executemany(
+                "INSERT INTO exchanges (id, sender_id, receiver_id, skill_id, message, status, hours_proposed, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+
+
+def make_app(path: str) -> FastAPI:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(bind=engine)
+
+    async def override_db():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(exchange_routes.router)
+    app.dependency_overrides[get_db] = override_db
+    return app
+
+
+def rss(field: str) -> int:
+    """VmRSS (поточний) або VmHWM (пік) процесу в байтах."""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def reset_peak_rss() -> None:
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+async def download(app: FastAPI, path: str, params: dict) -> tuple:
+    """GET через ASGI; повертає (байтів тіла, рядків, секунд, приріст піку RSS)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": urlencode(params).encode(), "headers": [],
+        "server": ("test", 80), "client": ("test", 1),
+    }
+    received = {"bytes": 0, "lines": 0, "status": None}
+    disconnected = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            received["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            received["bytes"] += len(body)
+            received["lines"] += body.count(b"\n")
+
+    reset_peak_rss()
+    baseline = rss("VmRSS")
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - started
+    disconnected.set()
+    assert received["status"] == 200, received
+    return received["bytes"], received["lines"], elapsed, rss("VmHWM") - baseline
+
+
+async def run(size: int, list_size: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "export.db")
+    started = time.perf_counter()
+    populate(path, size)
+    print(f"\n{size} обмінів (заповнення {time.perf_counter() - started:.1f} s), RSS процесу {rss('VmRSS') / 2**20:.1f} MiB")
+    app = make_app(path)
+    # Прогрів імпортів і пулу з'єднань
+    await download(app, "/exchanges/export", {"after_id": size - 10})
+
+    # Фільтр за датою обрізає експорт до тих самих list_size рядків, що й список
+    list_to_date = (datetime(2024, 1, 1) + timedelta(seconds=list_size)).isoformat()
+    # Список останнім: звільнена ним пам'ять лишається в процесі і сховала б пік експорту
+    cases = [
+        (f"export NDJSON, {list_size}", "/exchanges/export", {"to_date": list_to_date}, list_size),
+        (f"export NDJSON, {size}", "/exchanges/export", {}, size),
+        (f"export CSV, {size}", "/exchanges/export", {"format": "csv"}, size),
+        (f"GET /exchanges/ limit={list_size}", "/exchanges/", {"limit": list_size, "sort_order": "asc"}, list_size),
+    ]
+    for name, url, params, rows in cases:
+        body, lines, elapsed, peak = await download(app, url, params)
+        if url.endswith("export"):
+            assert lines - ("format" in params) == rows, (name, lines)
+        print(f"{name:32} {body / 2**20 / elapsed:7.1f} MB/s, {rows / elapsed:8.0f} рядків/с, "
+              f"пік RSS +{peak / 2**20:7.1f} MiB")
+
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [5_000_000, 200_000]))
@@ -0,0 +1,165 @@
+"""
+Плани запитів репозиторію обмінів до і після індексів міграції 9b4e1d7c3f62.
+
+Для кожного типового запиту (фільтр за відправником, отримувачем, статусом,
+навичкою, обміни користувача, вхідні pending) перехоплюється SQL, який реально
+виконує репозиторій, і друкується EXPLAIN QUERY PLAN та час виконання.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_indexes 500000
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from benchmarks.exchanges_pagination import participants
+from settings import Base
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Exchange, Skill, User
+from src.repository import exchanges as repository_exchanges
+from src.schemas.exchange import ExchangeFilter
+
+USERS = 5000
+SKILLS = 500
+BATCH = 50_000
+# Індекси міграції 9b4e1d7c3f62; "до" - таблиця без них
+NEW_INDEXES = (
+    "ix_exchanges_sender_created_at",
+    "ix_exchanges_receiver_created_at",
+    "ix_exchanges_status_created_at",
+    "ix_exchanges_skill_created_at",
+    "ix_exchanges_pending_receiver",
+)
+
+QUERIES = {
+    "відправник": lambda db: repository_exchanges.get_exchanges_with_filters(db, ExchangeFilter(sender_id=42), 0, 20),
+    "отримувач": lambda db: repository_exchanges.get_exchanges_with_filters(db, ExchangeFilter(receiver_id=42), 0, 20),
+    "статус": lambda db: repository_exchanges.get_exchanges_with_filters(
+        db, ExchangeFilter(status=ExchangeStatus.completed), 0, 20
+    ),
+    "навичка": lambda db: repository_exchanges.get_exchanges_with_filters(db, ExchangeFilter(skill_id=7), 0, 20),
+    "вхідні pending": lambda db: repository_exchanges.get_exchanges_with_filters(
+        db, ExchangeFilter(receiver_id=42, status=ExchangeStatus.pending), 0, 20
+    ),
+    "обміни користувача": lambda db: repository_exchanges.get_user_exchanges(db, 42, 20),
+}
+
+
+def populate(engine, size: int) -> None:
+    rnd = random.Random(18)
+    start = datetime(2024, 1, 1)
+    # Більшість обмінів завершені, pending - невелика частка
+    statuses = [ExchangeStatus.completed] * 6 + [ExchangeStatus.rejected] * 2 + [ExchangeStatus.pending]
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, USERS + 1)])
+        db.execute(
+            insert(Skill),
+            [
+                {"id": i, "title": f"skill {i}", "description": "description", "category": "other",
+                 "level": SkillLevel.beginner}
+                for i in range(1, SKILLS + 1)
+            ],
+        )
+        for offset in range(0, size, BATCH):
+            db.execute(
+                insert(Exchange),
+                [
+                    {"id": i, **participants(rnd, USERS),
+                     "skill_id": rnd.randint(1, SKILLS), "message": "let's exchange", "status": rnd.choice(statuses),
+                     "hours_proposed": rnd.randint(1, 10), "created_at": start + timedelta(seconds=i),
+                     "updated_at": start + timedelta(seconds=i)}
+                    for i in range(offset + 1, min(offset + BATCH, size) + 1)
+                ],
+            )
+        db.commit()
+
+
+async def capture(session_factory, engine, query) -> tuple:
+    """SQL і параметри, з якими репозиторій виконує запит."""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        async with session_factory() as db:
+            await query(db)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    return statements[-1]
+
+
+def explain(sync_engine, statement: str, parameters) -> list:
+    with sync_engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[-1] for row in rows]
+
+
+async def timed(session_factory, query, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            await query(db)
+            best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def report(title: str, session_factory, engine, sync_engine) -> dict:
+    print(f"\n===== {title} =====")
+    timings = {}
+    for name, query in QUERIES.items():
+        statement, parameters = await capture(session_factory, engine, query)
+        timings[name] = await timed(session_factory, query)
+        print(f"\n-- {name}: {timings[name] * 1000:.1f} ms")
+        for line in explain(sync_engine, statement, parameters):
+            print("   ", line)
+    return timings
+
+
+async def run(size: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "indexes.db")
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        for name in NEW_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+    populate(sync_engine, size)
+    with sync_engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(bind=engine)
+    print(f"\n{size} обмінів")
+    before = await report("до міграції", session_factory, engine, sync_engine)
+
+    with sync_engine.begin() as conn:
+        for index in Exchange.__table__.indexes:
+            if index.name in NEW_INDEXES:
+                index.create(conn)
+        conn.exec_driver_sql("ANALYZE")
+    # План будується при підготовці запиту - нові з'єднання бачать нові індекси
+    await engine.dispose()
+    after = await report("після міграції", session_factory, engine, sync_engine)
+
+    print("\nпідсумок:")
+    for name in QUERIES:
+        print(f"{name:20} {before[name] * 1000:9.1f} ms -> {after[name] * 1000:7.1f} ms")
+
+    await engine.dispose()
+    sync_engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [500_000]))
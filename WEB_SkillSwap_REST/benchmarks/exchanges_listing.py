@@ -0,0 +1,141 @@
+"""
+Список обмінів з деталями (ExchangeWithDetailsResponse) на 10 000 рядків.
+
+Порівнюється колишній шлях - ORM-об'єкти Exchange із joinedload зв'язків,
+ручне копіювання полів у схему і повторна валідація response_model - з
+проєкцією колонок через aliased JOIN, що одразу дає готові моделі.
+Міряються рядки/с і пік пам'яті (tracemalloc) на шляху запит -> JSON.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_listing 10000
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, joinedload
+
+from settings import Base
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Exchange, Skill, User
+from src.repository import exchanges as repository_exchanges
+from src.routes.exchanges import exchange_list_adapter
+from src.schemas.exchange import ExchangeFilter, ExchangeWithDetailsResponse
+
+USERS = 1000
+SKILLS = 200
+
+# Колишній шлях читання: ORM-обмін з учасниками та навичкою одним JOIN
+EXCHANGE_WITH_DETAILS = (
+    joinedload(Exchange.sender),
+    joinedload(Exchange.receiver),
+    joinedload(Exchange.skill),
+)
+
+
+def populate(path: str, size: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, USERS + 1)])
+        db.execute(
+            insert(Skill),
+            [
+                {"id": i, "title": f"skill {i}", "description": "description", "category": "other",
+                 "level": SkillLevel.beginner}
+                for i in range(1, SKILLS + 1)
+            ],
+        )
+        db.execute(
+            insert(Exchange),
+            [
+                {"id": i, "sender_id": i % USERS + 1, "receiver_id": (i * 7 + 1) % USERS + 1, "skill_id": i % SKILLS + 1,
+                 "message": "let's exchange skills", "status": ExchangeStatus.pending, "hours_proposed": i % 10 + 1,
+                 "created_at": start + timedelta(minutes=i), "updated_at": start + timedelta(minutes=i)}
+                for i in range(1, size + 1)
+            ],
+        )
+        db.commit()
+    engine.dispose()
+
+
+async def orm_listing(db, size: int) -> bytes:
+    """Як було: ORM-гідрація, копіювання 12 полів і друга валідація response_model."""
+    result = await db.scalars(
+        select(Exchange).options(*EXCHANGE_WITH_DETAILS).order_by(Exchange.created_at.desc(), Exchange.id.desc()).limit(size)
+    )
+    models = [
+        ExchangeWithDetailsResponse(
+            id=exchange.id,
+            sender_id=exchange.sender_id,
+            receiver_id=exchange.receiver_id,
+            skill_id=exchange.skill_id,
+            message=exchange.message,
+            hours_proposed=exchange.hours_proposed,
+            status=exchange.status,
+            version=exchange.version,
+            created_at=exchange.created_at,
+            updated_at=exchange.updated_at,
+            sender_username=exchange.sender.username,
+            receiver_username=exchange.receiver.username,
+            skill_title=exchange.skill.title,
+        )
+        for exchange in result
+    ]
+    validated = exchange_list_adapter.validate_python([model.model_dump() for model in models])
+    return exchange_list_adapter.dump_json(validated)
+
+
+async def projection_listing(db, size: int) -> bytes:
+    exchanges = await repository_exchanges.get_exchanges_with_filters(db, ExchangeFilter(), 0, size)
+    return exchange_list_adapter.dump_json(exchanges)
+
+
+async def measure(session_factory, listing, size: int):
+    # Окрема сесія на кожен прогін: identity map не переживає запит
+    async with session_factory() as db:
+        await listing(db, size)  # прогрів
+
+    best = float("inf")
+    for _ in range(3):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            body = await listing(db, size)
+            best = min(best, time.perf_counter() - started)
+
+    async with session_factory() as db:
+        tracemalloc.start()
+        await listing(db, size)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return body, best, peak
+
+
+async def run(size: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "listing.db")
+    populate(path, size)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(bind=engine)
+
+    orm_body, orm_time, orm_peak = await measure(session_factory, orm_listing, size)
+    body, projection_time, projection_peak = await measure(session_factory, projection_listing, size)
+    assert body == orm_body, "проєкція дає інший JSON"
+
+    print(f"\nсписок із {size} обмінів з деталями:")
+    print(f"ORM + повторна валідація: {size / orm_time:9.0f} рядків/с, пік {orm_peak / 2**20:6.1f} MiB")
+    print(f"проєкція колонок:         {size / projection_time:9.0f} рядків/с, пік {projection_peak / 2**20:6.1f} MiB")
+
+    await engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [10_000]))
@@ -0,0 +1,111 @@
+"""
+Сторінка 1 проти сторінки 10 000 у GET /exchanges: offset (skip) проти cursor
+(ключ (created_at, id)) на таблиці з мільйоном обмінів.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_pagination 1000000 100
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from settings import Base
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Exchange, Skill, User
+from src.repository import exchanges as repository_exchanges
+from src.schemas.exchange import ExchangeFilter
+
+USERS = 1000
+SKILLS = 500
+BATCH = 50_000
+
+
+def participants(rnd: random.Random, users: int) -> dict:
+    """Випадкові відправник і отримувач - різні, як вимагає ck_exchanges_not_self"""
+    sender_id, receiver_id = rnd.sample(range(1, users + 1), 2)
+    return {"sender_id": sender_id, "receiver_id": receiver_id}
+
+
+def populate(engine, size: int) -> None:
+    rnd = random.Random(5)
+    start = datetime(2024, 1, 1)
+    statuses = list(ExchangeStatus)
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, USERS + 1)])
+        db.execute(
+            insert(Skill),
+            [
+                {"id": i, "title": f"skill {i}", "description": "description", "category": "other",
+                 "level": SkillLevel.beginner}
+                for i in range(1, SKILLS + 1)
+            ],
+        )
+        for offset in range(0, size, BATCH):
+            rows = []
+            for i in range(offset + 1, min(offset + BATCH, size) + 1):
+                # Кілька обмінів на секунду - created_at повторюються, розрізняє їх id
+                created = start + timedelta(seconds=i // 3)
+                rows.append(
+                    {"id": i, **participants(rnd, USERS),
+                     "skill_id": rnd.randint(1, SKILLS), "message": "let's exchange", "status": rnd.choice(statuses),
+                     "hours_proposed": rnd.randint(1, 10), "created_at": created, "updated_at": created}
+                )
+            db.execute(insert(Exchange), rows)
+        db.commit()
+
+
+async def timeit(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def run(size: int, limit: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "exchanges.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    populate(engine, size)
+    engine.dispose()
+    print(f"\n{size} обмінів (заповнення {time.perf_counter() - started:.1f} s), сторінка по {limit}")
+
+    filters = ExchangeFilter()
+    page = 10_000 if size >= 10_000 * limit else size // limit
+    skip = (page - 1) * limit
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with async_sessionmaker(bind=async_engine)() as db:
+        # Cursor на початок сторінки - від останнього запису попередньої
+        previous = (await repository_exchanges.get_exchanges_with_filters(db, filters, skip - 1, 1))[0]
+        cursor = repository_exchanges.exchange_cursor(previous)
+
+        by_offset = await repository_exchanges.get_exchanges_with_filters(db, filters, skip, limit)
+        by_cursor = await repository_exchanges.get_exchanges_with_filters(db, filters, 0, limit, cursor)
+        assert [e.id for e in by_offset] == [e.id for e in by_cursor]
+
+        first = await timeit(lambda: repository_exchanges.get_exchanges_with_filters(db, filters, 0, limit))
+        deep_offset = await timeit(lambda: repository_exchanges.get_exchanges_with_filters(db, filters, skip, limit))
+        deep_cursor = await timeit(lambda: repository_exchanges.get_exchanges_with_filters(db, filters, 0, limit, cursor))
+
+    print(f"сторінка 1:                 {first * 1000:8.1f} ms")
+    print(f"сторінка {page}, offset:    {deep_offset * 1000:8.1f} ms")
+    print(f"сторінка {page}, cursor:    {deep_cursor * 1000:8.1f} ms")
+
+    await async_engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(run(*(args or [1_000_000, 100])))
@@ -0,0 +1,141 @@
+"""
+Обміни користувача і статистика active-users: OR по sender_id/receiver_id
+проти UNION ALL двох індексних гілок на мільйоні обмінів.
+
+Результати обох варіантів порівнюються між собою. Працює з тимчасовою
+SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_user_union 1000000
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from settings import Base
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Exchange, Skill, User
+from src.repository import exchanges as repository_exchanges
+from src.routes.statistic import get_active_users
+
+USERS = 20_000
+SKILLS = 500
+BATCH = 50_000
+PAGE = 20
+
+
+def populate(engine, size: int) -> None:
+    rnd = random.Random(19)
+    start = datetime(2024, 1, 1)
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, USERS + 1)])
+        db.execute(
+            insert(Skill),
+            [
+                {"id": i, "title": f"skill {i}", "description": "description", "category": "other",
+                 "level": SkillLevel.beginner}
+                for i in range(1, SKILLS + 1)
+            ],
+        )
+        for offset in range(0, size, BATCH):
+            rows = []
+            for i in range(offset + 1, min(offset + BATCH, size) + 1):
+                # Кілька активних користувачів, щоб топ статистики був однозначним
+                sender = rnd.randint(1, 10) if i % 50 == 0 else rnd.randint(1, USERS)
+                # Обмінів із самим собою API не створює
+                receiver = rnd.randint(1, USERS - 1)
+                receiver += receiver >= sender
+                rows.append(
+                    {"id": i, "sender_id": sender, "receiver_id": receiver,
+                     "skill_id": rnd.randint(1, SKILLS), "message": "let's exchange",
+                     "status": ExchangeStatus.pending, "hours_proposed": 1,
+                     "created_at": start + timedelta(seconds=i // 2), "updated_at": start}
+                )
+            db.execute(insert(Exchange), rows)
+        db.commit()
+
+
+async def or_user_exchanges(db, user_id: int, cursor=None) -> list:
+    """Колишній запит: один SELECT з sender_id = :id OR receiver_id = :id."""
+    stmt = repository_exchanges._details_select().where(
+        or_(Exchange.sender_id == user_id, Exchange.receiver_id == user_id)
+    )
+    stmt = repository_exchanges._keyset(stmt, "created_at", True, cursor).limit(PAGE)
+    result = await db.execute(stmt)
+    return [row.id for row in result]
+
+
+async def union_user_exchanges(db, user_id: int, cursor=None) -> list:
+    return [exchange.id for exchange in await repository_exchanges.get_user_exchanges(db, user_id, PAGE, cursor)]
+
+
+async def or_active_users(db) -> list:
+    stmt = (
+        select(User.username, func.count(Exchange.id).label("total_exchanges"))
+        .select_from(User)
+        .join(Exchange, (User.id == Exchange.sender_id) | (User.id == Exchange.receiver_id))
+        .group_by(User.id, User.username)
+        .order_by(func.count(Exchange.id).desc())
+        .limit(10)
+    )
+    return [(row.username, row.total_exchanges) for row in await db.execute(stmt)]
+
+
+async def union_active_users(db) -> list:
+    stats = await get_active_users(db)
+    return [(user["username"], user["total_exchanges"]) for user in stats["active_users"]]
+
+
+async def timed(func, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await func()
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+async def run(size: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "union.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    populate(engine, size)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    print(f"\n{size} обмінів, {USERS} користувачів (заповнення {time.perf_counter() - started:.1f} s)")
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with async_sessionmaker(bind=async_engine)() as db:
+        user_id = 3  # активний користувач: багато обмінів в обох ролях
+        first = (await repository_exchanges.get_user_exchanges(db, user_id, PAGE * 50))[-1]
+        deep_cursor = repository_exchanges.exchange_cursor(first)
+
+        cases = [
+            ("обміни користувача, сторінка 1",
+             lambda: or_user_exchanges(db, user_id), lambda: union_user_exchanges(db, user_id)),
+            ("обміни користувача, сторінка 51",
+             lambda: or_user_exchanges(db, user_id, deep_cursor), lambda: union_user_exchanges(db, user_id, deep_cursor)),
+            ("статистика active-users",
+             lambda: or_active_users(db), lambda: union_active_users(db)),
+        ]
+        for name, old, new in cases:
+            old_result, old_time = await timed(old)
+            new_result, new_time = await timed(new)
+            assert old_result == new_result, f"{name}: результати різняться"
+            print(f"{name:32} OR {old_time * 1000:9.1f} ms   UNION ALL {new_time * 1000:8.1f} ms")
+
+    await async_engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [1_000_000]))
@@ -0,0 +1,154 @@
+"""
+Зміни обміну одним умовним UPDATE/DELETE ... RETURNING проти колишнього
+read-check-write (SELECT із трьома joinedload, перевірки в Python, COMMIT і
+повторне читання деталей).
+
+Конкурентна частина: багато сесій одночасно змінюють той самий обмін з однією
+версією, а також одночасно приймають і відхиляють той самий обмін. Умовний
+запис пропускає рівно одну зміну, решта отримують ExchangeConflict (HTTP 409);
+read-check-write "успішно" виконує всі й губить зміни.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.exchanges_versioning 2000 50
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from benchmarks.exchanges_listing import EXCHANGE_WITH_DETAILS
+from settings import Base
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Exchange, Skill, User
+from src.repository import exchanges as repository_exchanges
+from src.schemas.exchange import ExchangeUpdate
+
+SENDER = 1
+RECEIVER = 2
+
+
+def populate(path: str, size: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in (SENDER, RECEIVER)])
+        db.execute(
+            insert(Skill),
+            [{"id": 1, "title": "Python", "description": "description", "category": "other", "level": SkillLevel.beginner}],
+        )
+        db.execute(
+            insert(Exchange),
+            [
+                {"id": i, "sender_id": SENDER, "receiver_id": RECEIVER, "skill_id": 1,
+                 "message": "let's exchange", "status": ExchangeStatus.pending}
+                for i in range(1, size + 1)
+            ],
+        )
+        db.commit()
+    engine.dispose()
+
+
+async def read_check_write_status(db, exchange_id: int, status: ExchangeStatus, user_id: int):
+    """Як було: завантажити обмін зі зв'язками, перевірити в Python, записати, перечитати."""
+    exchange = await db.scalar(
+        select(Exchange).options(*EXCHANGE_WITH_DETAILS).where(Exchange.id == exchange_id)
+    )
+    if exchange is None:
+        return None
+    if exchange.receiver_id != user_id:
+        raise ValueError("Тільки отримувач може змінювати статус обміну")
+    if exchange.status not in repository_exchanges.STATUS_TRANSITIONS.get(status, ()):
+        raise ValueError(f"Не можна змінити статус '{exchange.status.value}' на '{status.value}'")
+    # Поки інші запити чекають на базу, стан, перевірений вище, може застаріти
+    await asyncio.sleep(0)
+    exchange.status = status
+    await db.commit()
+    return await repository_exchanges.get_exchange_details(db, exchange_id)
+
+
+async def race(session_factory, attempts) -> tuple:
+    """Запускає зміни одночасно (кожна у своїй сесії); повертає (успішні, конфлікти)."""
+    async def attempt(change):
+        async with session_factory() as db:
+            try:
+                return await change(db)
+            except ValueError as e:
+                return e
+
+    results = await asyncio.gather(*(attempt(change) for change in attempts))
+    succeeded = [result for result in results if not isinstance(result, Exception)]
+    return succeeded, len(results) - len(succeeded)
+
+
+async def concurrency(session_factory, writers: int) -> None:
+    print(f"\n{writers} одночасних змін одного обміну:")
+
+    # Однакова версія: застосовується рівно одна зміна повідомлення
+    updates = [
+        lambda db, n=n: repository_exchanges.update_exchange(
+            db, 1, ExchangeUpdate(message=f"message from writer {n}"), SENDER, version=1
+        )
+        for n in range(writers)
+    ]
+    succeeded, conflicts = await race(session_factory, updates)
+    async with session_factory() as db:
+        stored = await repository_exchanges.get_exchange_details(db, 1)
+    assert len(succeeded) == 1 and conflicts == writers - 1
+    assert stored.version == 2 and stored.message == succeeded[0].message
+    print(f"PUT з version=1:                   успішних {len(succeeded)}, 409 - {conflicts}")
+
+    # Прийняти й відхилити водночас: старий шлях підтверджує обидві зміни
+    for name, change_status, exchange_id in (
+        ("read-check-write accepted/rejected", read_check_write_status, 2),
+        ("умовний UPDATE accepted/rejected", repository_exchanges.update_exchange_status, 3),
+    ):
+        statuses = [ExchangeStatus.accepted, ExchangeStatus.rejected] * (writers // 2)
+        attempts = [
+            lambda db, status=status: change_status(db, exchange_id, status, RECEIVER) for status in statuses
+        ]
+        succeeded, conflicts = await race(session_factory, attempts)
+        async with session_factory() as db:
+            stored = await repository_exchanges.get_exchange_details(db, exchange_id)
+        print(f"{name:34} успішних {len(succeeded)}, 409 - {conflicts}, у базі '{stored.status.value}'")
+    assert len(succeeded) == 1 and succeeded[0].status == stored.status
+
+
+async def latency(session_factory, size: int) -> None:
+    print(f"\nпослідовні зміни статусу, {size} обмінів:")
+    timings = {}
+    ids = range(100, 100 + size)
+    # Обидва варіанти проходять ті самі обміни: pending -> accepted -> completed
+    for name, change_status, status in (
+        ("read-check-write", read_check_write_status, ExchangeStatus.accepted),
+        ("умовний UPDATE", repository_exchanges.update_exchange_status, ExchangeStatus.completed),
+    ):
+        started = time.perf_counter()
+        for exchange_id in ids:
+            async with session_factory() as db:
+                exchange = await change_status(db, exchange_id, status, RECEIVER)
+                assert exchange.status == status
+        timings[name] = time.perf_counter() - started
+        print(f"{name:18} {timings[name] / size * 1e6:8.0f} us на зміну, {size / timings[name]:7.0f} змін/с")
+
+
+async def run(size: int, writers: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "versioning.db")
+    populate(path, size + 100)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=writers, connect_args={"timeout": 30})
+    session_factory = async_sessionmaker(bind=engine)
+
+    await concurrency(session_factory, writers)
+    await latency(session_factory, size)
+
+    await engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [2000, 50]))
@@ -0,0 +1,77 @@
+"""
+Пропускна здатність масового імпорту навичок (NDJSON, POST /skills/bulk):
+валідація пакетами через TypeAdapter, вставка пакета одним INSERT та індексування.
+
+Потік генерується на льоту шматками по 64 KB, як тіло запиту; кожен сотий рядок
+невалідний. Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.skills_bulk_import 100000
+"""
+
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.skills_search import make_catalog
+from settings import Base
+from src import models  # noqa: F401 - реєструє таблиці в Base.metadata
+from src.repository.skill_catalog import SkillCatalog
+from src.repository.skill_import import import_skills
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def ndjson_stream(size: int):
+    buffer = bytearray()
+    for skill in make_catalog(size).values():
+        line = {
+            "title": skill["title"] if skill["id"] % 100 else "x",
+            "description": skill["description"],
+            "category": skill["category"].value,
+            "level": skill["level"].value,
+            "can_teach": skill["can_teach"],
+            "want_learn": skill["want_learn"],
+        }
+        buffer += json.dumps(line).encode() + b"\n"
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def run(size: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bulk.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    catalog = SkillCatalog(session_factory=async_sessionmaker(bind=engine))
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    result = await import_skills(catalog, ndjson_stream(size))
+    elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    assert result["created"] + result["failed"] == size
+    print(f"\n{size} рядків: створено {result['created']}, відхилено {result['failed']}")
+    print(f"час:          {elapsed:8.2f} s")
+    print(f"швидкість:    {size / elapsed:8.0f} записів/s")
+    print(f"приріст RSS:  {(rss_after - rss_before) / 1024:8.1f} MB (разом з каталогом у пам'яті)")
+
+    await engine.dispose()
+    os.remove(path)
+
+
+def main(sizes):
+    for size in sizes:
+        asyncio.run(run(size))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000])
@@ -0,0 +1,72 @@
+"""
+Фільтрація навичок: ланцюжок list comprehension із сортуванням проти вторинних індексів
+(перетин множин ID) та впорядкованого індексу created_at.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.skills_filters 100000 1000000
+"""
+
+import sys
+import tracemalloc
+
+from benchmarks.skills_search import make_catalog, timeit
+from src.enum_models import SkillCategory, SkillLevel
+from src.repository.skill_index import SkillFilterIndex, SkillOrderIndex
+
+QUERIES = [
+    {"category": SkillCategory.music},
+    {"category": SkillCategory.music, "level": SkillLevel.expert},
+    {"category": SkillCategory.art, "level": SkillLevel.beginner, "can_teach": True, "want_learn": False},
+    {"can_teach": False, "want_learn": True},
+]
+
+
+def list_filter(catalog: dict, filters: dict, limit: int = 10) -> list:
+    filtered = list(catalog.values())
+    for field, value in filters.items():
+        filtered = [s for s in filtered if s[field] == value]
+    filtered.sort(key=lambda x: x["created_at"], reverse=True)
+    return filtered[:limit]
+
+
+def index_filter(catalog: dict, index: SkillFilterIndex, order: SkillOrderIndex, filters: dict, limit=10) -> list:
+    page_ids = order.newest(index.select(**filters), 0, limit)
+    return [catalog[i] for i in page_ids]
+
+
+def main(sizes):
+    for size in sizes:
+        catalog = make_catalog(size)
+
+        tracemalloc.start()
+        index = SkillFilterIndex()
+        for skill in catalog.values():
+            index.add(skill)
+        index_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        order = SkillOrderIndex()
+        for skill in catalog.values():
+            order.add(skill)
+
+        print(f"\n{size} навичок, пам'ять індексів: {index_bytes / 2**20:.1f} MiB ({index_bytes / size:.0f} B/навичку)")
+        print(f"{'фільтри':<48}{'знайдено':>10}{'списки, ms':>13}{'індекс, ms':>13}")
+        for filters in QUERIES:
+            assert list_filter(catalog, filters) == index_filter(catalog, index, order, filters)
+            label = ",".join(f"{k}={getattr(v, 'value', v)}" for k, v in filters.items())
+            found = len(index.select(**filters))
+            list_ms = timeit(lambda: list_filter(catalog, filters))
+            index_ms = timeit(lambda: index_filter(catalog, index, order, filters))
+            print(f"{label:<48}{found:>10}{list_ms:>13.2f}{index_ms:>13.2f}")
+
+        # Глибока сторінка: skip проти cursor (ключ останнього запису попередньої сторінки)
+        all_ids = index.select()
+        deep = size // 2
+        before = order.key(order.newest(all_ids, deep - 1, 1)[0])
+        assert order.newest(all_ids, deep, 10) == order.newest(all_ids, 0, 10, before)
+        skip_ms = timeit(lambda: order.newest(all_ids, deep, 10))
+        cursor_ms = timeit(lambda: order.newest(all_ids, 0, 10, before))
+        print(f"сторінка на глибині {deep}: skip {skip_ms:.2f} ms, cursor {cursor_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,62 @@
+"""
+Затримка нечіткого пошуку збігів (TF-IDF n-грам) на великому каталозі.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.skills_fuzzy 100000
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.skills_search import make_catalog
+from src.repository.skill_fuzzy import SkillFuzzyIndex
+
+
+def percentiles(samples: list) -> str:
+    p50, p99 = np.percentile(np.array(samples) * 1000, [50, 99])
+    return f"p50 {p50:.1f} ms, p99 {p99:.1f} ms"
+
+
+def main(sizes, queries: int = 300, batch: int = 100):
+    rnd = random.Random(1)
+    for size in sizes:
+        catalog = make_catalog(size)
+        index = SkillFuzzyIndex()
+
+        started = time.perf_counter()
+        for skill in catalog.values():
+            index.add(skill)
+        index.similar([1])
+        print(f"\n{size} навичок, побудова матриці: {time.perf_counter() - started:.1f} s")
+
+        single = []
+        for skill_id in rnd.sample(range(1, size + 1), queries):
+            started = time.perf_counter()
+            index.similar([skill_id])
+            single.append(time.perf_counter() - started)
+        print(f"одна навичка ({queries} запитів): {percentiles(single)}")
+
+        batched = []
+        for _ in range(5):
+            ids = rnd.sample(range(1, size + 1), batch)
+            started = time.perf_counter()
+            index.similar(ids)
+            batched.append(time.perf_counter() - started)
+        print(f"пакет із {batch} навичок: {percentiles(batched)} ({min(batched) / batch * 1000:.2f} ms на навичку)")
+
+        # Інкрементальне оновлення: нова навичка + запит
+        updates = []
+        for i in range(50):
+            skill = dict(catalog[rnd.randint(1, size)], id=size + i + 1)
+            started = time.perf_counter()
+            index.add(skill)
+            index.similar([skill["id"]])
+            updates.append(time.perf_counter() - started)
+        print(f"створення + запит: {percentiles(updates)}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000])
@@ -0,0 +1,77 @@
+"""
+Стрес-тест видачі ID навичок: кілька процесів-воркерів одночасно створюють
+тисячі навичок через asyncio.gather, після чого перевіряється, що всі ID унікальні.
+
+Працює з тимчасовою SQLite-базою, спільною для всіх воркерів. Запуск з кореня проєкту:
+    python -m benchmarks.skills_id_allocation 4 2000
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from settings import Base
+from src.enum_models import SkillCategory, SkillLevel
+from src.models import IdBlock, Skill
+from src.repository.skill_catalog import SkillCatalog
+
+
+async def _worker(path: str, creates: int) -> list:
+    # Кожен процес - зі своїм рушієм; timeout - очікування блокування запису SQLite
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 60})
+    catalog = SkillCatalog(session_factory=async_sessionmaker(bind=engine), max_batch=1000)
+    await catalog.start()
+    skill = {
+        "title": "Stress skill",
+        "description": "created by the id allocation stress test",
+        "category": SkillCategory.other,
+        "level": SkillLevel.beginner,
+        "can_teach": True,
+        "want_learn": False,
+    }
+    created = await asyncio.gather(*(catalog.create(dict(skill)) for _ in range(creates)))
+    await catalog.stop()
+    await engine.dispose()
+    return [s["id"] for s in created]
+
+
+def run_worker(args: tuple) -> list:
+    logging.disable(logging.INFO)
+    return asyncio.run(_worker(*args))
+
+
+def main(workers: int, creates: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "id_allocation.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    with Pool(workers) as pool:
+        results = pool.map(run_worker, [(path, creates)] * workers)
+    elapsed = time.perf_counter() - started
+
+    ids = [skill_id for worker_ids in results for skill_id in worker_ids]
+    duplicates = len(ids) - len(set(ids))
+    print(f"{workers} процесів x {creates} створень: {len(ids)} ID за {elapsed:.2f} s, дублікатів: {duplicates}")
+    assert duplicates == 0, "ID повторюються"
+
+    with engine.connect() as conn:
+        stored = conn.scalar(select(func.count()).select_from(Skill))
+        next_id = conn.scalar(select(IdBlock.next_id).where(IdBlock.name == "skills"))
+    print(f"навичок у БД: {stored}, наступний ID блоку: {next_id}")
+    assert stored == len(ids), "не всі навички записані в БД"
+
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args or [4, 2000]))
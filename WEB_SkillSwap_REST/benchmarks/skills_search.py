@@ -0,0 +1,89 @@
+"""
+Порівняння пошуку навичок: повний перебір (list comprehension) проти триграмного індексу.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.skills_search 100000 1000000
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from src.enum_models import SkillCategory, SkillLevel
+from src.repository.skill_index import SkillSearchIndex
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+
+def make_vocabulary(size: int, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    return ["".join(rnd.choices(ALPHABET, k=rnd.randint(4, 9))) for _ in range(size)]
+
+
+# Кілька популярних слів і великий "хвіст" рідкісних, як у реальному каталозі
+POPULAR = ["python", "guitar", "football", "english", "painting", "chemistry", "baking", "chess"]
+WORDS = make_vocabulary(20_000)
+QUERIES = ["python", "guitar lessons", WORDS[100], WORDS[200][:4], "yo", "not-existing-skill"]
+
+
+def make_catalog(size: int, seed: int = 42) -> dict:
+    rnd = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    categories = list(SkillCategory)
+    levels = list(SkillLevel)
+    catalog = {}
+    for skill_id in range(1, size + 1):
+        title = f"{rnd.choice(POPULAR)} {rnd.choice(WORDS)}" if rnd.random() < 0.2 else rnd.choice(WORDS)
+        can_teach = rnd.random() < 0.5
+        catalog[skill_id] = {
+            "id": skill_id,
+            "title": title,
+            "description": "I want to share " + " ".join(rnd.choices(WORDS, k=4)) + " lessons",
+            "category": rnd.choice(categories),
+            "level": rnd.choice(levels),
+            "can_teach": can_teach,
+            "want_learn": not can_teach and rnd.random() < 0.8,
+            "created_at": start + timedelta(seconds=skill_id),
+            "updated_at": start + timedelta(seconds=skill_id),
+        }
+    return catalog
+
+
+def linear_search(catalog: dict, query: str) -> list:
+    query = query.lower()
+    found = [s for s in catalog.values() if query in s["title"].lower() or query in s["description"].lower()]
+    found.sort(key=lambda x: x["created_at"], reverse=True)
+    return found
+
+
+def timeit(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main(sizes):
+    for size in sizes:
+        catalog = make_catalog(size)
+        index = SkillSearchIndex()
+        started = time.perf_counter()
+        for skill in catalog.values():
+            index.add(skill["id"], skill["title"], skill["description"])
+        build_ms = (time.perf_counter() - started) * 1000
+        print(f"\n{size} навичок, побудова індексу: {build_ms:.0f} ms")
+        print(f"{'запит':<22}{'знайдено':>10}{'перебір, ms':>14}{'індекс, ms':>14}")
+        for query in QUERIES:
+            expected = linear_search(catalog, query)
+            found = index.search(catalog, query)
+            assert {s["id"] for s in found} == {s["id"] for s in expected}
+            linear_ms = timeit(lambda: linear_search(catalog, query))
+            index_ms = timeit(lambda: index.search(catalog, query))
+            print(f"{query:<22}{len(found):>10}{linear_ms:>14.2f}{index_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
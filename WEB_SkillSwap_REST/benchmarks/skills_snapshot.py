@@ -0,0 +1,80 @@
+"""
+Час старту каталогу навичок: повна перебудова індексів проти знімка через mmap
+і відтворення журналу незаписаних змін поверх нього.
+
+Каталог вважається готовим, коли відповідає на перший пошук і fuzzy-запит.
+Час читання рядків з БД сюди не входить - тільки побудова в пам'яті.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.skills_snapshot 100000 1000000
+"""
+
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.skills_search import make_catalog
+from src.repository.skill_catalog import SkillCatalog
+
+JOURNAL_CHANGES = 1000
+
+
+def warm_up(catalog: SkillCatalog) -> None:
+    catalog.search_index.search(catalog.skills, "python")
+    catalog.fuzzy_index.similar([next(iter(catalog.skills))], k=5)
+
+
+def main(sizes):
+    for size in sizes:
+        skills = list(make_catalog(size).values())
+        path = os.path.join(tempfile.mkdtemp(), "skills.snapshot")
+
+        gc.collect()
+        started = time.perf_counter()
+        catalog = SkillCatalog(session_factory=None, snapshot_path=path)
+        for skill in skills:
+            catalog._index(skill)
+        warm_up(catalog)
+        rebuild = time.perf_counter() - started
+
+        catalog._synced_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        catalog.save_snapshot()
+        save = time.perf_counter() - started
+        megabytes = os.path.getsize(path) / 2**20
+
+        # Зміни, зроблені після знімка і ще не записані в БД
+        for skill in skills[:JOURNAL_CHANGES]:
+            catalog.update(skill["id"], {"title": skill["title"] + " advanced"})
+        catalog.journal.close()
+        del catalog, skills
+
+        gc.collect()
+        started = time.perf_counter()
+        restored = SkillCatalog(session_factory=None, snapshot_path=path)
+        restored.restore_snapshot()
+        restore = time.perf_counter() - started
+        # Створень у журналі немає, тож replay не звертається до БД
+        asyncio.run(restored.replay_journal())
+        replay = time.perf_counter() - started - restore
+        warm_up(restored)
+        warm = time.perf_counter() - started
+        assert len(restored.skills) == size and len(restored._updated) == JOURNAL_CHANGES
+
+        print(f"\n{size} навичок, знімок {megabytes:.1f} MB (запис {save:.2f} s)")
+        print(f"перебудова індексів:             {rebuild:8.2f} s")
+        print(f"знімок через mmap:               {restore:8.2f} s")
+        print(f"+ журнал ({JOURNAL_CHANGES} змін) і перший запит: {warm:8.2f} s (replay {replay * 1000:.0f} ms)")
+        print(f"прискорення:                     {rebuild / warm:8.1f}x")
+
+        restored.journal.close()
+        for name in (path, f"{path}.log"):
+            os.remove(name)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
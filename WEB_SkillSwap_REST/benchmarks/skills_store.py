@@ -0,0 +1,59 @@
+"""
+Пам'ять і швидкість фільтрації: каталог зі словників проти компактних SkillRecord.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.skills_store 100000 1000000
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from benchmarks.skills_search import make_catalog, timeit
+from src.enum_models import SkillCategory
+from src.repository.skill_store import CAN_TEACH, CATEGORY_CODES, SkillRecord
+
+
+def measure(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    store = build()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, used
+
+
+def main(sizes):
+    category = SkillCategory.music
+    code = CATEGORY_CODES[category]
+    for size in sizes:
+        # Рядки назв і описів спільні для обох варіантів, тому рахуємо тільки обгортки
+        dicts, dict_bytes = measure(lambda: make_catalog(size))
+        records, record_bytes = measure(lambda: {i: SkillRecord.from_dict(s) for i, s in dicts.items()})
+        strings = sum(sys.getsizeof(s["title"]) + sys.getsizeof(s["description"]) for s in dicts.values())
+
+        print(f"\n{size} навичок")
+        print(f"dict:        {(dict_bytes - strings) / size:.0f} B/навичку (+ {strings / size:.0f} B рядків)")
+        print(f"SkillRecord: {record_bytes / size:.0f} B/навичку")
+
+        def filter_dicts():
+            return [s for s in dicts.values() if s["category"] == category and s["can_teach"]]
+
+        def filter_records_mapping():
+            return [s for s in records.values() if s["category"] == category and s["can_teach"]]
+
+        def filter_records_codes():
+            return [s for s in records.values() if s.category_code == code and s.flags & CAN_TEACH]
+
+        assert len(filter_dicts()) == len(filter_records_mapping()) == len(filter_records_codes())
+        for label, func in (
+            ("dict", filter_dicts),
+            ("SkillRecord, record[key]", filter_records_mapping),
+            ("SkillRecord, коди і прапорці", filter_records_codes),
+        ):
+            ms = timeit(func)
+            print(f"фільтр category+can_teach, {label:<30}{ms:8.1f} ms ({size / ms / 1000:.1f} M навичок/с)")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
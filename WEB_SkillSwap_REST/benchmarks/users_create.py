@@ -0,0 +1,81 @@
+"""
+Пропускна здатність створення користувачів: дві попередні перевірки
+(get_user_by_email, get_user_by_username) + ORM add/commit/refresh проти
+одного INSERT ... RETURNING з перевіркою унікальності в БД.
+
+Кожен десятий запит - дублікат email, як у реальному потоці реєстрацій.
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.users_create 5000
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from settings import Base
+from src.models import User
+from src.repository import users as repository_users
+from src.schemas import UserCreate
+
+
+async def create_with_lookups(db, user: UserCreate):
+    """Колишній create_user: два SELECT перед INSERT"""
+    if await repository_users.get_user_by_email(db, user.email):
+        raise ValueError("Email вже зареєстрований")
+    if await repository_users.get_user_by_username(db, user.username):
+        raise ValueError("Username вже зайнятий")
+    db_user = User(**user.model_dump())
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+
+def make_users(count: int, prefix: str) -> list:
+    users = []
+    for i in range(count):
+        # Кожен десятий - повтор email попереднього користувача
+        email_id = i - 1 if i % 10 == 9 else i
+        users.append(UserCreate(username=f"{prefix}{i}", email=f"{prefix}{email_id}@ex.com", bio="hello"))
+    return users
+
+
+async def run_variant(create, users: list) -> tuple:
+    path = os.path.join(tempfile.mkdtemp(), "users.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine)
+
+    conflicts = 0
+    started = time.perf_counter()
+    for user in users:
+        # Як у запиті: нова сесія на кожне створення
+        async with session_factory() as db:
+            try:
+                await create(db, user)
+            except ValueError:
+                conflicts += 1
+    elapsed = time.perf_counter() - started
+
+    await engine.dispose()
+    os.remove(path)
+    return elapsed, conflicts
+
+
+async def main(count: int) -> None:
+    print(f"\n{count} реєстрацій (кожна десята - зайнятий email):")
+    for name, create in (
+        ("2 SELECT + INSERT", create_with_lookups),
+        ("INSERT ... RETURNING", repository_users.create_user),
+    ):
+        elapsed, conflicts = await run_variant(create, make_users(count, "user"))
+        print(f"{name:22} {count / elapsed:8.0f} створень/s  ({elapsed:.2f} s, конфліктів: {conflicts})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*[int(arg) for arg in sys.argv[1:]] or [5000]))
@@ -0,0 +1,103 @@
+"""
+Перевірка DataLoader-ів запиту: N окремих пошуків користувачів і навичок,
+зроблених одночасно, мають зібратися в один SQL-запит на кожен тип.
+
+Порівнюється з пошуком по одному ID (як робили GET /users/{id} у циклі).
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.users_dataloader 100
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from settings import Base
+from src.enum_models import SkillLevel
+from src.models import Skill, User
+from src.repository import users as repository_users
+from src.repository.entity_cache import entity_cache
+from src.repository.loaders import Loaders
+from src.repository.skill_catalog import skill_catalog
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+
+async def run(count: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "loaders.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine)
+
+    async with session_factory() as db:
+        await db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"u{i}@ex.com"} for i in range(1, count + 1)])
+        await db.execute(
+            insert(Skill),
+            [
+                {"id": i, "title": f"skill {i}", "description": "description", "category": "other",
+                 "level": SkillLevel.beginner}
+                for i in range(1, count + 1)
+            ],
+        )
+        await db.commit()
+
+    # Каталог з порожнім кешем: кожна навичка - промах, що йде в БД
+    skill_catalog.session_factory = session_factory
+    ids = list(range(1, count + 2))  # останнього ID немає
+
+    async with session_factory() as db:
+        with QueryCounter(engine) as one_by_one:
+            started = time.perf_counter()
+            singles = [await repository_users.get_user(db, user_id) for user_id in ids]
+            single_time = time.perf_counter() - started
+
+    # Пошуки по одному заповнили кеш сутностей - міряємо саме DataLoader
+    entity_cache.clear()
+    async with session_factory() as db:
+        loaders = Loaders(db)
+        with QueryCounter(engine) as batched:
+            started = time.perf_counter()
+            users = await asyncio.gather(*(loaders.users.load(user_id) for user_id in ids))
+            # Повторні пошуки беруться з кешу завантажувача
+            await asyncio.gather(*(loaders.users.load(user_id) for user_id in ids[:10]))
+            batched_time = time.perf_counter() - started
+
+        with QueryCounter(engine) as skill_queries:
+            skills = await asyncio.gather(*(loaders.skills.load(skill_id) for skill_id in ids))
+
+    assert users == singles
+    assert users[-1] is None and skills[-1] is None and all(skills[:-1])
+    assert batched.count == 1, f"користувачі: {batched.count} запитів"
+    assert skill_queries.count == 1, f"навички: {skill_queries.count} запитів"
+
+    print(f"\n{len(ids)} пошуків користувачів:")
+    print(f"по одному ID:   {one_by_one.count:4} запитів, {single_time * 1000:7.1f} ms")
+    print(f"DataLoader:     {batched.count:4} запит,   {batched_time * 1000:7.1f} ms")
+    print(f"{len(ids)} пошуків навичок (промахи кешу каталогу): {skill_queries.count} запит")
+
+    await engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*[int(arg) for arg in sys.argv[1:]] or [100]))
@@ -0,0 +1,143 @@
+"""
+Кількість SQL-запитів і пікова пам'ять для сторінки GET /users/ на 10k користувачів.
+
+Порівнюються колишнє завантаження всього графа (selectin для всіх зв'язків)
+та поточне get_users, що читає лише колонки UserResponse. Скрипт падає, якщо
+get_users робить більше одного запиту або перевищує бюджет пам'яті.
+
+Працює з тимчасовою SQLite-базою. Запуск з кореня проєкту:
+    python -m benchmarks.users_list 10000
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from benchmarks.exchanges_pagination import participants
+from settings import Base
+from src.enum_models import ExchangeStatus, SkillLevel
+from src.models import Exchange, Review, Skill, User, skill_user_association
+from src.repository import users as repository_users
+from src.schemas import UserResponse
+
+# Бюджет пам'яті на користувача сторінки для get_users
+MAX_BYTES_PER_USER = 3072
+
+# Так GET /users/ вантажив дані, коли всі зв'язки були lazy="selectin"
+FULL_GRAPH = (
+    selectinload(User.skills).selectinload(Skill.exchanges),
+    selectinload(User.sent_exchanges).options(
+        selectinload(Exchange.receiver), selectinload(Exchange.skill), selectinload(Exchange.reviews)
+    ),
+    selectinload(User.received_exchanges).options(selectinload(Exchange.sender), selectinload(Exchange.skill)),
+    selectinload(User.given_reviews).selectinload(Review.reviewed),
+    selectinload(User.received_reviews).selectinload(Review.reviewer),
+)
+
+
+async def populate(session_factory, users: int) -> None:
+    rnd = random.Random(3)
+    skills = users // 5
+    async with session_factory() as db:
+        await db.execute(
+            insert(User),
+            [
+                {"id": i, "username": f"user{i}", "email": f"user{i}@ex.com", "bio": "bio " * 20}
+                for i in range(1, users + 1)
+            ],
+        )
+        await db.execute(
+            insert(Skill),
+            [
+                {"id": i, "title": f"skill {i}", "description": "description " * 10, "category": "other",
+                 "level": SkillLevel.beginner}
+                for i in range(1, skills + 1)
+            ],
+        )
+        await db.execute(
+            insert(skill_user_association),
+            [{"user_id": i, "skill_id": rnd.randint(1, skills)} for i in range(1, users + 1) for _ in range(3)],
+        )
+        exchanges = [
+            {"id": i, **participants(rnd, users),
+             "skill_id": rnd.randint(1, skills), "message": "let's exchange " * 5, "status": ExchangeStatus.pending}
+            for i in range(1, users * 2 + 1)
+        ]
+        await db.execute(insert(Exchange), exchanges)
+        await db.execute(
+            insert(Review),
+            [
+                {"exchange_id": e["id"], "reviewer_id": e["sender_id"], "reviewed_id": e["receiver_id"],
+                 "rating": 5, "comment": "great"}
+                for e in exchanges[::2]
+            ],
+        )
+        await db.commit()
+
+
+async def measure(engine, session_factory, load, limit: int) -> tuple:
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    tracemalloc.start()
+    started = time.perf_counter()
+    async with session_factory() as db:
+        page = [UserResponse.model_validate(user) for user in await load(db, limit)]
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+    assert len(page) == limit
+    return len(statements), peak, elapsed
+
+
+async def load_full_graph(db, limit: int):
+    result = await db.scalars(select(User).options(*FULL_GRAPH).order_by(User.id).limit(limit))
+    return result.all()
+
+
+async def load_lean(db, limit: int):
+    return await repository_users.get_users(db, 0, limit)
+
+
+async def run(users: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "users.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine)
+    await populate(session_factory, users)
+
+    print(f"\nсторінка з {users} користувачів:")
+    results = {}
+    for name, load in (("весь граф (selectin)", load_full_graph), ("get_users (колонки)", load_lean)):
+        queries, peak, elapsed = await measure(engine, session_factory, load, users)
+        results[name] = (queries, peak)
+        print(f"{name:22} запитів: {queries:3}, пік пам'яті: {peak / 2**20:7.1f} MB, час: {elapsed:.2f} s")
+
+    queries, peak = results["get_users (колонки)"]
+    assert queries == 1, f"get_users зробив {queries} запитів"
+    assert peak <= users * MAX_BYTES_PER_USER, f"get_users використав {peak} байт"
+
+    await engine.dispose()
+    os.remove(path)
+
+
+def main(sizes):
+    for size in sizes:
+        asyncio.run(run(size))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000])
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 import uvicorn
@@ -6,14 +7,29 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from settings import get_db
+from src.repository.exchange_counts import exchange_counts_reconciler
+from src.repository.skill_catalog import skill_catalog
 from src.routes import skills, statistic, users, exchanges
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Каталог навичок живе в пам'яті, а зміни у фоні записуються в таблицю skills
+    await skill_catalog.start()
+    # Лічильники обмінів змінюються разом з обмінами; звірка виправляє розбіжності
+    exchange_counts_reconciler.start()
+    yield
+    await exchange_counts_reconciler.stop()
+    await skill_catalog.stop()
+
+
 # Створюємо екземпляр FastAPI з метаданами
 app = FastAPI(
     title="SkillSwap API",
     description="API для платформи обміну навичками між підлітками",
     version="1.0.0",
     contact={"name": "SkillSwap Team", "email": "support@skillswap.com"},
+    lifespan=lifespan,
 )
 
 # Підключаємо роутери
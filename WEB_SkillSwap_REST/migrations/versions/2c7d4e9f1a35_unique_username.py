@@ -0,0 +1,30 @@
+"""unique username
+
+Revision ID: 2c7d4e9f1a35
+Revises: 8e3f0a6c1b27
+Create Date: 2026-10-17 14:05:12.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2c7d4e9f1a35"
+down_revision: Union[str, Sequence[str], None] = "8e3f0a6c1b27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_user покладається на унікальний індекс замість попередньої перевірки
+    op.drop_index(op.f("ix_users_username"), table_name="users")
+    op.create_index(op.f("ix_users_username"), "users", ["username"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_users_username"), table_name="users")
+    op.create_index(op.f("ix_users_username"), "users", ["username"], unique=False)
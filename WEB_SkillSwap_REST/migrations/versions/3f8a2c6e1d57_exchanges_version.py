@@ -0,0 +1,29 @@
+"""exchanges version
+
+Revision ID: 3f8a2c6e1d57
+Revises: 9b4e1d7c3f62
+Create Date: 2026-10-17 20:41:09.527146
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8a2c6e1d57"
+down_revision: Union[str, Sequence[str], None] = "9b4e1d7c3f62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Константний DEFAULT не переписує таблицю: наявні обміни отримують версію 1
+    op.add_column("exchanges", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("exchanges", "version")
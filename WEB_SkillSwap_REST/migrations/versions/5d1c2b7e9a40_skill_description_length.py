@@ -0,0 +1,41 @@
+"""skill description length
+
+Revision ID: 5d1c2b7e9a40
+Revises: 4853c1c90588
+Create Date: 2026-10-17 10:12:31.418204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d1c2b7e9a40"
+down_revision: Union[str, Sequence[str], None] = "4853c1c90588"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SkillCreate дозволяє опис до 500 символів
+    op.alter_column(
+        "skills",
+        "description",
+        existing_type=sa.String(length=100),
+        type_=sa.String(length=500),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        "skills",
+        "description",
+        existing_type=sa.String(length=500),
+        type_=sa.String(length=100),
+        existing_nullable=False,
+    )
@@ -0,0 +1,33 @@
+"""exchanges keyset index
+
+Revision ID: 6a1f3c8d2b94
+Revises: 2c7d4e9f1a35
+Create Date: 2026-10-17 15:22:47.602913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6a1f3c8d2b94"
+down_revision: Union[str, Sequence[str], None] = "2c7d4e9f1a35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Курсорна пагінація /exchanges гортає за (created_at, id).
+    # CREATE INDEX CONCURRENTLY не блокує запис у таблицю, але не може йти в транзакції
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_exchanges_created_at_id", "exchanges", ["created_at", "id"], unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_exchanges_created_at_id", table_name="exchanges", postgresql_concurrently=True)
@@ -0,0 +1,45 @@
+"""exchanges not self check
+
+Revision ID: 7c2e5a9f4b18
+Revises: 3f8a2c6e1d57
+Create Date: 2026-10-17 21:37:52.864105
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e5a9f4b18"
+down_revision: Union[str, Sequence[str], None] = "3f8a2c6e1d57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_exchange покладається на обмеження замість попередньої перевірки.
+    # Обміни з самим собою, що могли з'явитися раніше, міграція не чіпає: це дані
+    # користувачів, і рішення щодо них - за оператором
+    if not context.is_offline_mode():
+        offending = op.get_bind().scalar(sa.text("SELECT count(*) FROM exchanges WHERE sender_id = receiver_id"))
+        if offending:
+            raise RuntimeError(
+                f"exchanges has {offending} rows with sender_id = receiver_id; "
+                "fix or delete them before adding ck_exchanges_not_self"
+            )
+    # NOT VALID не сканує таблицю під блокуванням; VALIDATE бере слабше блокування
+    # (SHARE UPDATE EXCLUSIVE), але тільки у власній транзакції - після коміту ADD,
+    # інакше ACCESS EXCLUSIVE від ADD тримався б усю перевірку
+    op.create_check_constraint(
+        "ck_exchanges_not_self", "exchanges", "sender_id <> receiver_id", postgresql_not_valid=True
+    )
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE exchanges VALIDATE CONSTRAINT ck_exchanges_not_self")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("ck_exchanges_not_self", "exchanges", type_="check")
@@ -0,0 +1,35 @@
+"""id blocks
+
+Revision ID: 8e3f0a6c1b27
+Revises: 5d1c2b7e9a40
+Create Date: 2026-10-17 11:40:05.921377
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e3f0a6c1b27"
+down_revision: Union[str, Sequence[str], None] = "5d1c2b7e9a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "id_blocks",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("next_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    # Послідовність навичок продовжує вже збережені ID
+    op.execute("INSERT INTO id_blocks (name, next_id) SELECT 'skills', COALESCE(MAX(id), 0) + 1 FROM skills")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("id_blocks")
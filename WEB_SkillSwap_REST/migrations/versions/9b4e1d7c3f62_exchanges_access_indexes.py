@@ -0,0 +1,48 @@
+"""exchanges access indexes
+
+Revision ID: 9b4e1d7c3f62
+Revises: 6a1f3c8d2b94
+Create Date: 2026-10-17 18:04:11.318420
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b4e1d7c3f62"
+down_revision: Union[str, Sequence[str], None] = "6a1f3c8d2b94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_exchanges_sender_created_at", ["sender_id", "created_at", "id"], {}),
+    ("ix_exchanges_receiver_created_at", ["receiver_id", "created_at", "id"], {}),
+    ("ix_exchanges_status_created_at", ["status", "created_at", "id"], {}),
+    ("ix_exchanges_skill_created_at", ["skill_id", "created_at", "id"], {}),
+    (
+        "ix_exchanges_pending_receiver",
+        ["receiver_id", "created_at", "id"],
+        {
+            "postgresql_where": sa.text("status = 'pending'"),
+            "sqlite_where": sa.text("status = 'pending'"),
+        },
+    ),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY не блокує запис у таблицю, але не може йти в транзакції
+    with op.get_context().autocommit_block():
+        for name, columns, kwargs in INDEXES:
+            op.create_index(name, "exchanges", columns, unique=False, postgresql_concurrently=True, **kwargs)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name="exchanges", postgresql_concurrently=True)
@@ -0,0 +1,35 @@
+"""skill deletions
+
+Revision ID: b3d6f8a2e471
+Revises: e5b7a3d91c06
+Create Date: 2026-10-18 10:26:03.184592
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d6f8a2e471"
+down_revision: Union[str, Sequence[str], None] = "e5b7a3d91c06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "skill_deletions",
+        sa.Column("skill_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("skill_id"),
+    )
+    op.create_index(op.f("ix_skill_deletions_deleted_at"), "skill_deletions", ["deleted_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_skill_deletions_deleted_at"), table_name="skill_deletions")
+    op.drop_table("skill_deletions")
@@ -0,0 +1,62 @@
+"""user exchange counts
+
+Revision ID: e5b7a3d91c06
+Revises: 7c2e5a9f4b18
+Create Date: 2026-10-17 23:12:40.672519
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b7a3d91c06"
+down_revision: Union[str, Sequence[str], None] = "7c2e5a9f4b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_exchange_counts",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("incoming_pending", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("outgoing_pending", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("accepted", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # Початкові значення - з наявних обмінів, по кожній ролі окремо. Записи, зроблені
+    # між міграцією і запуском нового коду, виправить фонова звірка
+    op.execute(
+        """
+        INSERT INTO user_exchange_counts (user_id, incoming_pending, outgoing_pending, accepted)
+        SELECT user_id, SUM(incoming_pending), SUM(outgoing_pending), SUM(accepted)
+        FROM (
+            SELECT receiver_id AS user_id,
+                   SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) AS incoming_pending,
+                   0 AS outgoing_pending,
+                   SUM(CASE WHEN status = 'accepted' THEN 1 ELSE 0 END) AS accepted
+            FROM exchanges
+            WHERE status IN ('pending', 'accepted')
+            GROUP BY receiver_id
+            UNION ALL
+            SELECT sender_id,
+                   0,
+                   SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status = 'accepted' THEN 1 ELSE 0 END)
+            FROM exchanges
+            WHERE status IN ('pending', 'accepted')
+            GROUP BY sender_id
+        ) AS per_role
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_exchange_counts")
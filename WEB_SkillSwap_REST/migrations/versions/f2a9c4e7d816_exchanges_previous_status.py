@@ -0,0 +1,39 @@
+"""exchanges previous status
+
+Revision ID: f2a9c4e7d816
+Revises: b3d6f8a2e471
+Create Date: 2026-10-18 01:47:09.215384
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a9c4e7d816"
+down_revision: Union[str, Sequence[str], None] = "b3d6f8a2e471"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Колонка без DEFAULT не переписує таблицю; тип exchangestatus уже існує
+    op.add_column(
+        "exchanges",
+        sa.Column(
+            "previous_status",
+            postgresql.ENUM(
+                "pending", "accepted", "rejected", "completed", "cancelled", name="exchangestatus", create_type=False
+            ),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("exchanges", "previous_status")
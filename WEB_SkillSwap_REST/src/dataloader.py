@@ -0,0 +1,78 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Mapping, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Збирає окремі load(key) в один пакетний запит.
+
+    Ключі, запитані в одному проході циклу подій (наприклад, через asyncio.gather),
+    передаються в batch_load одним списком; batch_load повертає словник
+    ключ -> значення, відсутні ключі дають None. Результати кешуються, тож
+    повторний load того ж ключа вже не звертається до БД. Екземпляр живе
+    в межах одного запиту.
+    """
+
+    def __init__(self, batch_load: Callable[[List[K]], Awaitable[Mapping[K, V]]], max_batch: int = 1000):
+        self.batch_load = batch_load
+        self.max_batch = max_batch
+        self._cache: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        # Цикл подій тримає задачі лише слабкими посиланнями: без цього набору
+        # задачу пакета може прибрати GC, і всі load() зависнуть
+        self._tasks: Set[asyncio.Task] = set()
+        # Пакети виконуються по черзі: batch_load часто ділить одну сесію БД
+        self._lock = asyncio.Lock()
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        future = self._cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._cache[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                # Пакет відправляється, коли всі задачі поточного проходу вже додали ключі
+                loop.call_soon(self._schedule_dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _schedule_dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._dispatch(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _fail(self, keys: List[K], error: Optional[BaseException]) -> None:
+        """Завершити очікування ключів помилкою (None - скасуванням); наступний load спробує знову"""
+        for key in keys:
+            future = self._cache.pop(key, None)
+            if future is not None and not future.done():
+                if error is None:
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+
+    async def _dispatch(self, keys: List[K]) -> None:
+        for start in range(0, len(keys), self.max_batch):
+            chunk = keys[start : start + self.max_batch]
+            try:
+                async with self._lock:
+                    values = await self.batch_load(chunk)
+            except Exception as e:
+                # Помилку отримують усі, хто чекав на ключі цього пакета
+                self._fail(chunk, e)
+                continue
+            except BaseException:
+                # Скасування: ключі цього і ще не виконаних пакетів не лишаються без відповіді
+                self._fail(keys[start:], None)
+                raise
+
+            for key in chunk:
+                future = self._cache[key]
+                if not future.done():
+                    future.set_result(values.get(key))
@@ -0,0 +1,13 @@
+"""
+Профілі завантаження зв'язків.
+
+Усі зв'язки моделей оголошені з lazy="raise", тож запит отримує лише те,
+що явно попросив. Профіль - кортеж опцій для select(...).options(*profile).
+"""
+
+from sqlalchemy.orm import selectinload
+
+from src.models.user_skills import User
+
+# Користувач з його навичками (GET /users/{id}/skills)
+USER_WITH_SKILLS = (selectinload(User.skills),)
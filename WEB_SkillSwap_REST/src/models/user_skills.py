@@ -1,13 +1,19 @@
 import datetime as dt
 
-from sqlalchemy import Boolean, Column, DateTime
+from sqlalchemy import Boolean, CheckConstraint, Column, DateTime
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, Integer, String, Table, Text, func
+from sqlalchemy import ForeignKey, Index, Integer, String, Table, Text, func, text
+from sqlalchemy.dialects.sqlite import DATETIME as SQLiteDateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from settings import Base
 from src.enum_models import ExchangeStatus, SkillLevel
 
+# SQLite зберігає дату рядком: CURRENT_TIMESTAMP пише секунди, а SQLAlchemy - ще й
+# мікросекунди, і рядки одного моменту порівнюються як різні. Для колонок, за якими
+# гортає cursor, формат має бути один
+KeysetDateTime = DateTime(timezone=True).with_variant(SQLiteDateTime(truncate_microseconds=True), "sqlite")
+
 skill_user_association = Table(
     "skill_user_association",
     Base.metadata,
@@ -21,7 +27,7 @@ class User(Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    username: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    username: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, index=True)
     email: Mapped[str] = mapped_column(String(100), unique=True, nullable=False, index=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     full_name: Mapped[str] = mapped_column(String(100), nullable=True)
@@ -43,36 +49,38 @@ class User(Base):
 
 
     # Relationships
+    # Зв'язки не вантажаться неявно (lazy="raise"): потрібні підвантажуються
+    # явно профілями з src/models/loading.py
     skills: Mapped[list["Skill"]] = relationship(
         "Skill",
         secondary=skill_user_association,
         back_populates="users",
-        lazy="selectin",
+        lazy="raise",
     )
 
     sent_exchanges = relationship(
         "Exchange",
         foreign_keys="Exchange.sender_id",
         back_populates="sender",
-        lazy="selectin",
+        lazy="raise",
     )
     received_exchanges = relationship(
         "Exchange",
         foreign_keys="Exchange.receiver_id",
         back_populates="receiver",
-        lazy="selectin",
+        lazy="raise",
     )
     given_reviews = relationship(
         "Review",
         foreign_keys="Review.reviewer_id",
         back_populates="reviewer",
-        lazy="selectin",
+        lazy="raise",
     )
     received_reviews = relationship(
         "Review",
         foreign_keys="Review.reviewed_id",
         back_populates="reviewed",
-        lazy="selectin",
+        lazy="raise",
     )
 
     def __str__(self):
@@ -84,7 +92,7 @@ class Skill(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
-    description: Mapped[str] = mapped_column(String(100), nullable=False)
+    description: Mapped[str] = mapped_column(String(500), nullable=False)
     category: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
     level: Mapped[SkillLevel] = mapped_column(SQLEnum(SkillLevel), nullable=False)
 
@@ -103,13 +111,33 @@ class Skill(Base):
         "User",
         secondary="skill_user_association",
         back_populates="skills",
-        lazy="selectin",
+        lazy="raise",
     )
-    exchanges = relationship("Exchange", back_populates="skill", lazy="selectin")
+    exchanges = relationship("Exchange", back_populates="skill", lazy="raise")
 
 
 class Exchange(Base):
     __tablename__ = "exchanges"
+    __table_args__ = (
+        # Обмін із самим собою відхиляє БД: create_exchange не перевіряє це окремо
+        CheckConstraint("sender_id <> receiver_id", name="ck_exchanges_not_self"),
+        # Ключ курсорної пагінації списків обмінів (новіші першими)
+        Index("ix_exchanges_created_at_id", "created_at", "id"),
+        # Фільтр за учасником або статусом + той самий порядок (created_at, id)
+        Index("ix_exchanges_sender_created_at", "sender_id", "created_at", "id"),
+        Index("ix_exchanges_receiver_created_at", "receiver_id", "created_at", "id"),
+        Index("ix_exchanges_status_created_at", "status", "created_at", "id"),
+        Index("ix_exchanges_skill_created_at", "skill_id", "created_at", "id"),
+        # Вхідні запити, що чекають відповіді: лише pending-рядки, тож індекс малий
+        Index(
+            "ix_exchanges_pending_receiver",
+            "receiver_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     sender_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -118,17 +146,22 @@ class Exchange(Base):
     message: Mapped[str] = mapped_column(Text)
     status: Mapped[ExchangeStatus] = mapped_column(SQLEnum(ExchangeStatus), default=ExchangeStatus.pending)
     hours_proposed: Mapped[int] = mapped_column(default=1)
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=True)
+    # Зростає з кожним записом: клієнт передає відому йому версію, щоб не затерти чужу зміну
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    # Статус до останньої його зміни: UPDATE записує сюди старе значення, і RETURNING
+    # віддає пару (було, стало), потрібну лічильникам обмінів
+    previous_status: Mapped[ExchangeStatus] = mapped_column(SQLEnum(ExchangeStatus), nullable=True)
+    created_at: Mapped[dt.datetime] = mapped_column(KeysetDateTime, server_default=func.now(), nullable=True)
     updated_at: Mapped[dt.datetime] = mapped_column(
-        DateTime(timezone=True), onupdate=func.now(), server_default=func.now(), nullable=True
+        KeysetDateTime, onupdate=func.now(), server_default=func.now(), nullable=True
     )
 
-    sender: Mapped["User"] = relationship(back_populates="sent_exchanges", foreign_keys=[sender_id], lazy="selectin")
+    sender: Mapped["User"] = relationship(back_populates="sent_exchanges", foreign_keys=[sender_id], lazy="raise")
     receiver: Mapped["User"] = relationship(
-        back_populates="received_exchanges", foreign_keys=[receiver_id], lazy="selectin"
+        back_populates="received_exchanges", foreign_keys=[receiver_id], lazy="raise"
     )
-    skill: Mapped["Skill"] = relationship(back_populates="exchanges", lazy="selectin")
-    reviews: Mapped[list["Review"]] = relationship(back_populates="exchange", lazy="selectin")
+    skill: Mapped["Skill"] = relationship(back_populates="exchanges", lazy="raise")
+    reviews: Mapped[list["Review"]] = relationship(back_populates="exchange", lazy="raise")
 
     def __str__(self):
         return (
@@ -150,19 +183,59 @@ class Review(Base):
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=True)
 
     # Relationships
-    exchange = relationship("Exchange", back_populates="reviews")
+    exchange = relationship("Exchange", back_populates="reviews", lazy="raise")
     reviewer = relationship(
         "User",
         foreign_keys=[reviewer_id],
         back_populates="given_reviews",
-        lazy="selectin",
+        lazy="raise",
     )
     reviewed = relationship(
         "User",
         foreign_keys=[reviewed_id],
         back_populates="received_reviews",
-        lazy="selectin",
+        lazy="raise",
     )
 
     def __str__(self):
         return f"<Review: {self.reviewer_id} to {self.reviewed_id} -- {self.rating}>"
+
+
+class SkillDeletion(Base):
+    __tablename__ = "skill_deletions"
+
+    # Надгробки видалених навичок: каталоги інших воркерів дізнаються про видалення,
+    # читаючи лише нові записи, а не всі ID таблиці skills
+    skill_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    deleted_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __str__(self):
+        return f"<SkillDeletion: {self.skill_id} -- {self.deleted_at}>"
+
+
+class UserExchangeCounts(Base):
+    __tablename__ = "user_exchange_counts"
+
+    # Лічильники для бейджів: змінюються в тій самій транзакції, що й обміни
+    # (src/repository/exchange_counts.py), тож читання не залежить від історії
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    incoming_pending: Mapped[int] = mapped_column(default=0, server_default="0")
+    outgoing_pending: Mapped[int] = mapped_column(default=0, server_default="0")
+    accepted: Mapped[int] = mapped_column(default=0, server_default="0")
+
+    def __str__(self):
+        return (
+            f"<UserExchangeCounts: {self.user_id} -- incoming {self.incoming_pending}, "
+            f"outgoing {self.outgoing_pending}, accepted {self.accepted}>"
+        )
+
+
+class IdBlock(Base):
+    __tablename__ = "id_blocks"
+
+    # Назва послідовності (наприклад, "skills") і перший ще не виданий ID
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    next_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __str__(self):
+        return f"<IdBlock: {self.name} -- {self.next_id}>"
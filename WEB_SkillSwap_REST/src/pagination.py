@@ -0,0 +1,32 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"Неможливо закодувати {type(value).__name__} у cursor")
+
+
+def encode_cursor(*values: Any) -> str:
+    """Закодувати значення ключа останнього запису сторінки в непрозорий рядок."""
+    raw = json.dumps(values, default=_json_default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Розкодувати cursor. Для пошкодженого значення піднімається ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Некоректний cursor") from e
+
+    if not isinstance(values, list):
+        raise ValueError("Некоректний cursor")
+    return values
@@ -1,2 +1,3 @@
 from .users import *
-from .exchanges import *
\ No newline at end of file
+from .exchanges import *
+from .skills import *
@@ -0,0 +1,200 @@
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models import Exchange, User
+
+# Моделі, записи яких кешуються; ключ кешу - назва моделі
+CACHED_MODELS = {User: "User", Exchange: "Exchange"}
+
+CacheKey = Tuple[str, str, Hashable]
+
+
+class EntityCache:
+    """
+    LRU-кеш сутностей за первинним і унікальними ключами з обмеженим часом життя.
+
+    Один запис доступний за кількома ключами (id, email, username); інвалідація за
+    id прибирає всі. Записи скидаються після коміту, що змінив сутність (події
+    SQLAlchemy нижче), а ttl обмежує застарілість щодо змін інших процесів.
+    Порожні результати не кешуються.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 60.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        # (сутність, id) -> всі ключі, під якими лежить запис, і навпаки
+        self._aliases: Dict[Tuple[str, Hashable], Set[CacheKey]] = defaultdict(set)
+        self._owners: Dict[CacheKey, Tuple[str, Hashable]] = {}
+        # Лічильник інвалідацій сутності: значення, прочитане до інвалідації, не кешується
+        self._generations: Dict[str, int] = defaultdict(int)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, entity: str, key_name: str, key_value: Hashable) -> Optional[Any]:
+        key = (entity, key_name, key_value)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def generation(self, entity: str) -> int:
+        """Поточне покоління сутності; передається в put для значення, прочитаного з БД."""
+        return self._generations[entity]
+
+    def put(self, entity: str, value: Any, keys: Dict[str, Hashable], generation: int) -> None:
+        """
+        Покласти значення під ключами keys (обов'язково з "id").
+
+        Якщо після читання (generation) сутність інвалідувалась, значення могло
+        застаріти - тоді воно не кешується.
+        """
+        if value is None or generation != self._generations[entity]:
+            return
+
+        expires_at = self.clock() + self.ttl
+        owner = (entity, keys["id"])
+        for key_name, key_value in keys.items():
+            key = (entity, key_name, key_value)
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            self._aliases[owner].add(key)
+            self._owners[key] = owner
+
+        while len(self._entries) > self.max_size:
+            key, _ = self._entries.popitem(last=False)
+            self._forget_alias(key)
+            self.evictions += 1
+
+    def invalidate(self, entity: str, entity_id: Hashable) -> None:
+        """Прибрати запис сутності за id разом з усіма його ключами."""
+        self._generations[entity] += 1
+        for key in self._aliases.pop((entity, entity_id), ()):
+            self._owners.pop(key, None)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_all(self, entity: str) -> None:
+        """Прибрати всі записи сутності (масові UPDATE/DELETE без відомих id)."""
+        self._generations[entity] += 1
+        for key in [key for key in self._entries if key[0] == entity]:
+            self._drop(key)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        for entity in list(self._generations):
+            self._generations[entity] += 1
+        self._entries.clear()
+        self._aliases.clear()
+        self._owners.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        self._forget_alias(key)
+
+    def _forget_alias(self, key: CacheKey) -> None:
+        owner = self._owners.pop(key, None)
+        aliases = self._aliases.get(owner)
+        if aliases is not None:
+            aliases.discard(key)
+            if not aliases:
+                del self._aliases[owner]
+
+
+entity_cache = EntityCache()
+
+
+# ---- інвалідація за подіями сесії ----
+
+
+def _pending(session: Session) -> Set[Tuple[str, Optional[Hashable]]]:
+    return session.info.setdefault("entity_cache_pending", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed(session: Session, flush_context) -> None:
+    """Змінені й видалені в цьому flush сутності скидаються з кешу після коміту."""
+    for obj in list(session.dirty) + list(session.deleted):
+        entity = CACHED_MODELS.get(type(obj))
+        if entity is not None and obj.id is not None:
+            _pending(session).add((entity, obj.id))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk(orm_execute_state):
+    """
+    Масові update()/delete() не проходять через flush. Якщо оператор повертає id
+    (RETURNING), скидаються саме ці записи, інакше - вся сутність.
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    entity = CACHED_MODELS.get(mapper.class_) if mapper is not None else None
+    if entity is None:
+        return None
+
+    pending = _pending(orm_execute_state.session)
+    if not orm_execute_state.statement.exported_columns:
+        pending.add((entity, None))
+        return None
+
+    # Виконуємо оператор самі, щоб дізнатися id, і віддаємо викликачу копію результату.
+    # Ключі беремо з результату: RETURNING може містити підзапити й цілі сутності
+    frozen = orm_execute_state.invoke_statement().freeze()
+    result = frozen()
+    returning = list(result.keys())
+    if "id" in returning:
+        position = returning.index("id")
+        pending.update((entity, row[position]) for row in result.all())
+    else:
+        pending.add((entity, None))
+    return frozen()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for entity, entity_id in session.info.pop("entity_cache_pending", ()):
+        if entity_id is None:
+            entity_cache.invalidate_all(entity)
+        else:
+            entity_cache.invalidate(entity, entity_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop("entity_cache_pending", None)
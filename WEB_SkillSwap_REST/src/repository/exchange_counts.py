@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Insert, Row, Select, func, literal, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from settings import async_session
+from src.models.user_skills import Exchange, ExchangeStatus, User, UserExchangeCounts
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ("incoming_pending", "outgoing_pending", "accepted")
+
+# (відправник, отримувач, статус до, статус після); None - обміну не було або не стало
+Transition = Tuple[int, int, Optional[ExchangeStatus], Optional[ExchangeStatus]]
+
+
+def _count(changes: Dict[int, Counter], sender_id: int, receiver_id: int, status: ExchangeStatus, sign: int) -> None:
+    if status == ExchangeStatus.pending:
+        changes[receiver_id]["incoming_pending"] += sign
+        changes[sender_id]["outgoing_pending"] += sign
+    elif status == ExchangeStatus.accepted:
+        changes[sender_id]["accepted"] += sign
+        changes[receiver_id]["accepted"] += sign
+
+
+def count_changes(transitions: Iterable[Transition]) -> Dict[int, Counter]:
+    """Зміни лічильників кожного користувача від переходів статусів обмінів"""
+    changes: Dict[int, Counter] = defaultdict(Counter)
+    for sender_id, receiver_id, old_status, new_status in transitions:
+        if old_status is not None:
+            _count(changes, sender_id, receiver_id, old_status, -1)
+        if new_status is not None:
+            _count(changes, sender_id, receiver_id, new_status, 1)
+    return changes
+
+
+_upserts: Dict[Tuple[str, bool], Insert] = {}
+
+
+def _upsert(db: AsyncSession, increment: bool) -> Insert:
+    """
+    INSERT ... ON CONFLICT DO UPDATE діалекту сесії: додати значення або записати поверх.
+
+    Оператор будується раз на діалект і виконується з рядками як executemany -
+    запис обміну не платить за побудову й компіляцію SQL. Таблиця, а не модель:
+    ORM-шлях масової вставки тут зайвий.
+    """
+    dialect = db.get_bind().dialect.name
+    stmt = _upserts.get((dialect, increment))
+    if stmt is None:
+        table = UserExchangeCounts.__table__
+        insert = postgresql.insert(table) if dialect == "postgresql" else sqlite.insert(table)
+        stmt = insert.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                name: table.c[name] + insert.excluded[name] if increment else insert.excluded[name]
+                for name in COUNTERS
+            },
+        )
+        _upserts[(dialect, increment)] = stmt
+    return stmt
+
+
+_inserts: Dict[str, Insert] = {}
+
+
+def _insert_missing(db: AsyncSession) -> Insert:
+    """INSERT ... ON CONFLICT DO NOTHING діалекту сесії: нульовий рядок лічильників, якщо його ще немає"""
+    dialect = db.get_bind().dialect.name
+    stmt = _inserts.get(dialect)
+    if stmt is None:
+        table = UserExchangeCounts.__table__
+        insert = postgresql.insert(table) if dialect == "postgresql" else sqlite.insert(table)
+        stmt = _inserts[dialect] = insert.on_conflict_do_nothing(index_elements=[table.c.user_id])
+    return stmt
+
+
+async def apply_count_changes(db: AsyncSession, changes: Dict[int, Counter]) -> None:
+    """
+    Додати зміни до лічильників у поточній транзакції (без коміту).
+
+    Один оператор на всіх користувачів; рядок лічильників, якого ще немає,
+    створюється. Користувачі йдуть за зростанням id, щоб паралельні транзакції
+    блокували рядки в одному порядку.
+    """
+    rows = [
+        {"user_id": user_id, **{name: counters[name] for name in COUNTERS}}
+        for user_id, counters in sorted(changes.items())
+        if any(counters[name] for name in COUNTERS)
+    ]
+    if rows:
+        await db.execute(_upsert(db, increment=True), rows)
+
+
+async def get_exchange_counts(db: AsyncSession, user_id: int) -> Optional[Row]:
+    """Лічильники користувача - читання за первинним ключем; None, якщо користувача немає"""
+    stmt = (
+        select(
+            User.id.label("user_id"),
+            *(func.coalesce(getattr(UserExchangeCounts, name), 0).label(name) for name in COUNTERS),
+        )
+        .outerjoin(UserExchangeCounts, UserExchangeCounts.user_id == User.id)
+        .where(User.id == user_id)
+    )
+    result = await db.execute(stmt)
+    return result.first()
+
+
+def _actual_counts(user_ids: List[int]) -> Select:
+    """Лічильники user_ids, пораховані з таблиці exchanges - індексами (учасник, ...)"""
+    pending, accepted = ExchangeStatus.pending, ExchangeStatus.accepted
+    return union_all(
+        select(Exchange.receiver_id.label("user_id"), literal("incoming_pending").label("counter"), func.count().label("value"))
+        .where(Exchange.receiver_id.in_(user_ids), Exchange.status == pending)
+        .group_by(Exchange.receiver_id),
+        select(Exchange.sender_id, literal("outgoing_pending"), func.count())
+        .where(Exchange.sender_id.in_(user_ids), Exchange.status == pending)
+        .group_by(Exchange.sender_id),
+        select(Exchange.sender_id, literal("accepted"), func.count())
+        .where(Exchange.sender_id.in_(user_ids), Exchange.status == accepted)
+        .group_by(Exchange.sender_id),
+        select(Exchange.receiver_id, literal("accepted"), func.count())
+        .where(Exchange.receiver_id.in_(user_ids), Exchange.status == accepted)
+        .group_by(Exchange.receiver_id),
+    )
+
+
+async def reconcile_exchange_counts(db: AsyncSession, batch_size: int = 1000) -> int:
+    """
+    Звірити лічильники з таблицею exchanges і виправити розбіжності.
+
+    Користувачі обробляються пакетами за id, кожен пакет - окрема коротка
+    транзакція. Рядки лічильників пакета спершу блокуються (FOR UPDATE): запис
+    обміну, що вже змінив лічильник, звірка дочекається і побачить, а зміну,
+    яка прийде після звірки, просто додасть до виправленого значення.
+    FOR UPDATE блокує лише наявні рядки, тож відсутні спершу створюються
+    нульовими окремою транзакцією - інакше запис обміну створив би рядок в обхід
+    блокування, і виправлення затерло б його зміну.
+    Повертає кількість виправлених користувачів.
+    """
+    repaired = 0
+    after_id = 0
+    while True:
+        result = await db.scalars(select(User.id).where(User.id > after_id).order_by(User.id).limit(batch_size))
+        user_ids = list(result)
+        if not user_ids:
+            await db.commit()
+            return repaired
+        after_id = user_ids[-1]
+
+        await db.execute(_insert_missing(db), [{"user_id": user_id} for user_id in user_ids])
+        await db.commit()
+
+        result = await db.execute(
+            select(UserExchangeCounts.user_id, *(getattr(UserExchangeCounts, name) for name in COUNTERS))
+            .where(UserExchangeCounts.user_id.in_(user_ids))
+            .with_for_update()
+        )
+        stored = {row.user_id: tuple(row[1:]) for row in result}
+        actual: Dict[int, Counter] = defaultdict(Counter)
+        for row in await db.execute(_actual_counts(user_ids)):
+            actual[row.user_id][row.counter] += row.value
+
+        fixes = []
+        for user_id in user_ids:
+            if user_id not in stored:
+                continue  # користувача щойно видалено разом з рядком лічильників
+            values = tuple(actual[user_id][name] for name in COUNTERS)
+            if stored[user_id] != values:
+                fixes.append({"user_id": user_id, **dict(zip(COUNTERS, values))})
+        if fixes:
+            await db.execute(_upsert(db, increment=False), fixes)
+        await db.commit()
+        repaired += len(fixes)
+
+
+class ExchangeCountsReconciler:
+    """
+    Фонова звірка лічильників обмінів раз на interval секунд.
+
+    Лічильники змінюються разом з обмінами, тож розбіжність можлива лише після
+    записів в обхід репозиторію (ручні правки, імпорт); звірка її виправляє.
+    """
+
+    def __init__(self, session_factory=async_session, interval: float = 3600.0, batch_size: int = 1000):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.repaired = 0
+        self.last_duration: Optional[float] = None
+
+    async def run_once(self) -> int:
+        started = time.perf_counter()
+        async with self.session_factory() as db:
+            repaired = await reconcile_exchange_counts(db, self.batch_size)
+        self.runs += 1
+        self.repaired += repaired
+        self.last_duration = time.perf_counter() - started
+        if repaired:
+            logger.warning("Exchange counts reconciled: %d users repaired", repaired)
+        return repaired
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Exchange counts reconciliation failed")
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # Перервана звірка нічого не псує: незакомічений пакет відкочується
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "repaired": self.repaired,
+            "last_duration": self.last_duration,
+        }
+
+
+exchange_counts_reconciler = ExchangeCountsReconciler()
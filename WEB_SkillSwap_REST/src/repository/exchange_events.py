@@ -0,0 +1,93 @@
+import asyncio
+import itertools
+from collections import defaultdict
+from typing import Any, Dict, Iterable, NamedTuple, Set
+
+from pydantic_core import to_json
+
+
+class ExchangeEvent(NamedTuple):
+    id: int
+    type: str  # created, updated, status_changed, deleted або resync
+    data: bytes  # JSON обміну, серіалізований один раз для всіх підписників
+
+
+class ExchangeSubscription:
+    """Обмежена черга подій одного клієнта (однієї вкладки чи з'єднання)."""
+
+    def __init__(self, user_id: int, max_queue: int):
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[ExchangeEvent]" = asyncio.Queue(max_queue)
+        self.dropped = 0
+
+
+class ExchangeEventHub:
+    """
+    Розсилка подій обмінів підписникам у межах процесу.
+
+    Подія потрапляє в черги всіх підписок відправника й отримувача обміну.
+    Повільний клієнт не гальмує запис і не роздуває пам'ять: якщо його черга
+    повна, накопичене відкидається, а натомість кладеться подія resync - клієнт
+    має перечитати обміни через GET /exchanges/user/{id}. Події інших процесів
+    (воркерів) сюди не потрапляють.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscriptions: Dict[int, Set[ExchangeSubscription]] = defaultdict(set)
+        self._ids = itertools.count(1)
+
+        self.published = 0
+        self.delivered = 0
+        self.resyncs = 0
+
+    def subscribe(self, user_id: int) -> ExchangeSubscription:
+        subscription = ExchangeSubscription(user_id, self.max_queue)
+        self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ExchangeSubscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+
+    def publish(self, event_type: str, exchange: Any, user_ids: Iterable[int]) -> None:
+        """Розіслати подію про обмін (модель, рядок-словник) підпискам user_ids - після коміту."""
+        targets = [
+            subscription
+            for user_id in set(user_ids)
+            for subscription in self._subscriptions.get(user_id, ())
+        ]
+        self.published += 1
+        if not targets:
+            return
+        event = ExchangeEvent(next(self._ids), event_type, to_json(exchange))
+        for subscription in targets:
+            try:
+                subscription.queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self.resync(subscription)
+
+    def resync(self, subscription: ExchangeSubscription) -> None:
+        """Замінити вміст черги подією resync: клієнт перечитає стан сам."""
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+            subscription.dropped += 1
+        subscription.queue.put_nowait(ExchangeEvent(next(self._ids), "resync", b"{}"))
+        self.resyncs += 1
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscriptions),
+            "subscriptions": sum(len(subscriptions) for subscriptions in self._subscriptions.values()),
+            "max_queue": self.max_queue,
+            "published": self.published,
+            "delivered": self.delivered,
+            "resyncs": self.resyncs,
+        }
+
+
+exchange_events = ExchangeEventHub()
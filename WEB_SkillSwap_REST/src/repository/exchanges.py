@@ -1,180 +1,505 @@
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy import Row, Select, and_, case, delete, exists, insert, literal, or_, select, tuple_, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from src.models.user_skills import Exchange, User, Skill, ExchangeStatus
-from src.schemas.exchange import ExchangeCreate, ExchangeUpdate, ExchangeFilter
+from src.pagination import decode_cursor, encode_cursor
+from src.repository.entity_cache import entity_cache
+from src.repository.exchange_counts import apply_count_changes, count_changes
+from src.repository.exchange_events import exchange_events
+from src.schemas.exchange import ExchangeCreate, ExchangeUpdate, ExchangeFilter, ExchangeWithDetailsResponse
 
-def get_exchange(db: Session, exchange_id: int) -> Optional[Exchange]:
-    """Отримати обмін за ID"""
-    return (
-        db.query(Exchange)
-        .options(
-            joinedload(Exchange.sender),
-            joinedload(Exchange.receiver),
-            joinedload(Exchange.skill)
-        )
-        .filter(Exchange.id == exchange_id)
-        .first()
+Sender = aliased(User, name="sender")
+Receiver = aliased(User, name="receiver")
+
+EXCHANGE_COLUMNS = (
+    Exchange.id,
+    Exchange.sender_id,
+    Exchange.receiver_id,
+    Exchange.skill_id,
+    Exchange.message,
+    Exchange.hours_proposed,
+    Exchange.status,
+    Exchange.version,
+    Exchange.created_at,
+    Exchange.updated_at,
+)
+
+# Колонки ExchangeWithDetailsResponse: поля обміну та імена/назва через JOIN
+EXCHANGE_DETAILS_COLUMNS = EXCHANGE_COLUMNS + (
+    Sender.username.label("sender_username"),
+    Receiver.username.label("receiver_username"),
+    Skill.title.label("skill_title"),
+)
+
+# Ті самі колонки для RETURNING змінених рядків: JOIN там неможливий, тож імена й
+# назва - корельованими підзапитами. SQLite пише колонки в RETURNING без таблиці,
+# але id у підзапиті - це id його ж таблиці, а sender_id/skill_id є лише в exchanges
+EXCHANGE_RETURNING_COLUMNS = EXCHANGE_COLUMNS + (
+    select(Sender.username).where(Sender.id == Exchange.sender_id).scalar_subquery().label("sender_username"),
+    select(Receiver.username).where(Receiver.id == Exchange.receiver_id).scalar_subquery().label("receiver_username"),
+    select(Skill.title).where(Skill.id == Exchange.skill_id).scalar_subquery().label("skill_title"),
+)
+
+
+def _inserted_returning_columns(sender_id: int, receiver_id: int, skill_id: int) -> tuple:
+    """RETURNING для INSERT: у ньому підзапит не корелює з новим рядком, тож імена й назва - за відомими id"""
+    return EXCHANGE_COLUMNS + (
+        select(User.username).where(User.id == sender_id).scalar_subquery().label("sender_username"),
+        select(User.username).where(User.id == receiver_id).scalar_subquery().label("receiver_username"),
+        select(Skill.title).where(Skill.id == skill_id).scalar_subquery().label("skill_title"),
     )
 
-def get_exchanges_with_filters(
-    db: Session, 
-    filters: ExchangeFilter,
-    skip: int = 0, 
-    limit: int = 100
-) -> List[Exchange]:
-    """Отримати обміни з фільтрацією"""
-    query = (
-        db.query(Exchange)
-        .options(
-            joinedload(Exchange.sender),
-            joinedload(Exchange.receiver),
-            joinedload(Exchange.skill)
-        )
+# Дозволені зміни статусу отримувачем: новий статус -> статуси, з яких у нього можна перейти
+STATUS_TRANSITIONS = {
+    ExchangeStatus.accepted: (ExchangeStatus.pending,),
+    ExchangeStatus.rejected: (ExchangeStatus.pending,),
+    ExchangeStatus.completed: (ExchangeStatus.accepted,),
+    ExchangeStatus.cancelled: (ExchangeStatus.pending, ExchangeStatus.accepted),
+}
+
+
+class ExchangeConflict(ValueError):
+    """Стан обміну (статус або версія) не дозволяє зміну - HTTP 409."""
+
+
+# Колонки, за якими можна сортувати (і гортати курсором) список обмінів
+EXCHANGE_SORT_COLUMNS = {
+    "created_at": Exchange.created_at,
+    "updated_at": Exchange.updated_at,
+    "hours_proposed": Exchange.hours_proposed,
+    "status": Exchange.status,
+    "sender_id": Exchange.sender_id,
+    "receiver_id": Exchange.receiver_id,
+    "skill_id": Exchange.skill_id,
+    "id": Exchange.id,
+}
+
+
+def _sort_name(sort_by: Optional[str]) -> str:
+    return sort_by if sort_by in EXCHANGE_SORT_COLUMNS else "created_at"
+
+
+def exchange_cursor(exchange: ExchangeWithDetailsResponse, sort_by: Optional[str] = "created_at") -> str:
+    """Непрозорий cursor наступної сторінки: (колонка сортування, її значення, id)"""
+    name = _sort_name(sort_by)
+    return encode_cursor(name, getattr(exchange, name), exchange.id)
+
+
+def _decode_exchange_cursor(cursor: str, sort_by: Optional[str]) -> Tuple[object, int]:
+    """Значення ключа з cursor; ValueError, якщо він пошкоджений або з іншого сортування."""
+    name = _sort_name(sort_by)
+    values = decode_cursor(cursor)
+    if len(values) != 3 or values[0] != name:
+        raise ValueError("Некоректний cursor")
+    try:
+        if name in ("created_at", "updated_at"):
+            value = datetime.fromisoformat(values[1])
+        elif name == "status":
+            value = ExchangeStatus(values[1])
+        else:
+            value = int(values[1])
+        return value, int(values[2])
+    except (TypeError, ValueError) as e:
+        raise ValueError("Некоректний cursor") from e
+
+
+def _keyset(stmt: Select, sort_by: Optional[str], descending: bool, cursor: Optional[str]) -> Select:
+    """
+    Впорядкувати за (колонка, id) і почати одразу після запису з cursor.
+
+    Умова (колонка, id) < (значення, id) йде по індексу, тож глибока сторінка
+    коштує стільки ж, скільки перша - на відміну від offset.
+    """
+    name = _sort_name(sort_by)
+    column = EXCHANGE_SORT_COLUMNS[name]
+    keys = [Exchange.id] if name == "id" else [column, Exchange.id]
+
+    if cursor:
+        value, last_id = _decode_exchange_cursor(cursor, name)
+        if name == "id":
+            key, bound = Exchange.id, last_id
+        else:
+            # Тип колонки явно: інакше значення в кортежі прив'язується без нього
+            key, bound = tuple_(column, Exchange.id), tuple_(literal(value, column.type), last_id)
+        stmt = stmt.where(key < bound if descending else key > bound)
+
+    return stmt.order_by(*(key.desc() if descending else key.asc() for key in keys))
+
+
+def _details_select() -> Select:
+    """Один SELECT рядків ExchangeWithDetailsResponse - без ORM-об'єктів і їх зв'язків."""
+    return (
+        select(*EXCHANGE_DETAILS_COLUMNS)
+        .join(Sender, Sender.id == Exchange.sender_id)
+        .join(Receiver, Receiver.id == Exchange.receiver_id)
+        .join(Skill, Skill.id == Exchange.skill_id)
     )
-    
+
+
+def _details(row: Row) -> ExchangeWithDetailsResponse:
+    # Типи колонок уже відповідають схемі, тож повторна валідація зайва
+    return ExchangeWithDetailsResponse.model_construct(**row._mapping)
+
+
+def _publish(event_type: str, exchange: ExchangeWithDetailsResponse) -> ExchangeWithDetailsResponse:
+    """Подія для підписників обох учасників обміну; викликається після коміту"""
+    exchange_events.publish(event_type, exchange, (exchange.sender_id, exchange.receiver_id))
+    return exchange
+
+
+async def get_exchange_details(db: AsyncSession, exchange_id: int) -> Optional[ExchangeWithDetailsResponse]:
+    """
+    Деталі обміну для читання - з кешу сутностей.
+
+    Повертає незмінну копію, а не ORM-об'єкт; зміни обміну йдуть умовними UPDATE.
+    """
+    details = entity_cache.get("Exchange", "id", exchange_id)
+    if details is None:
+        generation = entity_cache.generation("Exchange")
+        result = await db.execute(_details_select().where(Exchange.id == exchange_id))
+        row = result.first()
+        if row is None:
+            return None
+        details = _details(row)
+        entity_cache.put("Exchange", details, {"id": exchange_id}, generation)
+    return details
+
+def _apply_filters(stmt: Select, filters: ExchangeFilter) -> Select:
+    """Умови ExchangeFilter (без сортування)"""
     # Фільтрація за статусом
     if filters.status:
-        query = query.filter(Exchange.status == filters.status)
+        stmt = stmt.where(Exchange.status == filters.status)
     
     # Фільтрація за користувачем
     if filters.sender_id:
-        query = query.filter(Exchange.sender_id == filters.sender_id)
+        stmt = stmt.where(Exchange.sender_id == filters.sender_id)
     if filters.receiver_id:
-        query = query.filter(Exchange.receiver_id == filters.receiver_id)
+        stmt = stmt.where(Exchange.receiver_id == filters.receiver_id)
     
     # Фільтрація за навичкою
     if filters.skill_id:
-        query = query.filter(Exchange.skill_id == filters.skill_id)
+        stmt = stmt.where(Exchange.skill_id == filters.skill_id)
     
     # Фільтрація за датою
     if filters.from_date:
-        query = query.filter(Exchange.created_at >= filters.from_date)
+        stmt = stmt.where(Exchange.created_at >= filters.from_date)
     if filters.to_date:
-        query = query.filter(Exchange.created_at <= filters.to_date)
-    
-    # Сортування
-    order_field = getattr(Exchange, filters.sort_by, Exchange.created_at)
-    if filters.sort_order == "asc":
-        query = query.order_by(order_field.asc())
-    else:
-        query = query.order_by(order_field.desc())
-    
-    # Пагінація
-    return query.offset(skip).limit(limit).all()
-
-def create_exchange(db: Session, exchange: ExchangeCreate, sender_id: int) -> Exchange:
-    """Створити новий обмін"""
-    # Перевірка чи існує отримувач
-    receiver = db.query(User).filter(User.id == exchange.receiver_id).first()
-    if not receiver:
-        raise ValueError("Отримувач не знайдений")
-    
-    # Перевірка чи існує навичка
-    skill = db.query(Skill).filter(Skill.id == exchange.skill_id).first()
-    if not skill:
-        raise ValueError("Навичка не знайдена")
+        stmt = stmt.where(Exchange.created_at <= filters.to_date)
+    return stmt
+
+async def get_exchanges_with_filters(
+    db: AsyncSession, 
+    filters: ExchangeFilter,
+    skip: int = 0, 
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> List[ExchangeWithDetailsResponse]:
+    """Отримати обміни з фільтрацією (cursor - з exchange_cursor останнього запису сторінки)"""
+    stmt = _apply_filters(_details_select(), filters)
     
-    # Перевірка чи відправник не є отримувачем
+    # Сортування і пагінація за ключем (колонка сортування, id)
+    stmt = _keyset(stmt, filters.sort_by, filters.sort_order != "asc", cursor)
+    result = await db.execute(stmt.offset(skip).limit(limit))
+    return [_details(row) for row in result]
+
+async def stream_exchanges(
+    db: AsyncSession,
+    filters: ExchangeFilter,
+    after_id: Optional[int] = None,
+    batch_size: int = 1000
+) -> AsyncIterator[List[Row]]:
+    """
+    Усі обміни за фільтром пакетами по batch_size - для експорту.
+
+    Рядки (колонки EXCHANGE_DETAILS_COLUMNS, без моделей відповіді) читаються
+    серверним курсором (yield_per), тож у пам'яті лише один пакет.
+    Порядок - за id, нові обміни додаються в кінець: перерваний експорт
+    продовжується з after_id - ID останнього отриманого обміну.
+    """
+    stmt = _apply_filters(_details_select(), filters)
+    if after_id is not None:
+        stmt = stmt.where(Exchange.id > after_id)
+    stmt = stmt.order_by(Exchange.id).execution_options(yield_per=batch_size)
+    result = await db.stream(stmt)
+    async for rows in result.partitions():
+        yield rows
+
+async def _create_failure_message(db: AsyncSession, exchange: ExchangeCreate, sender_id: int, error: IntegrityError) -> str:
+    """Яке обмеження (FOREIGN KEY чи ck_exchanges_not_self) відхилило новий обмін"""
+    result = await db.execute(
+        select(
+            exists().where(User.id == exchange.receiver_id).label("receiver"),
+            exists().where(Skill.id == exchange.skill_id).label("skill"),
+            exists().where(User.id == sender_id).label("sender"),
+        )
+    )
+    found = result.one()
+    if not found.receiver:
+        return "Отримувач не знайдений"
+    if not found.skill:
+        return "Навичка не знайдена"
     if sender_id == exchange.receiver_id:
-        raise ValueError("Не можна створити обмін із самим собою")
-    
-    db_exchange = Exchange(
-        sender_id=sender_id,
-        receiver_id=exchange.receiver_id,
-        skill_id=exchange.skill_id,
-        message=exchange.message,
-        hours_proposed=exchange.hours_proposed,
-        status=ExchangeStatus.pending
+        return "Не можна створити обмін із самим собою"
+    if not found.sender:
+        return "Відправник не знайдений"
+    raise error
+
+async def create_exchange(db: AsyncSession, exchange: ExchangeCreate, sender_id: int) -> ExchangeWithDetailsResponse:
+    """
+    Створити новий обмін одним INSERT ... RETURNING разом з іменами й назвою навички.
+
+    Існування учасників і навички та заборону обміну із самим собою перевіряє БД;
+    при порушенні - ValueError з тим самим повідомленням, що й раніше. Лічильники
+    pending обох учасників змінюються в тій самій транзакції.
+    """
+    stmt = (
+        insert(Exchange)
+        .values(
+            sender_id=sender_id,
+            receiver_id=exchange.receiver_id,
+            skill_id=exchange.skill_id,
+            message=exchange.message,
+            hours_proposed=exchange.hours_proposed,
+            status=ExchangeStatus.pending
+        )
+        .returning(*_inserted_returning_columns(sender_id, exchange.receiver_id, exchange.skill_id))
     )
-    
-    db.add(db_exchange)
-    db.commit()
-    db.refresh(db_exchange)
-    return db_exchange
+    try:
+        result = await db.execute(stmt)
+        created = result.one()
+        await apply_count_changes(db, count_changes([(sender_id, exchange.receiver_id, None, ExchangeStatus.pending)]))
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise ValueError(await _create_failure_message(db, exchange, sender_id, e)) from e
+    return _publish("created", _details(created))
+
+async def _explain_write_failure(
+    db: AsyncSession,
+    exchange_id: int,
+    owner_column,
+    user_id: int,
+    owner_error: str,
+    allowed_statuses: Tuple[ExchangeStatus, ...],
+    status_error: str,
+    version: Optional[int]
+) -> None:
+    """
+    Чому умовний UPDATE/DELETE не зачепив жодного рядка.
+
+    Нічого не повертає, якщо обміну немає; інакше піднімає ValueError (не той
+    користувач) або ExchangeConflict (статус, версія чи паралельна зміна).
+    """
+    await db.rollback()
+    result = await db.execute(
+        select(owner_column.label("owner_id"), Exchange.status, Exchange.version).where(Exchange.id == exchange_id)
+    )
+    current = result.first()
+    if current is None:
+        return None
+    if current.owner_id != user_id:
+        raise ValueError(owner_error)
+    if current.status not in allowed_statuses:
+        raise ExchangeConflict(status_error.format(status=current.status.value))
+    if version is not None and current.version != version:
+        raise ExchangeConflict(f"Обмін уже змінено: поточна версія {current.version}")
+    # Умови виконуються вже зараз - рядок змінився між записом і перевіркою
+    raise ExchangeConflict("Обмін змінено паралельним запитом")
 
-def update_exchange_status(
-    db: Session, 
+def _guards(
+    exchange_id: int,
+    owner_column,
+    user_id: int,
+    allowed_statuses: Tuple[ExchangeStatus, ...],
+    version: Optional[int]
+) -> list:
+    """Умови запису: той обмін, його учасник, дозволений статус і (якщо передана) версія"""
+    guards = [Exchange.id == exchange_id, owner_column == user_id, Exchange.status.in_(allowed_statuses)]
+    if version is not None:
+        guards.append(Exchange.version == version)
+    return guards
+
+async def update_exchange_status(
+    db: AsyncSession, 
     exchange_id: int, 
     status: ExchangeStatus,
+    user_id: int,
+    version: Optional[int] = None
+) -> Optional[ExchangeWithDetailsResponse]:
+    """
+    Оновити статус обміну (тільки отримувач може прийняти/відхилити).
+
+    UPDATE ... WHERE з перевіркою отримувача, переходу статусу і версії;
+    None - обміну немає, ExchangeConflict - стан не дозволяє зміну.
+    Попередній статус для лічильників повертає той самий UPDATE (previous_status).
+    """
+    allowed_statuses = STATUS_TRANSITIONS.get(status, ())
+    stmt = (
+        update(Exchange)
+        .where(*_guards(exchange_id, Exchange.receiver_id, user_id, allowed_statuses, version))
+        .values(status=status, previous_status=Exchange.status, version=Exchange.version + 1)
+        .returning(*EXCHANGE_RETURNING_COLUMNS, Exchange.previous_status)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    row = result.first()
+    if row is None:
+        return await _explain_write_failure(
+            db, exchange_id, Exchange.receiver_id, user_id,
+            "Тільки отримувач може змінювати статус обміну",
+            allowed_statuses, f"Не можна змінити статус '{{status}}' на '{status.value}'", version
+        )
+    await apply_count_changes(db, count_changes([(row.sender_id, row.receiver_id, row.previous_status, status)]))
+    await db.commit()
+    return _publish("status_changed", _details(row))
+
+async def update_exchange_statuses(
+    db: AsyncSession,
+    changes: Dict[int, ExchangeStatus],
     user_id: int
-) -> Optional[Exchange]:
-    """Оновити статус обміну (тільки отримувач може прийняти/відхилити)"""
-    exchange = get_exchange(db, exchange_id)
-    if not exchange:
-        return None
-    
-    # Перевірка прав: тільки отримувач може змінювати статус
-    if exchange.receiver_id != user_id:
-        raise ValueError("Тільки отримувач може змінювати статус обміну")
-    
-    exchange.status = status
-    db.commit()
-    db.refresh(exchange)
-    return exchange
+) -> Tuple[List[Row], Dict[int, str]]:
+    """
+    Змінити статуси кількох обмінів одним UPDATE ... CASE ... RETURNING.
 
-def update_exchange(
-    db: Session, 
+    Змінюються лише обміни, де user_id - отримувач, а перехід дозволений
+    STATUS_TRANSITIONS. Повертає змінені рядки (EXCHANGE_RETURNING_COLUMNS і
+    previous_status) і причини пропуску решти: not_found, not_receiver,
+    invalid_transition. Лічильники учасників змінюються за парами
+    (previous_status, status) з RETURNING у тій самій транзакції.
+    """
+    by_status: Dict[ExchangeStatus, List[int]] = {}
+    for exchange_id, status in changes.items():
+        by_status.setdefault(status, []).append(exchange_id)
+
+    allowed = [
+        and_(Exchange.id.in_(ids), Exchange.status.in_(STATUS_TRANSITIONS[status]))
+        for status, ids in by_status.items()
+        if status in STATUS_TRANSITIONS
+    ]
+    updated: List[Row] = []
+    if allowed:
+        new_status = case(
+            *((Exchange.id.in_(ids), literal(status, Exchange.status.type)) for status, ids in by_status.items()),
+            else_=Exchange.status,
+        )
+        # SET бачить рядок до зміни: previous_status отримує старий статус
+        stmt = (
+            update(Exchange)
+            .where(Exchange.receiver_id == user_id, or_(*allowed))
+            .values(status=new_status, previous_status=Exchange.status, version=Exchange.version + 1)
+            .returning(*EXCHANGE_RETURNING_COLUMNS, Exchange.previous_status)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        updated = result.all()
+        await apply_count_changes(
+            db, count_changes((row.sender_id, row.receiver_id, row.previous_status, row.status) for row in updated)
+        )
+
+    # Причини пропуску - окремим запитом лише для незмінених ID, у тій самій транзакції
+    changed = {row.id for row in updated}
+    skipped_ids = [exchange_id for exchange_id in changes if exchange_id not in changed]
+    skipped = {exchange_id: "not_found" for exchange_id in skipped_ids}
+    if skipped_ids:
+        result = await db.execute(select(Exchange.id, Exchange.receiver_id).where(Exchange.id.in_(skipped_ids)))
+        for row in result:
+            skipped[row.id] = "not_receiver" if row.receiver_id != user_id else "invalid_transition"
+    await db.commit()
+    for row in updated:
+        _publish("status_changed", _details(row))
+    return updated, skipped
+
+async def update_exchange(
+    db: AsyncSession, 
     exchange_id: int, 
     exchange_update: ExchangeUpdate,
-    user_id: int
-) -> Optional[Exchange]:
-    """Оновити обмін (тільки відправник може оновлювати)"""
-    exchange = get_exchange(db, exchange_id)
-    if not exchange:
-        return None
-    
-    # Перевірка прав: тільки відправник може оновлювати
-    if exchange.sender_id != user_id:
-        raise ValueError("Тільки відправник може оновлювати обмін")
-    
-    # Перевірка статусу: можна оновлювати тільки pending обміни
-    if exchange.status != ExchangeStatus.pending:
-        raise ValueError("Можна оновлювати тільки обміни зі статусом 'pending'")
-    
+    user_id: int,
+    version: Optional[int] = None
+) -> Optional[ExchangeWithDetailsResponse]:
+    """Оновити обмін (тільки відправник і тільки pending) одним умовним UPDATE"""
+    pending = (ExchangeStatus.pending,)
     update_data = exchange_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(exchange, field, value)
-    
-    db.commit()
-    db.refresh(exchange)
-    return exchange
+    if "status" in update_data:
+        update_data["previous_status"] = Exchange.status
+    stmt = (
+        update(Exchange)
+        .where(*_guards(exchange_id, Exchange.sender_id, user_id, pending, version))
+        .values(**update_data, version=Exchange.version + 1)
+        .returning(*EXCHANGE_RETURNING_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    row = result.first()
+    if row is None:
+        return await _explain_write_failure(
+            db, exchange_id, Exchange.sender_id, user_id,
+            "Тільки відправник може оновлювати обмін",
+            pending, "Можна оновлювати тільки обміни зі статусом 'pending'", version
+        )
+    # ExchangeUpdate може змінити й статус
+    await apply_count_changes(db, count_changes([(row.sender_id, row.receiver_id, ExchangeStatus.pending, row.status)]))
+    await db.commit()
+    return _publish("updated", _details(row))
 
-def delete_exchange(db: Session, exchange_id: int, user_id: int) -> bool:
-    """Видалити обмін (тільки відправник або адмін)"""
-    exchange = get_exchange(db, exchange_id)
-    if not exchange:
+async def delete_exchange(db: AsyncSession, exchange_id: int, user_id: int, version: Optional[int] = None) -> bool:
+    """Видалити обмін (тільки відправник і тільки pending) одним умовним DELETE"""
+    pending = (ExchangeStatus.pending,)
+    stmt = (
+        delete(Exchange)
+        .where(*_guards(exchange_id, Exchange.sender_id, user_id, pending, version))
+        .returning(Exchange.id, Exchange.sender_id, Exchange.receiver_id, Exchange.version)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    deleted = result.first()
+    if deleted is None:
+        await _explain_write_failure(
+            db, exchange_id, Exchange.sender_id, user_id,
+            "Тільки відправник може видалити обмін",
+            pending, "Можна видаляти тільки обміни зі статусом 'pending'", version
+        )
         return False
-    
-    # Перевірка прав: тільки відправник може видалити
-    if exchange.sender_id != user_id:
-        raise ValueError("Тільки відправник може видалити обмін")
-    
-    # Перевірка статусу: можна видаляти тільки pending обміни
-    if exchange.status != ExchangeStatus.pending:
-        raise ValueError("Можна видаляти тільки обміни зі статусом 'pending'")
-    
-    db.delete(exchange)
-    db.commit()
+    await apply_count_changes(db, count_changes([(deleted.sender_id, deleted.receiver_id, ExchangeStatus.pending, None)]))
+    await db.commit()
+    exchange_events.publish("deleted", deleted._asdict(), (deleted.sender_id, deleted.receiver_id))
     return True
 
-def get_user_exchanges(db: Session, user_id: int) -> List[Exchange]:
-    """Отримати всі обміни користувача (як відправника та отримувача)"""
-    return (
-        db.query(Exchange)
-        .options(
-            joinedload(Exchange.sender),
-            joinedload(Exchange.receiver),
-            joinedload(Exchange.skill)
-        )
-        .filter(
-            or_(
-                Exchange.sender_id == user_id,
-                Exchange.receiver_id == user_id
-            )
+async def get_user_exchanges(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> List[ExchangeWithDetailsResponse]:
+    """
+    Отримати обміни користувача (як відправника та отримувача), новіші першими.
+
+    Замість sender_id = :id OR receiver_id = :id - UNION ALL двох гілок, кожна
+    йде своїм індексом (учасник, created_at, id) і дає не більше limit рядків;
+    сторінка - перші limit з їх злиття за (created_at, id).
+    """
+    sent = select(Exchange.id, Exchange.created_at).where(Exchange.sender_id == user_id)
+    # Обмін із самим собою потрапив би в обидві гілки
+    received = select(Exchange.id, Exchange.created_at).where(
+        Exchange.receiver_id == user_id, Exchange.sender_id != user_id
+    )
+    branches = [
+        select(*branch.c)
+        for branch in (
+            _keyset(stmt, "created_at", True, cursor).limit(limit).subquery()
+            for stmt in (sent, received)
         )
-        .order_by(Exchange.created_at.desc())
-        .all()
-    )
\ No newline at end of file
+    ]
+    page = union_all(*branches).subquery("page")
+
+    stmt = (
+        _details_select()
+        .join(page, page.c.id == Exchange.id)
+        .order_by(page.c.created_at.desc(), page.c.id.desc())
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [_details(row) for row in result]
\ No newline at end of file
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from settings import async_session
+from src.models import IdBlock
+
+logger = logging.getLogger(__name__)
+
+async def reserve_id_block(
+    db: AsyncSession, name: str, size: int, seed: Callable[[AsyncSession], Awaitable[int]]
+) -> int:
+    """
+    Зарезервувати блок із size ID і повернути перший ID блоку.
+
+    Резервування - один атомарний UPDATE ... RETURNING, тому два процеси ніколи
+    не отримають той самий блок. Якщо послідовності ще немає, вона створюється
+    зі значенням seed(db).
+    """
+    stmt = (
+        update(IdBlock)
+        .where(IdBlock.name == name)
+        .values(next_id=IdBlock.next_id + size)
+        .returning(IdBlock.next_id)
+    )
+    while True:
+        end = await db.scalar(stmt)
+        if end is not None:
+            await db.commit()
+            return end - size
+
+        await db.rollback()
+        db.add(IdBlock(name=name, next_id=await seed(db)))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Інший процес створив послідовність раніше - просто повторюємо UPDATE
+            await db.rollback()
+
+
+class IdBlockAllocator:
+    """
+    Видає унікальні ID з блоків, зарезервованих у таблиці id_blocks.
+
+    У межах процесу ID береться з поточного блоку без звернення до БД; новий блок
+    резервує тільки одна задача (під asyncio.Lock), а наступний блок підвантажується
+    заздалегідь, коли в поточному лишилась чверть ID.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        seed: Callable[[AsyncSession], Awaitable[int]],
+        session_factory=async_session,
+        block_size: int = 100,
+    ):
+        self.name = name
+        self.seed = seed
+        self.session_factory = session_factory
+        self.block_size = block_size
+
+        self._next = 0
+        self._end = 0
+        self._spare: Optional[Tuple[int, int]] = None
+        self._prefetch: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def _reserve(self) -> Tuple[int, int]:
+        async with self.session_factory() as db:
+            start = await reserve_id_block(db, self.name, self.block_size, self.seed)
+        return start, start + self.block_size
+
+    async def _fill_spare(self) -> None:
+        async with self._lock:
+            if self._spare is None:
+                self._spare = await self._reserve()
+
+    async def next_id(self) -> int:
+        while self._next >= self._end:
+            async with self._lock:
+                if self._next < self._end:
+                    break
+                if self._spare is not None:
+                    (self._next, self._end), self._spare = self._spare, None
+                else:
+                    self._next, self._end = await self._reserve()
+
+        value = self._next
+        self._next += 1
+
+        if self._spare is None and self._end - self._next < self.block_size // 4:
+            if self._prefetch is None:
+                self._prefetch = asyncio.create_task(self._fill_spare())
+                self._prefetch.add_done_callback(self._prefetched)
+        return value
+
+    def _prefetched(self, task: asyncio.Task) -> None:
+        # Помилка фонового резервування не губиться: наступний next_id зарезервує блок сам
+        if self._prefetch is task:
+            self._prefetch = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Prefetch of %s id block failed", self.name, exc_info=task.exception())
+
+    async def next_ids(self, count: int) -> range:
+        """
+        Зарезервувати одразу count послідовних ID (для пакетного імпорту).
+
+        Діапазон береться окремим блоком потрібного розміру одним UPDATE, поточний
+        блок при цьому не витрачається.
+        """
+        async with self.session_factory() as db:
+            start = await reserve_id_block(db, self.name, count, self.seed)
+        return range(start, start + count)
+
+    def reset(self) -> None:
+        """Забути зарезервовані блоки (невикористані ID просто пропускаються)."""
+        if self._prefetch is not None:
+            self._prefetch.cancel()
+            self._prefetch = None
+        self._next = self._end = 0
+        self._spare = None
+        self._lock = asyncio.Lock()
+
+    async def stop(self) -> None:
+        """Дочекатися скасування фонового резервування блоку (при зупинці)."""
+        prefetch, self._prefetch = self._prefetch, None
+        if prefetch is not None:
+            prefetch.cancel()
+            # wait не піднімає ні скасування, ні помилку - її вже записав _prefetched
+            await asyncio.wait([prefetch])
@@ -0,0 +1,26 @@
+from functools import partial
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from settings import get_db
+from src.dataloader import DataLoader
+from src.repository import users as repository_users
+from src.repository.skill_catalog import skill_catalog
+
+
+class Loaders:
+    """
+    DataLoader-и одного запиту: користувачі з сесії запиту, навички з каталогу.
+
+    Окремі пошуки за ID, зроблені під час запиту, об'єднуються в IN-запити.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.users = DataLoader(partial(repository_users.get_users_by_ids, db))
+        self.skills = DataLoader(skill_catalog.get_many)
+
+
+async def get_loaders(db: AsyncSession = Depends(get_db)) -> Loaders:
+    """Залежність FastAPI: новий набір завантажувачів на кожен запит."""
+    return Loaders(db)
@@ -0,0 +1,488 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from settings import api_config, async_session
+from src.repository import skills as repository_skills
+from src.repository.entity_cache import entity_cache
+from src.repository.id_allocator import IdBlockAllocator
+from src.repository.skill_fuzzy import SkillFuzzyIndex
+from src.repository.skill_index import (SkillFilterIndex, SkillMatchIndex,
+                                        SkillOrderIndex, SkillSearchIndex)
+from src.repository.skill_snapshot import (SkillJournal, load_snapshot,
+                                           save_snapshot)
+from src.repository.skill_store import SkillRecord
+
+logger = logging.getLogger(__name__)
+
+
+class SkillCatalog:
+    """
+    Каталог навичок у пам'яті з індексами поверх таблиці skills.
+
+    Читання обслуговуються з пам'яті (read-through: навичка, якої немає в кеші,
+    догружається з БД). Нові навички записуються в БД одразу - на них можуть
+    посилатися обміни. Зміни й видалення одразу видно в пам'яті, а в БД вони
+    записуються пакетами у фоні (write-behind) не рідше ніж раз на
+    flush_interval секунд або щойно накопичилось max_batch змін. Раз на
+    sync_interval секунд кеш підтягує зміни, зроблені іншими воркерами.
+
+    Навички зберігаються компактними записами SkillRecord.
+    ID нових навичок видаються блоками з таблиці id_blocks, тому не повторюються
+    ні між asyncio-задачами, ні між процесами.
+
+    Якщо задано snapshot_path, при зупинці каталог разом з готовими індексами
+    зберігається в знімок, а при старті читається з нього через mmap замість
+    повної перебудови. Поверх знімка відтворюється журнал ще не записаних у БД
+    змін (snapshot_path + ".log") і підтягуються зміни з БД, зроблені після
+    знімка. Знімок і журнал належать одному процесу: кожному воркеру - свій шлях.
+    """
+
+    INDEXES = ("search_index", "filter_index", "order_index", "match_index", "fuzzy_index")
+
+    def __init__(
+        self,
+        session_factory=async_session,
+        flush_interval: float = 1.0,
+        max_batch: int = 500,
+        sync_interval: float = 5.0,
+        snapshot_path: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.sync_interval = sync_interval
+        self.snapshot_path = snapshot_path
+        self.journal = SkillJournal(f"{snapshot_path}.log") if snapshot_path else None
+
+        self.skills: Dict[int, SkillRecord] = {}
+        self.search_index = SkillSearchIndex()
+        self.filter_index = SkillFilterIndex()
+        self.order_index = SkillOrderIndex()
+        self.match_index = SkillMatchIndex()
+        self.fuzzy_index = SkillFuzzyIndex()
+        self.id_allocator = IdBlockAllocator("skills", seed=self._seed_id, session_factory=session_factory)
+
+        self._created: Set[int] = set()
+        self._updated: Set[int] = set()
+        self._deleted: Set[int] = set()
+        # Навички з новою назвою, ще не записаною в БД: деталі обмінів у entity_cache
+        # містять назву навички і скидаються, щойно вона записана
+        self._retitled: Set[int] = set()
+        self._synced_at: Optional[datetime] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # Зміни, які БД відхилила (IntegrityError) і які вже не повторюються
+        self.rejected = 0
+
+    # ---- індекси ----
+
+    def _index(self, skill: Mapping) -> SkillRecord:
+        if not isinstance(skill, SkillRecord):
+            skill = SkillRecord.from_dict(skill)
+        self.skills[skill.id] = skill
+        self.search_index.add(skill["id"], skill["title"], skill["description"])
+        self.filter_index.add(skill)
+        self.order_index.add(skill)
+        self.match_index.add(skill)
+        self.fuzzy_index.add(skill)
+        return skill
+
+    def _unindex(self, skill_id: int) -> Optional[SkillRecord]:
+        skill = self.skills.pop(skill_id, None)
+        if skill is None:
+            return None
+        self.search_index.remove(skill_id, skill["title"], skill["description"])
+        self.filter_index.remove(skill)
+        self.order_index.remove(skill_id)
+        self.match_index.remove(skill)
+        self.fuzzy_index.remove(skill_id)
+        return skill
+
+    def _clear(self) -> None:
+        self.skills.clear()
+        for name in self.INDEXES:
+            getattr(self, name).clear()
+
+    # ---- зміни ----
+
+    def _schedule_flush(self) -> None:
+        pending = len(self._created) + len(self._updated) + len(self._deleted)
+        if self._wakeup is not None and pending >= self.max_batch:
+            self._wakeup.set()
+
+    @staticmethod
+    async def _seed_id(db) -> int:
+        """Перший ID послідовності skills - наступний після вже збережених"""
+        return await repository_skills.get_max_skill_id(db) + 1
+
+    async def create(self, data: dict) -> SkillRecord:
+        """
+        Додати навичку до каталогу, записавши її в БД одразу (write-through).
+
+        Щойно повернута навичка вже може бути в обміні (FOREIGN KEY), тож не чекає
+        фонового пакета. ID видає IdBlockAllocator без звернення до БД, лишається
+        один INSERT.
+        """
+        skill_id = await self.id_allocator.next_id()
+        now = datetime.now(timezone.utc)
+        skill = SkillRecord.from_dict({"id": skill_id, **data, "created_at": now, "updated_at": now})
+        async with self.session_factory() as db:
+            await repository_skills.insert_skills(db, [skill])
+        return self._index(skill)
+
+    async def create_many(self, items: List[dict]) -> List[SkillRecord]:
+        """
+        Додати пакет навичок: ID одним діапазоном, запис у БД одним INSERT.
+
+        Як і create, пакет пишеться в БД одразу, а не через чергу запису, тож
+        великий імпорт не накопичує незаписані зміни в пам'яті.
+        """
+        if not items:
+            return []
+
+        ids = await self.id_allocator.next_ids(len(items))
+        now = datetime.now(timezone.utc)
+        skills = [
+            SkillRecord.from_dict({"id": skill_id, **data, "created_at": now, "updated_at": now})
+            for skill_id, data in zip(ids, items)
+        ]
+        async with self.session_factory() as db:
+            await repository_skills.insert_skills(db, skills)
+        return [self._index(skill) for skill in skills]
+
+    def update(self, skill_id: int, data: dict) -> Optional[SkillRecord]:
+        """Оновити поля навички. Повертає None, якщо навички немає в кеші."""
+        stored = self._unindex(skill_id)
+        if stored is None:
+            return None
+
+        skill = self._index({**stored, **data, "updated_at": datetime.now(timezone.utc)})
+        if skill_id not in self._created:
+            self._updated.add(skill_id)
+        if skill["title"] != stored["title"]:
+            self._retitled.add(skill_id)
+        if self.journal is not None:
+            self.journal.append("update", skill)
+        self._schedule_flush()
+        return skill
+
+    def delete(self, skill_id: int) -> bool:
+        if self._unindex(skill_id) is None:
+            return False
+
+        if skill_id in self._created:
+            # Ще не записана в БД - достатньо забути про неї
+            self._created.discard(skill_id)
+        else:
+            self._updated.discard(skill_id)
+            self._deleted.add(skill_id)
+        if self.journal is not None:
+            self.journal.append_delete(skill_id)
+        self._schedule_flush()
+        return True
+
+    async def get(self, skill_id: int) -> Optional[SkillRecord]:
+        """Навичка з кешу, а за її відсутності - з БД (read-through)."""
+        skill = self.skills.get(skill_id)
+        if skill is not None or skill_id in self._deleted:
+            return skill
+
+        async with self.session_factory() as db:
+            stored = await repository_skills.get_skill(db, skill_id)
+        if stored is None:
+            return None
+        skill = self.skills.get(skill_id)
+        return skill if skill is not None else self._index(stored)
+
+    async def get_many(self, skill_ids: Iterable[int]) -> Dict[int, SkillRecord]:
+        """Кілька навичок за ID: відсутні в кеші дочитуються з БД одним запитом."""
+        found = {}
+        missing = []
+        for skill_id in skill_ids:
+            skill = self.skills.get(skill_id)
+            if skill is not None:
+                found[skill_id] = skill
+            elif skill_id not in self._deleted:
+                missing.append(skill_id)
+
+        if missing:
+            async with self.session_factory() as db:
+                stored = await repository_skills.get_skills_by_ids(db, missing)
+            for skill in stored:
+                cached = self.skills.get(skill["id"])
+                found[skill["id"]] = cached if cached is not None else self._index(skill)
+        return found
+
+    # ---- синхронізація з БД ----
+
+    async def load(self) -> None:
+        """Завантажити весь каталог з БД і перебудувати індекси."""
+        async with self.session_factory() as db:
+            started = datetime.now(timezone.utc)
+            skills = await repository_skills.get_skills(db)
+
+        self._clear()
+        for skill in skills:
+            self._index(skill)
+        self._synced_at = started
+        logger.info("Skill catalog loaded: %d skills", len(skills))
+
+    def _requeue(self, created: List[SkillRecord], updated: List[SkillRecord], deleted: List[int]) -> None:
+        """Повернути незаписані зміни в чергу, якщо за цей час їх не перекрили нові"""
+        self._created.update(s["id"] for s in created if s["id"] in self.skills)
+        self._updated.update(s["id"] for s in updated if s["id"] in self.skills and s["id"] not in self._created)
+        self._deleted.update(i for i in deleted if i not in self.skills)
+
+    async def _restore(self, skill_id: int) -> None:
+        """Повернути навичку в кеші до стану в БД після відхиленої зміни"""
+        if skill_id in self._created or skill_id in self._updated or skill_id in self._deleted:
+            return  # новіша локальна зміна запишеться наступним пакетом
+        async with self.session_factory() as db:
+            stored = await repository_skills.get_skill(db, skill_id)
+        self._unindex(skill_id)
+        if stored is not None:
+            self._index(stored)
+
+    async def _flush_one_by_one(
+        self, created: List[SkillRecord], updated: List[SkillRecord], deleted: List[int]
+    ) -> None:
+        """
+        Записати пакет, який БД відхилила, по одній зміні.
+
+        Зміна, яку БД відхиляє й окремо, не повторюється: вона рахується в
+        rejected, а навичка в кеші повертається до стану в БД. Решта пакета
+        записується; інша помилка (БД недоступна) повертає незаписане в чергу.
+        """
+        changes: List[Tuple[str, object]] = (
+            [("create", s) for s in created] + [("update", s) for s in updated] + [("delete", i) for i in deleted]
+        )
+        for position, (op, value) in enumerate(changes):
+            try:
+                async with self.session_factory() as db:
+                    await repository_skills.save_skills(
+                        db,
+                        [value] if op == "create" else [],
+                        [value] if op == "update" else [],
+                        [value] if op == "delete" else [],
+                    )
+                continue
+            except IntegrityError:
+                skill_id = value if op == "delete" else value["id"]
+                logger.exception("Skill catalog %s of skill %s rejected by the database", op, skill_id)
+            except Exception:
+                rest = changes[position:]
+                self._requeue(
+                    [v for o, v in rest if o == "create"], [v for o, v in rest if o == "update"],
+                    [v for o, v in rest if o == "delete"],
+                )
+                raise
+
+            self.rejected += 1
+            try:
+                await self._restore(skill_id)
+            except Exception:
+                # Кеш виправить наступне повне завантаження; запис решти важливіший
+                logger.exception("Skill catalog could not restore skill %s", skill_id)
+
+    @staticmethod
+    def _drop_exchange_details(retitled: Set[int]) -> None:
+        """
+        Скинути кешовані деталі обмінів після запису нових назв навичок.
+
+        Деталі обміну містять skill_title, а записи кешу за навичкою не індексуються,
+        тож скидається вся сутність Exchange - назви змінюються рідко.
+        """
+        if retitled:
+            entity_cache.invalidate_all("Exchange")
+
+    async def flush(self) -> None:
+        """
+        Записати накопичені зміни в БД одним пакетом.
+
+        Якщо БД відхиляє пакет (IntegrityError), він пишеться по одній зміні, тож
+        одна погана зміна не блокує решту черги.
+        """
+        created = [self.skills[i] for i in self._created if i in self.skills]
+        updated = [self.skills[i] for i in self._updated if i in self.skills]
+        deleted = list(self._deleted)
+        if not (created or updated or deleted):
+            return
+
+        self._created, self._updated, self._deleted = set(), set(), set()
+        retitled, self._retitled = self._retitled, set()
+        try:
+            async with self.session_factory() as db:
+                await repository_skills.save_skills(db, created, updated, deleted)
+        except IntegrityError:
+            logger.warning("Skill catalog batch rejected by the database, writing changes one by one")
+            try:
+                await self._flush_one_by_one(created, updated, deleted)
+            finally:
+                # Частина пакета могла записатися: скидаємо деталі обмінів у будь-якому разі
+                self._drop_exchange_details(retitled)
+        except Exception:
+            logger.exception("Skill catalog flush failed, changes will be retried")
+            self._requeue(created, updated, deleted)
+            self._retitled |= retitled
+            raise
+        else:
+            self._drop_exchange_details(retitled)
+
+        if self.journal is not None:
+            # У журналі лишаються тільки зміни, що з'явилися під час запису пакета
+            self.journal.rewrite(
+                [self.skills[i] for i in self._created if i in self.skills],
+                [self.skills[i] for i in self._updated if i in self.skills],
+                self._deleted,
+            )
+
+    async def sync(self) -> None:
+        """
+        Підтягнути зміни інших воркерів (нові, змінені та видалені навички).
+
+        Читаються лише рядки, змінені з попередньої синхронізації, і надгробки
+        видалених з того часу навичок - робота пропорційна змінам, а не каталогу.
+        """
+        if self._synced_at is None:
+            await self.load()
+            return
+
+        started = datetime.now(timezone.utc)
+        # Інші воркери пишуть із затримкою до flush_interval, тож беремо запас
+        since = self._synced_at - timedelta(seconds=self.flush_interval * 2 + 1)
+        async with self.session_factory() as db:
+            changed = await repository_skills.get_skills_updated_since(db, since)
+            if since >= started - repository_skills.TOMBSTONE_TTL:
+                deleted = await repository_skills.get_skills_deleted_since(db, since)
+            else:
+                # Надгробки такої давності вже прибрані - звіряємо всі ID, як при старті
+                deleted = set(self.skills) - await repository_skills.get_skill_ids(db)
+
+        local = self._created | self._updated | self._deleted
+        retitled = set()
+        for skill in changed:
+            if skill["id"] in local:
+                continue
+            stored = self.skills.get(skill["id"])
+            if stored is None or stored["updated_at"] < skill["updated_at"]:
+                if stored is not None and stored["title"] != skill["title"]:
+                    retitled.add(skill["id"])
+                self._unindex(skill["id"])
+                self._index(skill)
+        self._drop_exchange_details(retitled)
+
+        for skill_id in deleted - self._created:
+            self._unindex(skill_id)
+
+        self._synced_at = started
+
+    # ---- знімок і журнал ----
+
+    def save_snapshot(self) -> None:
+        """Зберегти каталог разом з індексами у файл знімка."""
+        state = {name: getattr(self, name) for name in self.INDEXES}
+        save_snapshot(self.snapshot_path, {**state, "skills": self.skills, "synced_at": self._synced_at})
+        logger.info("Skill catalog snapshot saved: %d skills", len(self.skills))
+
+    def restore_snapshot(self) -> bool:
+        """Підняти каталог і індекси зі знімка. False, якщо придатного знімка немає."""
+        state = load_snapshot(self.snapshot_path)
+        if state is None:
+            return False
+
+        self.skills = state["skills"]
+        for name in self.INDEXES:
+            setattr(self, name, state[name])
+        self._synced_at = state["synced_at"]
+        logger.info("Skill catalog restored from snapshot: %d skills", len(self.skills))
+        return True
+
+    async def replay_journal(self) -> None:
+        """Відтворити незаписані зміни з журналу і знову поставити їх у чергу на запис."""
+        for op, value in self.journal.replay():
+            if op == "delete":
+                self._unindex(value)
+                if value in self._created:
+                    self._created.discard(value)
+                else:
+                    self._updated.discard(value)
+                    self._deleted.add(value)
+                continue
+
+            self._unindex(value.id)
+            self._index(value)
+            if op == "create":
+                self._created.add(value.id)
+            elif value.id not in self._created:
+                self._updated.add(value.id)
+
+        if self._created:
+            # Пакет міг записатися в БД перед падінням, а журнал - не встигнути оновитися
+            async with self.session_factory() as db:
+                stored = await repository_skills.get_skill_ids(db, self._created)
+            self._created -= stored
+            self._updated |= stored
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_sync = loop.time() + self.sync_interval
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._stopping:
+                break
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Skill catalog background flush failed")
+            # Окремо від запису: збій запису не має зупиняти зміни від інших воркерів
+            if loop.time() >= next_sync:
+                try:
+                    await self.sync()
+                except Exception:
+                    logger.exception("Skill catalog background sync failed")
+                next_sync = loop.time() + self.sync_interval
+
+    async def start(self) -> None:
+        """Завантажити каталог (зі знімка або з БД) і запустити фоновий запис змін."""
+        if self.snapshot_path is None:
+            await self.load()
+        elif self.restore_snapshot():
+            await self.replay_journal()
+            await self.sync()
+        else:
+            await self.load()
+            await self.replay_journal()
+        self.id_allocator.reset()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Зупинити фоновий запис і дописати залишок змін."""
+        if self._task is not None:
+            # Без cancel(): поточний пакет має дописатися, а не обірватися посеред транзакції
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        self._wakeup = None
+        try:
+            await self.flush()
+        finally:
+            await self.id_allocator.stop()
+            if self.snapshot_path is not None:
+                self.save_snapshot()
+                self.journal.close()
+
+
+skill_catalog = SkillCatalog(snapshot_path=api_config.SKILLS_SNAPSHOT_PATH or None)
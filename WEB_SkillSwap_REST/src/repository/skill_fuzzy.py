@@ -0,0 +1,218 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+NGRAM_SIZE = 3
+
+# Повний перерахунок IDF, коли кількість навичок змінилась більше ніж на цю частку
+IDF_REBUILD_RATIO = 0.1
+# Стиснення матриці, коли видалені (обнулені) рядки складають більше цієї частки
+COMPACT_RATIO = 0.25
+
+
+def _ngrams(skill: dict) -> Counter:
+    """Символьні n-грами назви (втричі вагоміші) та опису навички."""
+    counts: Counter = Counter()
+    for text, weight in ((skill["title"], 3), (skill["description"], 1)):
+        text = f" {text.lower()} "
+        for i in range(len(text) - NGRAM_SIZE + 1):
+            counts[text[i : i + NGRAM_SIZE]] += weight
+    return counts
+
+
+class SkillFuzzyIndex:
+    """
+    Нечіткий пошук збігів за косинусною подібністю TF-IDF символьних n-грам.
+
+    Рядки розрідженої матриці (CSR) - навички, стовпці - n-грами. Нові навички
+    накопичуються окремо і дописуються в кінець матриці перед наступним запитом;
+    видалені рядки обнуляються, а коли їх стає забагато, матриця стискається.
+    IDF і норми рядків повністю перераховуються тільки коли каталог суттєво змінився.
+    Подібність рахується пакетами через добуток матриць, а top-k - через argpartition.
+    """
+
+    def __init__(self, max_batch_cells: int = 16_000_000):
+        self.max_batch_cells = max_batch_cells
+        self._vocab: Dict[str, int] = {}
+        self._df: List[int] = []
+        self._category_codes: Dict[Any, int] = {}
+
+        # Сирі частоти n-грам і та сама матриця, зважена IDF
+        self._matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._weighted = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._row_ids = np.zeros(0, dtype=np.int64)
+        self._category = np.zeros(0, dtype=np.int32)
+        self._can_teach = np.zeros(0, dtype=bool)
+        self._want_learn = np.zeros(0, dtype=bool)
+        self._row_of: Dict[int, int] = {}
+        self._live = 0
+
+        self._pending: List[Tuple[dict, Counter]] = []
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._idf_docs = 0
+        self._norms = np.zeros(0, dtype=np.float32)
+
+    def add(self, skill: dict) -> None:
+        """Додати навичку; вона потрапить у матрицю при наступному запиті."""
+        if skill["id"] in self._row_of:
+            self.remove(skill["id"])
+
+        grams = _ngrams(skill)
+        for gram in grams:
+            col = self._vocab.setdefault(gram, len(self._vocab))
+            if col == len(self._df):
+                self._df.append(0)
+            self._df[col] += 1
+
+        self._row_of[skill["id"]] = self._matrix.shape[0] + len(self._pending)
+        self._pending.append((skill, grams))
+        self._live += 1
+
+    def remove(self, skill_id: int) -> None:
+        row = self._row_of.pop(skill_id, None)
+        if row is None:
+            return
+        if row >= self._matrix.shape[0]:
+            self._merge_pending()
+
+        start, end = self._matrix.indptr[row], self._matrix.indptr[row + 1]
+        for col in self._matrix.indices[start:end]:
+            self._df[col] -= 1
+        # Рядок обнуляється, а не видаляється, щоб не зсувати номери інших рядків
+        self._matrix.data[start:end] = 0
+        self._weighted.data[self._weighted.indptr[row] : self._weighted.indptr[row + 1]] = 0
+        self._row_ids[row] = -1
+        self._live -= 1
+
+        dead = self._matrix.shape[0] - (self._live - len(self._pending))
+        if dead > COMPACT_RATIO * self._matrix.shape[0]:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Викинути обнулені рядки з матриць і масивів та перенумерувати рядки."""
+        keep = self._row_ids >= 0
+        self._matrix = self._matrix[keep]
+        self._weighted = self._weighted[keep]
+        self._norms = self._norms[keep]
+        self._row_ids = self._row_ids[keep]
+        self._category = self._category[keep]
+        self._can_teach = self._can_teach[keep]
+        self._want_learn = self._want_learn[keep]
+
+        # Нові навички з черги стоять одразу після матриці - їх номери теж зсуваються
+        n_rows = self._matrix.shape[0]
+        self._row_of = {int(skill_id): row for row, skill_id in enumerate(self._row_ids)}
+        for i, (skill, _) in enumerate(self._pending):
+            self._row_of[skill["id"]] = n_rows + i
+
+    def clear(self) -> None:
+        self.__init__(self.max_batch_cells)
+
+    def __getstate__(self) -> dict:
+        # У знімок каталогу потрапляє вже зібрана матриця, без черги нових рядків
+        self._merge_pending()
+        return self.__dict__
+
+    def _merge_pending(self) -> None:
+        """Дописати нові навички в кінець матриці та розширити IDF і норми."""
+        if not self._pending:
+            return
+
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for _, grams in self._pending:
+            indices.extend(self._vocab[gram] for gram in grams)
+            data.extend(grams.values())
+            indptr.append(len(indices))
+
+        n_cols = len(self._vocab)
+        new_rows = sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(self._pending), n_cols),
+        )
+        self._matrix.resize((self._matrix.shape[0], n_cols))
+        self._matrix = sparse.vstack([self._matrix, new_rows], format="csr")
+
+        skills = [skill for skill, _ in self._pending]
+        categories = [self._category_codes.setdefault(s["category"], len(self._category_codes)) for s in skills]
+        self._row_ids = np.concatenate([self._row_ids, np.array([s["id"] for s in skills], dtype=np.int64)])
+        self._category = np.concatenate([self._category, np.array(categories, dtype=np.int32)])
+        self._can_teach = np.concatenate([self._can_teach, np.array([s["can_teach"] for s in skills], dtype=bool)])
+        self._want_learn = np.concatenate([self._want_learn, np.array([s["want_learn"] for s in skills], dtype=bool)])
+        self._pending.clear()
+
+        if abs(self._live - self._idf_docs) > IDF_REBUILD_RATIO * max(self._idf_docs, 1):
+            self._rebuild_weights()
+            return
+
+        # IDF для нових n-грам рахуємо за поточною статистикою, старі значення не чіпаємо
+        old_cols = len(self._idf)
+        self._idf = np.concatenate([self._idf, self._idf_values(np.array(self._df[old_cols:], dtype=np.float32))])
+        self._norms = np.concatenate([self._norms, self._row_norms(new_rows)])
+        self._weighted.resize((self._weighted.shape[0], n_cols))
+        self._weighted = sparse.vstack([self._weighted, new_rows.multiply(self._idf).tocsr()], format="csr")
+
+    def _idf_values(self, df: np.ndarray) -> np.ndarray:
+        return (np.log((1 + self._live) / (1 + df)) + 1).astype(np.float32)
+
+    def _row_norms(self, rows: sparse.csr_matrix) -> np.ndarray:
+        return np.sqrt(rows.multiply(rows) @ (self._idf**2)).astype(np.float32)
+
+    def _rebuild_weights(self) -> None:
+        self._idf = self._idf_values(np.array(self._df, dtype=np.float32))
+        self._idf_docs = self._live
+        self._norms = self._row_norms(self._matrix)
+        self._weighted = self._matrix.multiply(self._idf).tocsr()
+
+    def similar(
+        self, skill_ids: Iterable[int], k: int = 20, min_score: float = 0.3
+    ) -> Dict[int, List[Tuple[str, int, float]]]:
+        """
+        Найбільш схожі навички для кожного з skill_ids.
+
+        Враховуються тільки навички тієї ж категорії з протилежною роллю: teacher -
+        інший може навчити того, що я хочу вивчити; student - інший хоче вивчити те,
+        чого я можу навчити. Результат: {skill_id: [(match_type, other_id, score), ...]}.
+        """
+        self._merge_pending()
+        rows = np.array([self._row_of[skill_id] for skill_id in skill_ids if skill_id in self._row_of], dtype=np.int64)
+        result: Dict[int, List[Tuple[str, int, float]]] = {int(self._row_ids[row]): [] for row in rows}
+        n_rows = self._matrix.shape[0]
+        if not len(rows) or n_rows < 2 or k <= 0:
+            return result
+
+        k = min(k, n_rows - 1)
+        batch_size = max(1, self.max_batch_cells // n_rows)
+        live = self._row_ids >= 0
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            # W @ Q.T: транспонується тільки маленька матриця запитів, а не весь каталог
+            scores = np.ascontiguousarray((self._weighted @ self._weighted[batch].T).toarray().T)
+            denominator = self._norms[batch][:, None] * self._norms[None, :]
+            np.divide(scores, denominator, out=scores, where=denominator > 0)
+
+            teacher = self._want_learn[batch][:, None] & self._can_teach[None, :]
+            student = self._can_teach[batch][:, None] & self._want_learn[None, :] & ~teacher
+            allowed = (teacher | student) & (self._category[batch][:, None] == self._category[None, :]) & live
+            allowed[np.arange(len(batch)), batch] = False
+            scores[~allowed] = -1
+
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for i, row in enumerate(batch):
+                matches = result[int(self._row_ids[row])]
+                for col, score in zip(top[i], top_scores[i]):
+                    if score < 0 or score < min_score:
+                        break
+                    match_type = "teacher" if teacher[i, col] else "student"
+                    matches.append((match_type, int(self._row_ids[col]), round(float(score), 4)))
+
+        return result
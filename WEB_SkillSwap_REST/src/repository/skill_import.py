@@ -0,0 +1,156 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from src.schemas.skills import SkillCreate
+
+# Кількість рядків NDJSON, що валідуються і вставляються за один раз
+IMPORT_BATCH_SIZE = 1000
+# Довший рядок вважається помилкою і не буферизується повністю
+MAX_LINE_BYTES = 64 * 1024
+# Скільки помилок повертається у відповіді; решта тільки рахуються
+MAX_REPORTED_ERRORS = 1000
+
+skill_batch_adapter = TypeAdapter(List[SkillCreate])
+skill_adapter = TypeAdapter(SkillCreate)
+
+
+def _describe(items: List[dict]) -> str:
+    """Коротке повідомлення про помилки валідації одного рядка"""
+    parts = []
+    for item in items:
+        loc = ".".join(str(part) for part in item["loc"])
+        parts.append(f"{loc}: {item['msg']}" if loc else item["msg"])
+    return "; ".join(parts)
+
+
+def _validate_each(lines: List[Tuple[int, bytes]], errors: Dict[int, str]) -> List[dict]:
+    valid = []
+    for number, line in lines:
+        try:
+            valid.append(skill_adapter.validate_json(line).model_dump())
+        except ValidationError as e:
+            errors[number] = _describe(e.errors(include_url=False))
+    return valid
+
+
+def _validate_joined(lines: List[bytes]) -> Optional[List[dict]]:
+    """Валідація рядків одним масивом JSON; None, якщо елементів вийшло не стільки, скільки рядків"""
+    skills = skill_batch_adapter.validate_json(b"[" + b",".join(lines) + b"]")
+    if len(skills) != len(lines):
+        return None
+    return [skill.model_dump() for skill in skills]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line: int = MAX_LINE_BYTES) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Рядки потоку NDJSON як (номер рядка, байти) без порожніх рядків.
+
+    У пам'яті тримається не більше одного недочитаного рядка: рядок, довший
+    за max_line, повертається як b"" (ознака помилки), а його залишок пропускається.
+    """
+    buffer = b""
+    number = 0
+    overflow = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not overflow:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line:
+                        buffer, overflow = b"", True
+                break
+
+            number += 1
+            if overflow:
+                overflow = False
+                yield number, b""
+            else:
+                line = (buffer + chunk[start:end]).strip()
+                buffer = b""
+                if len(line) > max_line:
+                    yield number, b""
+                elif line:
+                    yield number, line
+            start = end + 1
+
+    if overflow:
+        yield number + 1, b""
+    elif buffer.strip():
+        yield number + 1, buffer.strip()
+
+
+def validate_batch(lines: List[Tuple[int, bytes]]) -> Tuple[List[dict], Dict[int, str]]:
+    """
+    Перевірити пакет рядків однією валідацією списку.
+
+    Повертає дані валідних навичок і помилки за номерами рядків. Якщо якийсь
+    рядок - не JSON, пакет перевіряється по рядку, щоб помилка не зачепила інші.
+    """
+    errors: Dict[int, str] = {}
+    for number, line in lines:
+        if not line:
+            errors[number] = f"рядок довший за {MAX_LINE_BYTES} байт"
+    lines = [(number, line) for number, line in lines if line]
+    if not lines:
+        return [], errors
+
+    # Рядки, що містять кілька значень через кому, зсунули б індекси списку -
+    # тоді кількість елементів не збігається і пакет перевіряється по рядку
+    try:
+        skills = _validate_joined([line for _, line in lines])
+    except ValidationError as e:
+        items = e.errors(include_url=False)
+    else:
+        if skills is not None:
+            return skills, errors
+        return _validate_each(lines, errors), errors
+
+    if not all(item["loc"] and isinstance(item["loc"][0], int) and item["loc"][0] < len(lines) for item in items):
+        return _validate_each(lines, errors), errors
+
+    # Помилки прив'язані до елементів списку - решту пакета приймаємо другим проходом
+    failed = {item["loc"][0] for item in items}
+    valid = [line for index, (_, line) in enumerate(lines) if index not in failed]
+    try:
+        skills = _validate_joined(valid) if valid else []
+    except ValidationError:
+        skills = None
+    if skills is None:
+        return _validate_each(lines, errors), errors
+
+    # Повторно по одному - заради повідомлень про помилки
+    skills += _validate_each([lines[index] for index in sorted(failed)], errors)
+    return skills, errors
+
+
+async def import_skills(catalog, chunks: AsyncIterator[bytes], batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """
+    Імпортувати навички з потоку NDJSON (одна SkillCreate на рядок).
+
+    Рядки обробляються пакетами по batch_size: пакет валідується разом і
+    вставляється в БД одним INSERT, тож пам'ять не залежить від розміру потоку.
+    Невалідні рядки не зупиняють імпорт, а потрапляють у список помилок.
+    """
+    result = {"created": 0, "failed": 0, "errors": []}
+
+    async def process(batch: List[Tuple[int, bytes]]) -> None:
+        items, errors = validate_batch(batch)
+        await catalog.create_many(items)
+        result["created"] += len(items)
+        result["failed"] += len(errors)
+        for number in sorted(errors):
+            if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                result["errors"].append({"line": number, "error": errors[number]})
+
+    batch: List[Tuple[int, bytes]] = []
+    async for number, line in iter_lines(chunks):
+        batch.append((number, line))
+        if len(batch) >= batch_size:
+            await process(batch)
+            batch = []
+    if batch:
+        await process(batch)
+    return result
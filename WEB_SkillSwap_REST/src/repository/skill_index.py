@@ -0,0 +1,369 @@
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Мінімальна довжина запиту, для якої можна використати триграмний індекс
+NGRAM_SIZE = 3
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Множина триграм рядка (у нижньому регістрі)."""
+    text = text.lower()
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def relevance(skill: dict, query: str) -> int:
+    """
+    Оцінка релевантності навички для пошукового запиту (query у нижньому регістрі).
+
+    3 - назва повністю збігається, 2 - назва починається із запиту,
+    1 - запит є в назві, 0 - запит знайдено тільки в описі.
+    """
+    title = skill["title"].lower()
+    if title == query:
+        return 3
+    if title.startswith(query):
+        return 2
+    if query in title:
+        return 1
+    return 0
+
+
+def _frozen_postings(grams: List[str], offsets: np.ndarray, ids: np.ndarray) -> "_Postings":
+    postings = _Postings()
+    bounds = offsets.tolist()
+    postings._frozen = dict(zip(grams, zip(bounds, bounds[1:])))
+    postings._frozen_ids = ids
+    return postings
+
+
+class _Postings(dict):
+    """
+    Словник триграма -> множина ID.
+
+    У знімок каталогу списки ID пишуться одним масивом. Після відновлення масив лежить
+    у відображеному файлі, а множина для триграми будується лише при першому пошуку по ній;
+    додавання і видалення до того часу накопичуються окремо і застосовуються при побудові.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._frozen: Dict[str, Tuple[int, int]] = {}
+        self._frozen_ids = np.zeros(0, dtype=np.int64)
+        # триграма -> {ID: True - додано, False - видалено}
+        self._changes: Dict[str, Dict[int, bool]] = {}
+
+    def __missing__(self, gram: str) -> Set[int]:
+        start, end = self._frozen.pop(gram, (0, 0))
+        ids = set(self._frozen_ids[start:end].tolist())
+        for skill_id, added in self._changes.pop(gram, {}).items():
+            if added:
+                ids.add(skill_id)
+            else:
+                ids.discard(skill_id)
+        self[gram] = ids
+        return ids
+
+    def get(self, gram: str, default=None):
+        if gram in self or gram in self._frozen:
+            return self[gram]
+        return default
+
+    def add_id(self, gram: str, skill_id: int) -> None:
+        if gram in self._frozen:
+            self._changes.setdefault(gram, {})[skill_id] = True
+        else:
+            self[gram].add(skill_id)
+
+    def discard_id(self, gram: str, skill_id: int) -> None:
+        if gram in self._frozen:
+            self._changes.setdefault(gram, {})[skill_id] = False
+            return
+        ids = dict.get(self, gram)
+        if ids is None:
+            return
+        ids.discard(skill_id)
+        if not ids:
+            del self[gram]
+
+    def clear(self) -> None:
+        super().clear()
+        self._frozen = {}
+        self._frozen_ids = np.zeros(0, dtype=np.int64)
+        self._changes = {}
+
+    def __reduce__(self):
+        for gram in list(self._changes):
+            self[gram]
+
+        grams, chunks = [], []
+        for gram, ids in self.items():
+            grams.append(gram)
+            chunks.append(np.fromiter(ids, dtype=np.int64, count=len(ids)))
+        for gram, (start, end) in self._frozen.items():
+            grams.append(gram)
+            chunks.append(self._frozen_ids[start:end])
+
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in chunks], out=offsets[1:])
+        ids = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+        return _frozen_postings, (grams, offsets, ids)
+
+
+class SkillSearchIndex:
+    """
+    Інвертований триграмний індекс по назвах та описах навичок.
+
+    Для кожної триграми зберігається множина ID навичок, у назві або описі яких вона є.
+    Пошук перетинає множини триграм запиту і перевіряє підрядок тільки для кандидатів,
+    тому результат збігається з повним перебором, але не залежить лінійно від розміру каталогу.
+
+    Щоб не тримати в пам'яті триграми кожного документа, при видаленні
+    передаються ті самі назва та опис, з якими навичку було додано.
+    """
+
+    def __init__(self):
+        self._postings = _Postings()
+
+    def add(self, skill_id: int, title: str, description: str) -> None:
+        """Додати навичку до індексу."""
+        for gram in _trigrams(title) | _trigrams(description):
+            self._postings.add_id(gram, skill_id)
+
+    def remove(self, skill_id: int, title: str, description: str) -> None:
+        """Видалити навичку з індексу."""
+        for gram in _trigrams(title) | _trigrams(description):
+            self._postings.discard_id(gram, skill_id)
+
+    def clear(self) -> None:
+        self._postings.clear()
+
+    def candidates(self, query: str) -> Optional[Set[int]]:
+        """
+        ID навичок, які можуть містити запит.
+
+        Повертає None, якщо запит коротший за триграму і індекс не може звузити пошук.
+        """
+        grams = _trigrams(query)
+        if not grams:
+            return None
+
+        # Починаємо з найменшої множини, щоб перетин був дешевшим
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def search(self, skills: Dict[int, dict], query: str, ids: Optional[Iterable[int]] = None) -> List[dict]:
+        """
+        Знайти навички, назва або опис яких містить запит.
+
+        Результат відсортований за релевантністю, а в межах однакової релевантності -
+        за датою створення (новіші зверху).
+        """
+        query = query.lower()
+        candidates = self.candidates(query)
+        if candidates is None:
+            candidates = skills.keys() if ids is None else ids
+        elif ids is not None:
+            candidates = candidates.intersection(ids)
+
+        found = []
+        for skill_id in candidates:
+            skill = skills.get(skill_id)
+            if skill is None:
+                continue
+            if query in skill["title"].lower() or query in skill["description"].lower():
+                found.append(skill)
+
+        found.sort(key=lambda s: (relevance(s, query), s["created_at"]), reverse=True)
+        return found
+
+
+class SkillFilterIndex:
+    """
+    Вторинні індекси навичок за значеннями полів-фільтрів.
+
+    Для кожного значення category/level/can_teach/want_learn зберігається множина ID,
+    тож комбінація фільтрів - це перетин множин, а не кілька проходів по каталогу.
+    """
+
+    FIELDS = ("category", "level", "can_teach", "want_learn")
+
+    def __init__(self):
+        self._all: Set[int] = set()
+        self._by_value: Dict[str, Dict[Any, Set[int]]] = {field: defaultdict(set) for field in self.FIELDS}
+
+    def add(self, skill: dict) -> None:
+        """Додати навичку до індексів."""
+        skill_id = skill["id"]
+        self._all.add(skill_id)
+        for field in self.FIELDS:
+            self._by_value[field][skill[field]].add(skill_id)
+
+    def remove(self, skill: dict) -> None:
+        """Видалити навичку з індексів (skill - збережені значення полів)."""
+        skill_id = skill["id"]
+        self._all.discard(skill_id)
+        for field in self.FIELDS:
+            ids = self._by_value[field].get(skill[field])
+            if ids is None:
+                continue
+            ids.discard(skill_id)
+            if not ids:
+                del self._by_value[field][skill[field]]
+
+    def clear(self) -> None:
+        self._all.clear()
+        for values in self._by_value.values():
+            values.clear()
+
+    def select(self, **filters) -> Set[int]:
+        """
+        ID навичок, що відповідають усім фільтрам (None - фільтр не застосовується).
+
+        Без фільтрів повертається внутрішня множина всіх ID - її не можна змінювати.
+        """
+        sets = [self._by_value[field].get(value, set()) for field, value in filters.items() if value is not None]
+        if not sets:
+            return self._all
+
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+
+class SkillOrderIndex:
+    """
+    Ключі навичок (created_at, id), відсортовані за зростанням.
+
+    Нові навички майже завжди додаються в кінець, тому сторінка "новіші зверху"
+    читається з хвоста списку за O(skip + limit) без сортування всього каталогу.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[datetime, int]] = []
+        self._key_by_id: Dict[int, Tuple[datetime, int]] = {}
+
+    def add(self, skill: dict) -> None:
+        key = (skill["created_at"], skill["id"])
+        if not self._keys or key > self._keys[-1]:
+            self._keys.append(key)
+        else:
+            insort(self._keys, key)
+        self._key_by_id[skill["id"]] = key
+
+    def remove(self, skill_id: int) -> None:
+        key = self._key_by_id.pop(skill_id, None)
+        if key is None:
+            return
+        pos = bisect_left(self._keys, key)
+        if pos < len(self._keys) and self._keys[pos] == key:
+            del self._keys[pos]
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._key_by_id.clear()
+
+    def key(self, skill_id: int) -> Optional[Tuple[datetime, int]]:
+        return self._key_by_id.get(skill_id)
+
+    def newest(
+        self,
+        ids: Set[int],
+        skip: int = 0,
+        limit: int = 10,
+        before: Optional[Tuple[datetime, int]] = None,
+    ) -> List[int]:
+        """
+        ID сторінки навичок з множини ids від новіших до старіших.
+
+        before - ключ (created_at, id), після якого продовжується видача (cursor).
+        Для щільних фільтрів хвіст списку проходиться напряму, для рідкісних
+        береться top-k через heap по самих кандидатах.
+        """
+        end = len(self._keys) if before is None else bisect_left(self._keys, before)
+        wanted = skip + limit
+        if wanted <= 0 or end == 0 or not ids:
+            return []
+
+        # Очікувана кількість кроків по хвосту: wanted * end / len(ids)
+        if wanted * end <= 4 * len(ids) * len(ids):
+            page = []
+            for pos in range(end - 1, -1, -1):
+                skill_id = self._keys[pos][1]
+                if skill_id in ids:
+                    page.append(skill_id)
+                    if len(page) == wanted:
+                        break
+            return page[skip:]
+
+        keys = (self._key_by_id[skill_id] for skill_id in ids if skill_id in self._key_by_id)
+        if before is not None:
+            keys = (key for key in keys if key < before)
+        return [skill_id for _, skill_id in heapq.nlargest(wanted, keys)][skip:]
+
+
+class SkillMatchIndex:
+    """
+    Індекс для пошуку збігів: ключ - нормалізовані (назва, категорія).
+
+    Для кожного ключа окремо зберігаються ті, хто може навчити (can_teach),
+    і ті, хто хоче вчитися (want_learn), тож пошук збігів коштує O(кількість збігів).
+    """
+
+    def __init__(self):
+        self._teachers: Dict[Tuple[str, Any], Set[int]] = defaultdict(set)
+        self._learners: Dict[Tuple[str, Any], Set[int]] = defaultdict(set)
+
+    @staticmethod
+    def match_key(skill: dict) -> Tuple[str, Any]:
+        return skill["title"].lower(), skill["category"]
+
+    def add(self, skill: dict) -> None:
+        key = self.match_key(skill)
+        if skill["can_teach"]:
+            self._teachers[key].add(skill["id"])
+        if skill["want_learn"]:
+            self._learners[key].add(skill["id"])
+
+    def remove(self, skill: dict) -> None:
+        key = self.match_key(skill)
+        for buckets in (self._teachers, self._learners):
+            ids = buckets.get(key)
+            if ids is None:
+                continue
+            ids.discard(skill["id"])
+            if not ids:
+                del buckets[key]
+
+    def clear(self) -> None:
+        self._teachers.clear()
+        self._learners.clear()
+
+    def matches(self, skill: dict) -> List[Tuple[str, int]]:
+        """
+        Збіги для навички у вигляді (match_type, skill_id), впорядковані за ID.
+
+        teacher - інший може навчити того, що я хочу вивчити;
+        student - інший хоче вивчити те, чого я можу навчити.
+        """
+        key = self.match_key(skill)
+        teachers: Set[int] = set()
+        if skill["want_learn"]:
+            teachers = self._teachers.get(key, set()) - {skill["id"]}
+
+        students: Set[int] = set()
+        if skill["can_teach"]:
+            students = self._learners.get(key, set()) - teachers - {skill["id"]}
+
+        found = [("teacher", skill_id) for skill_id in teachers]
+        found.extend(("student", skill_id) for skill_id in students)
+        found.sort(key=lambda match: match[1])
+        return found
@@ -0,0 +1,185 @@
+import gc
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+from typing import Iterator, List, Mapping, Optional
+
+from src.repository.skill_store import SkillRecord, from_micros
+
+logger = logging.getLogger(__name__)
+
+# Змінюється разом зі структурою SkillRecord або індексів - старий знімок тоді ігнорується
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b"SKILLSNP"
+# magic, версія, кількість масивів, довжина pickle
+HEADER = struct.Struct("<8sIIQ")
+# Масиви вирівнюються, щоб numpy читав їх з відображеної пам'яті без копіювання
+ALIGNMENT = 64
+
+
+def _padding(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def save_snapshot(path: str, state: dict) -> None:
+    """
+    Записати знімок каталогу (записи та готові індекси) в один файл.
+
+    Об'єкти пишуться pickle (протокол 5), а вміст numpy-масивів - окремими
+    вирівняними блоками після нього. Пишемо в тимчасовий файл і підміняємо
+    атомарно, тож при падінні посеред запису лишається попередній цілий знімок.
+    """
+    buffers: List[pickle.PickleBuffer] = []
+    payload = pickle.dumps(state, protocol=5, buffer_callback=buffers.append)
+    views = [buffer.raw() for buffer in buffers]
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(views), len(payload)))
+        file.write(struct.pack(f"<{len(views)}Q", *(view.nbytes for view in views)))
+        file.write(payload)
+        for view in views:
+            file.write(b"\0" * _padding(file.tell()))
+            file.write(view)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> Optional[dict]:
+    """
+    Відкрити знімок каталогу через mmap.
+
+    numpy-масиви індексів не копіюються, а посилаються на відображений файл
+    (copy-on-write: зміни індексів у пам'яті не потрапляють у файл), тож їхні
+    сторінки читаються з диска тільки при першому зверненні.
+    Повертає None, якщо знімка немає, він пошкоджений або іншої версії.
+    """
+    try:
+        with open(path, "rb") as file:
+            view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.exception("Skill catalog snapshot %s is unreadable, ignoring it", path)
+        return None
+
+    # Збирач сміття під час розбору сотень тисяч нових об'єктів лише повторно обходить
+    # уже створене і сповільнює завантаження в рази. Після завантаження каталог
+    # переноситься в постійне покоління (gc.freeze), щоб повні збирання його не обходили.
+    gc.disable()
+    try:
+        magic, version, count, payload_size = HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            logger.warning("Skill catalog snapshot %s has an unsupported format, ignoring it", path)
+            return None
+
+        sizes = struct.unpack_from(f"<{count}Q", view, HEADER.size)
+        offset = HEADER.size + 8 * count
+        payload = memoryview(view)[offset : offset + payload_size]
+        offset += payload_size
+        buffers = []
+        for size in sizes:
+            offset += _padding(offset)
+            buffers.append(memoryview(view)[offset : offset + size])
+            offset += size
+        if offset > len(view):
+            raise ValueError("snapshot is truncated")
+        state = pickle.loads(payload, buffers=buffers)
+    except Exception:
+        logger.exception("Skill catalog snapshot %s is unreadable, ignoring it", path)
+        return None
+    else:
+        # Лише успішно прочитаний каталог: сміття невдалого розбору має зібратися
+        gc.freeze()
+        return state
+    finally:
+        gc.enable()
+
+
+def _record_to_json(skill: SkillRecord) -> dict:
+    return {
+        "id": skill.id,
+        "title": skill.title,
+        "description": skill.description,
+        "category": skill.category.value,
+        "level": skill.level.value,
+        "can_teach": skill.can_teach,
+        "want_learn": skill.want_learn,
+        "created_us": skill.created_us,
+        "updated_us": skill.updated_us,
+    }
+
+
+def _record_from_json(data: Mapping) -> SkillRecord:
+    fields = {field: data[field] for field in SkillRecord.FIELDS if field in data}
+    return SkillRecord(
+        **fields, created_at=from_micros(data["created_us"]), updated_at=from_micros(data["updated_us"])
+    )
+
+
+class SkillJournal:
+    """
+    Журнал змін каталогу, які ще не записані в БД.
+
+    Кожна зміна дописується рядком JSON (op: create/update/delete). Після вдалого
+    flush журнал переписується і містить лише те, що досі чекає запису, тож після
+    аварійного перезапуску ці зміни відтворюються поверх знімка і не губляться.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _write(self, entry: dict) -> None:
+        file = self._open()
+        file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        file.flush()
+
+    def append(self, op: str, skill: SkillRecord) -> None:
+        self._write({"op": op, "skill": _record_to_json(skill)})
+
+    def append_delete(self, skill_id: int) -> None:
+        self._write({"op": "delete", "id": skill_id})
+
+    def replay(self) -> Iterator[tuple]:
+        """Записи журналу як (op, SkillRecord або ID); обірваний останній рядок пропускається."""
+        try:
+            file = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                    if entry["op"] == "delete":
+                        yield "delete", entry["id"]
+                    else:
+                        yield entry["op"], _record_from_json(entry["skill"])
+                except (ValueError, KeyError):
+                    logger.warning("Skipping broken skill journal entry in %s", self.path)
+
+    def rewrite(self, created, updated, deleted_ids) -> None:
+        """Замінити журнал переліком змін, що ще не записані в БД."""
+        self.close()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            for op, skills in (("create", created), ("update", updated)):
+                for skill in skills:
+                    file.write(json.dumps({"op": op, "skill": _record_to_json(skill)}, ensure_ascii=False) + "\n")
+            for skill_id in deleted_ids:
+                file.write(json.dumps({"op": "delete", "id": skill_id}) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,112 @@
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+
+from src.enum_models import SkillCategory, SkillLevel
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+CATEGORIES = tuple(SkillCategory)
+LEVELS = tuple(SkillLevel)
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+LEVEL_CODES = {level: code for code, level in enumerate(LEVELS)}
+
+# Бітові прапорці поля flags
+CAN_TEACH = 1
+WANT_LEARN = 2
+
+
+def to_micros(value: datetime) -> int:
+    """Дата у мікросекундах від epoch (дата без зони вважається UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+class SkillRecord(Mapping):
+    """
+    Компактний запис навички для каталогу в пам'яті.
+
+    Замість dict з об'єктами datetime зберігає коди enum-ів, упаковані прапорці
+    can_teach/want_learn і час у мікросекундах від epoch. Поля читаються як
+    атрибути або як ключі словника (record["title"]), тож запис можна передати
+    в SkillResponse.model_validate або розпакувати через {**record}.
+    """
+
+    __slots__ = ("id", "title", "description", "category_code", "level_code", "flags", "created_us", "updated_us")
+
+    FIELDS = ("id", "title", "description", "category", "level", "can_teach", "want_learn", "created_at", "updated_at")
+
+    def __init__(self, id, title, description, category, level, can_teach, want_learn, created_at, updated_at):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.category_code = CATEGORY_CODES[SkillCategory(category)]
+        self.level_code = LEVEL_CODES[SkillLevel(level)]
+        self.flags = (CAN_TEACH if can_teach else 0) | (WANT_LEARN if want_learn else 0)
+        self.created_us = to_micros(created_at)
+        self.updated_us = to_micros(updated_at)
+
+    @classmethod
+    def from_dict(cls, skill: Mapping) -> "SkillRecord":
+        return cls(**{field: skill[field] for field in cls.FIELDS})
+
+    @property
+    def category(self) -> SkillCategory:
+        return CATEGORIES[self.category_code]
+
+    @property
+    def level(self) -> SkillLevel:
+        return LEVELS[self.level_code]
+
+    @property
+    def can_teach(self) -> bool:
+        return bool(self.flags & CAN_TEACH)
+
+    @property
+    def want_learn(self) -> bool:
+        return bool(self.flags & WANT_LEARN)
+
+    @property
+    def created_at(self) -> datetime:
+        return from_micros(self.created_us)
+
+    @property
+    def updated_at(self) -> datetime:
+        return from_micros(self.updated_us)
+
+    def __getitem__(self, field: str):
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __reduce__(self):
+        # Для знімка каталогу: компактніше і вдвічі швидше за стандартне збереження __slots__
+        return _restore_record, tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"<SkillRecord(id={self.id}, title={self.title!r})>"
+
+
+def _restore_record(*state) -> SkillRecord:
+    record = object.__new__(SkillRecord)
+    (
+        record.id,
+        record.title,
+        record.description,
+        record.category_code,
+        record.level_code,
+        record.flags,
+        record.created_us,
+        record.updated_us,
+    ) = state
+    return record
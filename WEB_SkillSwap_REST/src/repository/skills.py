@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import delete, exists, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.enum_models import SkillCategory
+from src.models import Exchange, Skill, SkillDeletion
+
+# Скільки зберігаються надгробки видалених навичок; каталог, що не синхронізувався
+# довше, звіряє всі ID
+TOMBSTONE_TTL = timedelta(days=1)
+
+SKILL_COLUMNS = (
+    Skill.id,
+    Skill.title,
+    Skill.description,
+    Skill.category,
+    Skill.level,
+    Skill.can_teach,
+    Skill.want_learn,
+    Skill.created_at,
+    Skill.updated_at,
+)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite повертає дати без часової зони - вважаємо їх UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _skill_to_dict(row) -> dict:
+    """Рядок таблиці skills у формат каталогу навичок"""
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "category": SkillCategory(row.category),
+        "level": row.level,
+        "can_teach": bool(row.can_teach),
+        "want_learn": bool(row.want_learn),
+        "created_at": _as_utc(row.created_at),
+        "updated_at": _as_utc(row.updated_at),
+    }
+
+
+def _skill_to_row(skill: dict) -> dict:
+    """Навичка з каталогу у значення колонок таблиці skills"""
+    return {**skill, "category": skill["category"].value}
+
+
+async def get_skills(db: AsyncSession) -> List[dict]:
+    """Отримати всі навички, впорядковані за датою створення."""
+    result = await db.execute(select(*SKILL_COLUMNS).order_by(Skill.created_at, Skill.id))
+    return [_skill_to_dict(row) for row in result]
+
+
+async def get_skill(db: AsyncSession, skill_id: int) -> Optional[dict]:
+    """Отримати навичку за ID."""
+    result = await db.execute(select(*SKILL_COLUMNS).where(Skill.id == skill_id))
+    row = result.first()
+    return _skill_to_dict(row) if row else None
+
+
+async def get_skills_by_ids(db: AsyncSession, ids: Iterable[int]) -> List[dict]:
+    """Отримати навички за списком ID одним IN-запитом."""
+    result = await db.execute(select(*SKILL_COLUMNS).where(Skill.id.in_(list(ids))))
+    return [_skill_to_dict(row) for row in result]
+
+
+async def get_skills_updated_since(db: AsyncSession, since: datetime) -> List[dict]:
+    """Отримати навички, створені або змінені після вказаного часу."""
+    stmt = select(*SKILL_COLUMNS).where(Skill.updated_at >= since).order_by(Skill.created_at, Skill.id)
+    result = await db.execute(stmt)
+    return [_skill_to_dict(row) for row in result]
+
+
+async def get_skills_deleted_since(db: AsyncSession, since: datetime) -> Set[int]:
+    """Отримати ID навичок, видалених після вказаного часу (з надгробків)."""
+    result = await db.scalars(select(SkillDeletion.skill_id).where(SkillDeletion.deleted_at >= since))
+    return set(result.all())
+
+
+async def get_skill_ids(db: AsyncSession, ids: Optional[Iterable[int]] = None) -> Set[int]:
+    """Отримати ID всіх навичок (або тих з ids, що є в таблиці)."""
+    stmt = select(Skill.id)
+    if ids is not None:
+        stmt = stmt.where(Skill.id.in_(list(ids)))
+    result = await db.scalars(stmt)
+    return set(result.all())
+
+
+async def skill_has_exchanges(db: AsyncSession, skill_id: int) -> bool:
+    """Чи є обміни з цією навичкою (FOREIGN KEY не дасть її видалити)."""
+    return await db.scalar(select(exists().where(Exchange.skill_id == skill_id)))
+
+
+async def get_max_skill_id(db: AsyncSession) -> int:
+    """Найбільший ID навички (0 для порожньої таблиці)."""
+    return await db.scalar(select(func.coalesce(func.max(Skill.id), 0)))
+
+
+async def insert_skills(db: AsyncSession, skills: List[dict]) -> None:
+    """Вставити пакет нових навичок одним INSERT."""
+    await db.execute(insert(Skill), [_skill_to_row(skill) for skill in skills])
+    await db.commit()
+
+
+async def save_skills(db: AsyncSession, created: List[dict], updated: List[dict], deleted_ids: List[int]) -> None:
+    """Записати пакет змін каталогу однією транзакцією."""
+    if created:
+        await db.execute(insert(Skill), [_skill_to_row(skill) for skill in created])
+    if updated:
+        await db.execute(update(Skill), [_skill_to_row(skill) for skill in updated])
+    if deleted_ids:
+        result = await db.execute(delete(Skill).where(Skill.id.in_(deleted_ids)).returning(Skill.id))
+        now = datetime.now(timezone.utc)
+        # Надгробок лише для справді видалених рядків: навичку міг уже видалити інший воркер
+        removed = [{"skill_id": skill_id, "deleted_at": now} for skill_id in result.scalars()]
+        if removed:
+            await db.execute(insert(SkillDeletion), removed)
+        await db.execute(delete(SkillDeletion).where(SkillDeletion.deleted_at < now - TOMBSTONE_TTL))
+    await db.commit()
@@ -1,60 +1,136 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import Row, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
-from src.models import User
+from src.models import Skill, User
+from src.models.loading import USER_WITH_SKILLS
+from src.repository.entity_cache import entity_cache
 from src.schemas import UserCreate, UserUpdate
 
-
-async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
-    """Отримати список користувачів з пагінацією."""
-    stmt = select(User).offset(skip).limit(limit)
-    result = await db.scalars(stmt)
+# Колонки, потрібні для UserResponse - списки не створюють ORM-об'єктів
+USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.full_name,
+    User.bio,
+    User.avatar_url,
+    User.phone,
+    User.location,
+    User.is_active,
+)
+
+
+def _conflict_message(error: IntegrityError) -> str:
+    """Повідомлення про порушення унікальності email або username"""
+    # SQLite: "UNIQUE constraint failed: users.email", PostgreSQL: '... constraint "ix_users_email"'
+    if "email" in str(error.orig):
+        return "Email вже зареєстрований"
+    if "username" in str(error.orig):
+        return "Username вже зайнятий"
+    raise error
+
+
+def _cache_user(user: Optional[Row], generation: int) -> None:
+    if user is not None:
+        keys = {"id": user.id, "email": user.email, "username": user.username}
+        entity_cache.put("User", user, keys, generation)
+
+
+async def _get_cached_user(db: AsyncSession, key_name: str, key_value) -> Optional[Row]:
+    """Користувач за id/email/username: з кешу сутностей, а за промаху - з БД."""
+    user = entity_cache.get("User", key_name, key_value)
+    if user is None:
+        generation = entity_cache.generation("User")
+        column = getattr(User, key_name)
+        result = await db.execute(select(*USER_RESPONSE_COLUMNS).where(column == key_value))
+        user = result.first()
+        _cache_user(user, generation)
+    return user
+
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Row]:
+    """
+    Отримати список користувачів з пагінацією (лише колонки UserResponse).
+
+    after_id - ID останнього користувача попередньої сторінки: сторінка береться
+    по первинному ключу без перегляду пропущених рядків, як при offset.
+    """
+    stmt = select(*USER_RESPONSE_COLUMNS).order_by(User.id).offset(skip).limit(limit)
+    if after_id is not None:
+        stmt = stmt.where(User.id > after_id)
+    result = await db.execute(stmt)
     return result.all()
 
 
-# -======================================
-
-
-async def get_user(db: Session, user_id: int) -> Optional[User]:
+async def get_user(db: AsyncSession, user_id: int) -> Optional[Row]:
     """Отримати користувача за його ID."""
-    return db.query(User).filter(User.id == user_id).first()
-
-
-async def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return await _get_cached_user(db, "id", user_id)
+
+
+async def get_users_by_ids(db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, Row]:
+    """Отримати користувачів за списком ID: з кешу, а решту - одним IN-запитом."""
+    found = {}
+    missing = []
+    for user_id in user_ids:
+        user = entity_cache.get("User", "id", user_id)
+        if user is not None:
+            found[user_id] = user
+        else:
+            missing.append(user_id)
+
+    if missing:
+        generation = entity_cache.generation("User")
+        result = await db.execute(select(*USER_RESPONSE_COLUMNS).where(User.id.in_(missing)))
+        for user in result:
+            _cache_user(user, generation)
+            found[user.id] = user
+    return found
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[Row]:
     """Отримати користувача за email."""
-    return db.query(User).filter(User.email == email).first()
+    return await _get_cached_user(db, "email", email)
 
 
-async def get_user_by_username(db: Session, username: str) -> Optional[User]:
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[Row]:
     """Отримати користувача за username."""
-    return db.query(User).filter(User.username == username).first()
+    return await _get_cached_user(db, "username", username)
+
 
+async def create_user(db: AsyncSession, user: UserCreate) -> Row:
+    """
+    Створити нового користувача одним INSERT ... RETURNING.
 
-async def create_user(db: Session, user: UserCreate) -> User:
-    """Створити нового користувача."""
-    db_user = User(**user.dict())
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    Унікальність email і username перевіряє БД; при конфлікті - ValueError.
+    """
+    stmt = insert(User).values(**user.model_dump()).returning(*USER_RESPONSE_COLUMNS)
+    try:
+        result = await db.execute(stmt)
+        created = result.one()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise ValueError(_conflict_message(e)) from e
+    return created
 
 
-async def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[User]:
+async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate) -> Optional[Row]:
     """Оновити дані користувача."""
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if db_user:
-        update_data = user_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_user, field, value)
-        db.commit()
-        db.refresh(db_user)
-    return db_user
+    update_data = user_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_user(db, user_id)
+
+    stmt = update(User).where(User.id == user_id).values(**update_data).returning(*USER_RESPONSE_COLUMNS)
+    result = await db.execute(stmt)
+    updated = result.first()
+    await db.commit()
+    return updated
 
 
-async def get_user_skills(db: Session, user_id: int) -> Optional[List]:
+async def get_user_skills(db: AsyncSession, user_id: int) -> Optional[List[Skill]]:
     """Отримати всі навички користувача за ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).options(*USER_WITH_SKILLS).where(User.id == user_id))
     return user.skills if user else None
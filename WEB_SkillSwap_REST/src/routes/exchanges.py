@@ -1,23 +1,59 @@
+import asyncio
+import csv
+import io
 from datetime import datetime
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from typing import AsyncIterator, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json, to_jsonable_python
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from settings import get_db
 from src.repository import exchanges as repository_exchanges
+from src.repository.exchange_events import ExchangeEvent, exchange_events
 from src.schemas.exchange import (
     ExchangeCreate, 
     ExchangeUpdate, 
     ExchangeResponse, 
     ExchangeWithDetailsResponse,
-    ExchangeFilter
+    ExchangeFilter,
+    ExchangeStatusChange
 )
 from src.enum_models import ExchangeStatus
 
 router = APIRouter(prefix="/exchanges", tags=["Exchanges"])
 
+# Максимальна кількість змін статусу в одному запиті PATCH /exchanges/status
+MAX_BULK_STATUS_CHANGES = 1000
+
+# Рядків в одному пакеті серверного курсора при експорті
+EXPORT_BATCH_SIZE = 1000
+# Колонки експорту - поля ExchangeWithDetailsResponse у порядку SELECT
+EXPORT_FIELDS = [column.key for column in repository_exchanges.EXCHANGE_DETAILS_COLUMNS]
+
+# Інтервал коментаря-пінгу SSE (с), щоб проксі не закривали тихе з'єднання
+EVENTS_HEARTBEAT = 15.0
+
+exchange_list_adapter = TypeAdapter(List[ExchangeWithDetailsResponse])
+
+
+def _exchange_response(exchange: ExchangeWithDetailsResponse, status_code: int = 200) -> Response:
+    # Репозиторій уже повертає готові моделі - response_model лише для документації,
+    # повторна валідація FastAPI пропускається, бо повертається Response
+    return Response(exchange.model_dump_json(), status_code=status_code, media_type="application/json")
+
+
+def _exchanges_response(exchanges: List[ExchangeWithDetailsResponse], next_cursor: Optional[str] = None) -> Response:
+    response = Response(exchange_list_adapter.dump_json(exchanges), media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+
 @router.get("/", response_model=List[ExchangeWithDetailsResponse])
-def get_exchanges(
+async def get_exchanges(
     status: Optional[ExchangeStatus] = Query(None),
     sender_id: Optional[int] = Query(None),
     receiver_id: Optional[int] = Query(None),
@@ -28,9 +64,15 @@ def get_exchanges(
     sort_order: str = Query("desc"),
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Отримати обміни з фільтрацією"""
+    """
+    Отримати обміни з фільтрацією.
+
+    Пагінація: **skip**/**limit** або **cursor** із заголовка `X-Next-Cursor`
+    попередньої сторінки (з тими самими фільтрами та сортуванням).
+    """
     filters = ExchangeFilter(
         status=status,
         sender_id=sender_id,
@@ -42,77 +84,98 @@ def get_exchanges(
         sort_order=sort_order
     )
     
-    exchanges = repository_exchanges.get_exchanges_with_filters(db, filters, skip, limit)
-    
-    # Конвертуємо в response з деталями
-    result = []
-    for exchange in exchanges:
-        result.append(ExchangeWithDetailsResponse(
-            id=exchange.id,
-            sender_id=exchange.sender_id,
-            receiver_id=exchange.receiver_id,
-            skill_id=exchange.skill_id,
-            message=exchange.message,
-            hours_proposed=exchange.hours_proposed,
-            status=exchange.status,
-            created_at=exchange.created_at,
-            updated_at=exchange.updated_at,
-            sender_username=exchange.sender.username,
-            receiver_username=exchange.receiver.username,
-            skill_title=exchange.skill.title
-        ))
-    
-    return result
+    try:
+        exchanges = await repository_exchanges.get_exchanges_with_filters(db, filters, skip, limit, cursor)
+    except ValueError as e:
+        # Параметр status перекриває модуль fastapi.status
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = None
+    if exchanges and len(exchanges) == limit:
+        next_cursor = repository_exchanges.exchange_cursor(exchanges[-1], sort_by)
+    return _exchanges_response(exchanges, next_cursor)
+
+
+# Рядки експорту серіалізуються без моделей відповіді: дати в ISO, статус - значенням
+async def _ndjson_chunks(batches: AsyncIterator[List[Row]]) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield b"".join(to_json(dict(zip(EXPORT_FIELDS, row))) + b"\n" for row in rows)
+
+
+async def _csv_chunks(batches: AsyncIterator[List[Row]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in batches:
+        writer.writerows(to_jsonable_python(tuple(row)) for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Порожній експорт - лише заголовок
+        yield buffer.getvalue().encode()
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_exchanges(
+    status: Optional[ExchangeStatus] = Query(None),
+    sender_id: Optional[int] = Query(None),
+    receiver_id: Optional[int] = Query(None),
+    skill_id: Optional[int] = Query(None),
+    from_date: Optional[datetime] = Query(None),
+    to_date: Optional[datetime] = Query(None),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    after_id: Optional[int] = Query(None, description="ID останнього отриманого обміну - продовжити експорт"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Вивантажити всі обміни за фільтром потоком NDJSON або CSV.
+
+    Пам'ять не залежить від кількості рядків: обміни читаються серверним
+    курсором пакетами і одразу віддаються клієнту. Рядки йдуть за зростанням
+    id, тож перерваний експорт продовжується з **after_id**. Діапазони байтів
+    (Range) не підтримуються - тіло не є збереженим файлом.
+    """
+    filters = ExchangeFilter(
+        status=status,
+        sender_id=sender_id,
+        receiver_id=receiver_id,
+        skill_id=skill_id,
+        from_date=from_date,
+        to_date=to_date
+    )
+    batches = repository_exchanges.stream_exchanges(db, filters, after_id, EXPORT_BATCH_SIZE)
+    if export_format == "csv":
+        chunks, media_type = _csv_chunks(batches), "text/csv"
+    else:
+        chunks, media_type = _ndjson_chunks(batches), "application/x-ndjson"
+    headers = {
+        "Content-Disposition": f'attachment; filename="exchanges.{export_format}"',
+        "Accept-Ranges": "none",
+    }
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
 
 @router.get("/{exchange_id}", response_model=ExchangeWithDetailsResponse)
-def get_exchange(exchange_id: int, db: Session = Depends(get_db)):
+async def get_exchange(exchange_id: int, db: AsyncSession = Depends(get_db)):
     """Отримати деталі обміну за ID"""
-    exchange = repository_exchanges.get_exchange(db, exchange_id)
+    exchange = await repository_exchanges.get_exchange_details(db, exchange_id)
     if not exchange:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Обмін з ID {exchange_id} не знайдено"
         )
-    
-    return ExchangeWithDetailsResponse(
-        id=exchange.id,
-        sender_id=exchange.sender_id,
-        receiver_id=exchange.receiver_id,
-        skill_id=exchange.skill_id,
-        message=exchange.message,
-        hours_proposed=exchange.hours_proposed,
-        status=exchange.status,
-        created_at=exchange.created_at,
-        updated_at=exchange.updated_at,
-        sender_username=exchange.sender.username,
-        receiver_username=exchange.receiver.username,
-        skill_title=exchange.skill.title
-    )
+    return _exchange_response(exchange)
 
 @router.post("/", response_model=ExchangeWithDetailsResponse, status_code=status.HTTP_201_CREATED)
-def create_exchange(
+async def create_exchange(
     exchange: ExchangeCreate,
     # TODO: Додати автентифікацію для отримання sender_id
     sender_id: int = 1,  # Тимчасово - замінити на отримання з токена
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Створити новий обмін"""
     try:
-        created_exchange = repository_exchanges.create_exchange(db, exchange, sender_id)
-        return ExchangeWithDetailsResponse(
-            id=created_exchange.id,
-            sender_id=created_exchange.sender_id,
-            receiver_id=created_exchange.receiver_id,
-            skill_id=created_exchange.skill_id,
-            message=created_exchange.message,
-            hours_proposed=created_exchange.hours_proposed,
-            status=created_exchange.status,
-            created_at=created_exchange.created_at,
-            updated_at=created_exchange.updated_at,
-            sender_username=created_exchange.sender.username,
-            receiver_username=created_exchange.receiver.username,
-            skill_title=created_exchange.skill.title
-        )
+        created_exchange = await repository_exchanges.create_exchange(db, exchange, sender_id)
+        return _exchange_response(created_exchange, status.HTTP_201_CREATED)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -120,95 +183,117 @@ def create_exchange(
         )
 
 @router.put("/{exchange_id}", response_model=ExchangeWithDetailsResponse)
-def update_exchange(
+async def update_exchange(
     exchange_id: int,
     exchange_update: ExchangeUpdate,
     # TODO: Додати автентифікацію
     user_id: int = 1,  # Тимчасово
-    db: Session = Depends(get_db)
+    version: Optional[int] = Query(None, description="Очікувана версія обміну"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Оновити обмін"""
+    """Оновити обмін; з **version** - лише якщо його ніхто не змінив (інакше 409)"""
     try:
-        updated_exchange = repository_exchanges.update_exchange(db, exchange_id, exchange_update, user_id)
+        updated_exchange = await repository_exchanges.update_exchange(db, exchange_id, exchange_update, user_id, version)
         if not updated_exchange:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Обмін з ID {exchange_id} не знайдено"
             )
-        
-        return ExchangeWithDetailsResponse(
-            id=updated_exchange.id,
-            sender_id=updated_exchange.sender_id,
-            receiver_id=updated_exchange.receiver_id,
-            skill_id=updated_exchange.skill_id,
-            message=updated_exchange.message,
-            hours_proposed=updated_exchange.hours_proposed,
-            status=updated_exchange.status,
-            created_at=updated_exchange.created_at,
-            updated_at=updated_exchange.updated_at,
-            sender_username=updated_exchange.sender.username,
-            receiver_username=updated_exchange.receiver.username,
-            skill_title=updated_exchange.skill.title
-        )
+        return _exchange_response(updated_exchange)
+    except repository_exchanges.ExchangeConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
+@router.patch("/status")
+async def update_exchange_statuses(
+    changes: List[ExchangeStatusChange],
+    # TODO: Додати автентифікацію
+    user_id: int = 1,  # Тимчасово
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Змінити статуси кількох обмінів одним запитом (для отримувача).
+
+    Зміни застосовуються одним UPDATE: пропускаються обміни, яких немає
+    (not_found), де користувач не отримувач (not_receiver), з недозволеним
+    переходом статусу (invalid_transition) та повтори ID (duplicate).
+    """
+    if len(changes) > MAX_BULK_STATUS_CHANGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Можна передати не більше {MAX_BULK_STATUS_CHANGES} змін"
+        )
+
+    unique_changes = {}
+    duplicates = []
+    for change in changes:
+        if change.exchange_id in unique_changes:
+            duplicates.append(change.exchange_id)
+        else:
+            unique_changes[change.exchange_id] = change.status
+
+    updated, skipped = await repository_exchanges.update_exchange_statuses(db, unique_changes, user_id)
+    return {
+        "updated": [
+            {"id": row.id, "status": row.status, "updated_at": row.updated_at}
+            for row in updated
+        ],
+        "skipped": [
+            {"exchange_id": exchange_id, "reason": reason}
+            for exchange_id, reason in skipped.items()
+        ] + [{"exchange_id": exchange_id, "reason": "duplicate"} for exchange_id in duplicates],
+    }
+
 @router.patch("/{exchange_id}/status", response_model=ExchangeWithDetailsResponse)
-def update_exchange_status(
+async def update_exchange_status(
     exchange_id: int,
     status: ExchangeStatus,
     # TODO: Додати автентифікацію
     user_id: int = 1,  # Тимчасово
-    db: Session = Depends(get_db)
+    version: Optional[int] = Query(None, description="Очікувана версія обміну"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Оновити статус обміну (для отримувача)"""
+    """Оновити статус обміну (для отримувача); недозволений перехід або інша версія - 409"""
     try:
-        updated_exchange = repository_exchanges.update_exchange_status(db, exchange_id, status, user_id)
+        updated_exchange = await repository_exchanges.update_exchange_status(db, exchange_id, status, user_id, version)
         if not updated_exchange:
+            # Параметр status перекриває модуль fastapi.status
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
+                status_code=404,
                 detail=f"Обмін з ID {exchange_id} не знайдено"
             )
-        
-        return ExchangeWithDetailsResponse(
-            id=updated_exchange.id,
-            sender_id=updated_exchange.sender_id,
-            receiver_id=updated_exchange.receiver_id,
-            skill_id=updated_exchange.skill_id,
-            message=updated_exchange.message,
-            hours_proposed=updated_exchange.hours_proposed,
-            status=updated_exchange.status,
-            created_at=updated_exchange.created_at,
-            updated_at=updated_exchange.updated_at,
-            sender_username=updated_exchange.sender.username,
-            receiver_username=updated_exchange.receiver.username,
-            skill_title=updated_exchange.skill.title
-        )
+        return _exchange_response(updated_exchange)
+    except repository_exchanges.ExchangeConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=400,
             detail=str(e)
         )
 
 @router.delete("/{exchange_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_exchange(
+async def delete_exchange(
     exchange_id: int,
     # TODO: Додати автентифікацію
     user_id: int = 1,  # Тимчасово
-    db: Session = Depends(get_db)
+    version: Optional[int] = Query(None, description="Очікувана версія обміну"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Видалити обмін"""
+    """Видалити обмін; з **version** - лише якщо його ніхто не змінив (інакше 409)"""
     try:
-        success = repository_exchanges.delete_exchange(db, exchange_id, user_id)
+        success = await repository_exchanges.delete_exchange(db, exchange_id, user_id, version)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Обмін з ID {exchange_id} не знайдено"
             )
         return None
+    except repository_exchanges.ExchangeConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -216,25 +301,60 @@ def delete_exchange(
         )
 
 @router.get("/user/{user_id}", response_model=List[ExchangeWithDetailsResponse])
-def get_user_exchanges(user_id: int, db: Session = Depends(get_db)):
-    """Отримати всі обміни користувача"""
-    exchanges = repository_exchanges.get_user_exchanges(db, user_id)
-    
-    result = []
-    for exchange in exchanges:
-        result.append(ExchangeWithDetailsResponse(
-            id=exchange.id,
-            sender_id=exchange.sender_id,
-            receiver_id=exchange.receiver_id,
-            skill_id=exchange.skill_id,
-            message=exchange.message,
-            hours_proposed=exchange.hours_proposed,
-            status=exchange.status,
-            created_at=exchange.created_at,
-            updated_at=exchange.updated_at,
-            sender_username=exchange.sender.username,
-            receiver_username=exchange.receiver.username,
-            skill_title=exchange.skill.title
-        ))
-    
-    return result
\ No newline at end of file
+async def get_user_exchanges(
+    user_id: int,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Отримати обміни користувача, новіші першими; наступна сторінка - за cursor з `X-Next-Cursor`"""
+    try:
+        exchanges = await repository_exchanges.get_user_exchanges(db, user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    next_cursor = None
+    if exchanges and len(exchanges) == limit:
+        next_cursor = repository_exchanges.exchange_cursor(exchanges[-1])
+    return _exchanges_response(exchanges, next_cursor)
+
+
+def _sse(event: ExchangeEvent) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event.id, event.type.encode(), event.data)
+
+
+async def _sse_chunks(user_id: int, resync: bool) -> AsyncIterator[bytes]:
+    subscription = exchange_events.subscribe(user_id)
+    try:
+        if resync:
+            # Пропущені під час розриву події не зберігаються - клієнт перечитає стан
+            exchange_events.resync(subscription)
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            yield _sse(event)
+    finally:
+        # Клієнт відключився: StreamingResponse скасовує генератор
+        exchange_events.unsubscribe(subscription)
+
+
+@router.get("/user/{user_id}/events", response_class=StreamingResponse)
+async def exchange_events_stream(
+    user_id: int,
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Потік подій обмінів користувача (Server-Sent Events).
+
+    Події created, updated, status_changed і deleted приходять для обмінів, де
+    користувач відправник або отримувач; data - JSON обміну. Якщо клієнт не
+    встигає читати або перепідключається з `Last-Event-ID`, приходить resync:
+    стан треба перечитати через GET /exchanges/user/{user_id}.
+    """
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(
+        _sse_chunks(user_id, last_event_id is not None), media_type="text/event-stream", headers=headers
+    )
@@ -1,14 +1,69 @@
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from settings import get_db
+from src.pagination import decode_cursor, encode_cursor
+from src.repository import skills as repository_skills
 from src.schemas.skills import (SkillCategory, SkillCreate, SkillLevel,
                                 SkillResponse, SkillUpdate)
-from temp_db import skills_db
+from src.repository.skill_catalog import skill_catalog
+from src.repository.loaders import Loaders, get_loaders
+from src.repository.skill_import import import_skills
 
 router = APIRouter(prefix="/skills", tags=["Skills"])
 
+# Максимальна кількість навичок в одному запиті пакетного пошуку збігів
+MAX_BULK_MATCHES = 100
+
+
+def _compatibility(score: Optional[float]) -> str:
+    """Точний збіг - high, для нечіткого залежить від подібності"""
+    if score is None or score >= 0.8:
+        return "high"
+    if score >= 0.5:
+        return "medium"
+    return "low"
+
+
+def _skill_matches(skill_ids: List[int], mode: str = "exact", limit: int = 20, min_score: float = 0.3) -> List[dict]:
+    """
+    Збіги для навичок: exact - з індексу (назва, категорія),
+    fuzzy - за TF-IDF подібністю n-грам (одним пакетом для всіх skill_ids).
+    """
+    if mode == "fuzzy":
+        similar = skill_catalog.fuzzy_index.similar(skill_ids, limit, min_score)
+    else:
+        similar = {}
+        for skill_id in skill_ids:
+            exact = skill_catalog.match_index.matches(skill_catalog.skills[skill_id])
+            similar[skill_id] = [(match_type, other_id, None) for match_type, other_id in exact]
+
+    results = []
+    for skill_id in skill_ids:
+        matches = []
+        for match_type, other_id, score in similar.get(skill_id, []):
+            match = {
+                "match_type": match_type,
+                "skill": SkillResponse.model_validate(skill_catalog.skills[other_id]),
+                "compatibility": _compatibility(score),
+            }
+            if score is not None:
+                match["score"] = score
+            matches.append(match)
+
+        results.append(
+            {
+                "skill_id": skill_id,
+                "my_skill": skill_catalog.skills[skill_id]["title"],
+                "matches_count": len(matches),
+                "matches": matches,
+            }
+        )
+    return results
+
 
 # CREATE - Створення нової навички
 @router.post("/", response_model=SkillResponse, status_code=201, tags=["Skills"])
@@ -24,23 +79,27 @@ async def create_skill(skill: SkillCreate):
     - **can_teach**: чи можете навчати
     - **want_learn**: чи хочете вивчити
     """
-    global skill_counter
-    skill_counter += 1
-
-    new_skill = {
-        "id": skill_counter,
-        **skill.model_dump(),
-        "created_at": datetime.now(),
-        "updated_at": datetime.now(),
-    }
+    return await skill_catalog.create(skill.model_dump())
 
-    skills_db[skill_counter] = new_skill
-    return new_skill
+
+# CREATE - Масовий імпорт навичок
+@router.post("/bulk", tags=["Skills"])
+async def create_skills_bulk(request: Request):
+    """
+    Імпортувати навички з тіла запиту у форматі NDJSON (Content-Type: application/x-ndjson).
+
+    Кожен рядок - окрема навичка з тими ж полями, що й у POST /skills/.
+    Тіло читається потоком і обробляється пакетами, тож розмір файлу не обмежений.
+    Рядки з помилками пропускаються: у відповіді - кількість створених і
+    відхилених навичок та помилки з номерами рядків (перші 1000).
+    """
+    return await import_skills(skill_catalog, request.stream())
 
 
 # READ - Отримання списку навичок з фільтрацією
 @router.get("/", response_model=List[SkillResponse], tags=["Skills"])
 async def get_skills(
+    response: Response,
     category: Optional[SkillCategory] = None,
     level: Optional[SkillLevel] = None,
     can_teach: Optional[bool] = None,
@@ -48,6 +107,7 @@ async def get_skills(
     search: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
 ):
     """
     Отримати список навичок з можливістю фільтрації.
@@ -58,78 +118,111 @@ async def get_skills(
     - **level**: фільтр за рівнем
     - **can_teach**: показати тільки тих, хто може навчати
     - **want_learn**: показати тільки тих, хто хоче вчитися
-    - **search**: пошук за назвою або описом
-    """
-    filtered_skills = list(skills_db.values())
-
-    if category:
-        filtered_skills = [s for s in filtered_skills if s["category"] == category]
-
-    if level:
-        filtered_skills = [s for s in filtered_skills if s["level"] == level]
+    - **search**: пошук за назвою або описом (результати впорядковані за релевантністю)
 
-    if can_teach is not None:
-        filtered_skills = [s for s in filtered_skills if s["can_teach"] == can_teach]
-
-    if want_learn is not None:
-        filtered_skills = [s for s in filtered_skills if s["want_learn"] == want_learn]
+    Пагінація: **skip**/**limit** або **cursor** із заголовка `X-Next-Cursor` попередньої сторінки.
+    """
+    # Фільтри - це перетин множин ID із вторинних індексів
+    filtered_ids = skill_catalog.filter_index.select(
+        category=category,
+        level=level,
+        can_teach=can_teach,
+        want_learn=want_learn,
+    )
 
     if search:
-        search_lower = search.lower()
-        filtered_skills = [
-            s for s in filtered_skills if search_lower in s["title"].lower() or search_lower in s["description"].lower()
-        ]
-
-    # Сортуємо за датою створення (новіші зверху)
-    filtered_skills.sort(key=lambda x: x["created_at"], reverse=True)
+        if cursor:
+            raise HTTPException(status_code=400, detail="cursor не підтримується разом із search")
+        # Кандидати беремо з триграмного індексу, результати вже впорядковані за релевантністю
+        return skill_catalog.search_index.search(skill_catalog.skills, search, filtered_ids)[skip : skip + limit]
+
+    before = None
+    if cursor:
+        try:
+            created_at, skill_id = decode_cursor(cursor)
+            before = (datetime.fromisoformat(created_at), int(skill_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Некоректний cursor")
+
+    # Новіші зверху: сторінка береться з упорядкованого індексу без сортування каталогу
+    page_ids = skill_catalog.order_index.newest(filtered_ids, skip, limit, before)
+    if page_ids and len(page_ids) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(*skill_catalog.order_index.key(page_ids[-1]))
+
+    return [skill_catalog.skills[skill_id] for skill_id in page_ids]
+
+
+# Пакетний пошук збігів; оголошено до /{skill_id}, щоб "matches" не сприймався як ID
+@router.get("/matches", tags=["Skills"])
+async def find_matches_bulk(
+    ids: List[int] = Query(..., description="ID навичок"),
+    mode: str = Query("exact", pattern="^(exact|fuzzy)$"),
+    limit: int = Query(20, ge=1, le=100),
+    min_score: float = Query(0.3, ge=0, le=1),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """
+    Знайти збіги для кількох навичок одним запитом.
 
-    # Пагінація
-    total = len(filtered_skills)
-    skills_page = filtered_skills[skip : skip + limit]
+    Повертає результати в тому ж форматі, що й /skills/{skill_id}/matches,
+    а також список ID, яких немає в каталозі.
+    """
+    if len(ids) > MAX_BULK_MATCHES:
+        raise HTTPException(status_code=400, detail=f"Можна передати не більше {MAX_BULK_MATCHES} ID")
 
-    return skills_page
+    unique_ids = list(dict.fromkeys(ids))
+    # Навички, яких немає в кеші, дочитуються з БД одним запитом
+    skills = await loaders.skills.load_many(unique_ids)
+    found_ids = [skill_id for skill_id, skill in zip(unique_ids, skills) if skill is not None]
+    return {
+        "results": _skill_matches(found_ids, mode, limit, min_score),
+        "not_found": [skill_id for skill_id, skill in zip(unique_ids, skills) if skill is None],
+    }
 
 
 # READ - Отримання однієї навички
 @router.get("/{skill_id}", response_model=SkillResponse, tags=["Skills"])
 async def get_skill(skill_id: int):
     """Отримати детальну інформацію про навичку за ID"""
-    if skill_id not in skills_db:
+    skill = await skill_catalog.get(skill_id)
+    if skill is None:
         raise HTTPException(status_code=404, detail=f"Навичка з ID {skill_id} не знайдена")
-    return skills_db[skill_id]
+    return skill
 
 
 # UPDATE - Оновлення навички
 @router.put("/{skill_id}", response_model=SkillResponse, tags=["Skills"])
 async def update_skill(skill_id: int, skill_update: SkillUpdate):
     """Оновити існуючу навичку. Всі поля опціональні."""
-    if skill_id not in skills_db:
+    if await skill_catalog.get(skill_id) is None:
         raise HTTPException(status_code=404, detail=f"Навичка з ID {skill_id} не знайдена")
 
-    stored_skill = skills_db[skill_id]
     update_data = skill_update.dict(exclude_unset=True)
-
-    for field, value in update_data.items():
-        stored_skill[field] = value
-
-    stored_skill["updated_at"] = datetime.now()
-    return stored_skill
+    return skill_catalog.update(skill_id, update_data)
 
 
 # DELETE - Видалення навички
 @router.delete("/{skill_id}", status_code=204, tags=["Skills"])
-async def delete_skill(skill_id: int):
-    """Видалити навичку за ID"""
-    if skill_id not in skills_db:
+async def delete_skill(skill_id: int, db: AsyncSession = Depends(get_db)):
+    """Видалити навичку за ID; навичку, на яку посилаються обміни, видалити не можна (409)"""
+    if await skill_catalog.get(skill_id) is None:
         raise HTTPException(status_code=404, detail=f"Навичка з ID {skill_id} не знайдена")
+    # Видалення пишеться в БД у фоні - порушення FOREIGN KEY там уже нікому повернути
+    if await repository_skills.skill_has_exchanges(db, skill_id):
+        raise HTTPException(status_code=409, detail="Навичка використовується в обмінах")
 
-    del skills_db[skill_id]
+    skill_catalog.delete(skill_id)
     return None
 
 
 # автоматичний пошук людей зі спільними інтересами
 @router.get("/{skill_id}/matches", tags=["Skills"])
-async def find_matches(skill_id: int):
+async def find_matches(
+    skill_id: int,
+    mode: str = Query("exact", pattern="^(exact|fuzzy)$"),
+    limit: int = Query(20, ge=1, le=100),
+    min_score: float = Query(0.3, ge=0, le=1),
+):
     """
     Знайти потенційні збіги для обміну навичками.
 
@@ -137,44 +230,13 @@ async def find_matches(skill_id: int):
     Повертає список користувачів, які:
     - Можуть навчити тому, що ви хочете вивчити
     - Хочуть вивчити те, що ви можете навчити
+
+    Режими:
+    - **exact**: та сама назва (без урахування регістру) і категорія
+    - **fuzzy**: схожі назви та описи в тій самій категорії ("Python" і "python programming"),
+      не більше **limit** збігів з подібністю від **min_score**
     """
-    if skill_id not in skills_db:
+    if await skill_catalog.get(skill_id) is None:
         raise HTTPException(status_code=404, detail=f"Навичка з ID {skill_id} не знайдена")
 
-    my_skill = skills_db[skill_id]
-    matches = []
-
-    for other_id, other_skill in skills_db.items():
-        if other_id != skill_id:
-            # Перевіряємо збіги за назвою та категорією
-            same_skill = (
-                my_skill["title"].lower() == other_skill["title"].lower()
-                and my_skill["category"] == other_skill["category"]
-            )
-
-            if same_skill:
-                # Я хочу вчитися, а хтось може навчити
-                if my_skill["want_learn"] and other_skill["can_teach"]:
-                    matches.append(
-                        {
-                            "match_type": "teacher",
-                            "skill": other_skill,
-                            "compatibility": "high",
-                        }
-                    )
-                # Я можу навчити, а хтось хоче вчитися
-                elif my_skill["can_teach"] and other_skill["want_learn"]:
-                    matches.append(
-                        {
-                            "match_type": "student",
-                            "skill": other_skill,
-                            "compatibility": "high",
-                        }
-                    )
-
-    return {
-        "skill_id": skill_id,
-        "my_skill": my_skill["title"],
-        "matches_count": len(matches),
-        "matches": matches,
-    }
+    return _skill_matches([skill_id], mode, limit, min_score)[0]
@@ -1,11 +1,14 @@
 from datetime import datetime, timedelta
 from typing import List
 from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
+from sqlalchemy import func, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from settings import get_db
 from src.models.user_skills import User, Skill, Exchange, ExchangeStatus
+from src.repository.entity_cache import entity_cache
+from src.repository.exchange_counts import exchange_counts_reconciler
+from src.repository.exchange_events import exchange_events
 
 router = APIRouter(prefix="/api/stats", tags=["Statistics"])
 
@@ -38,17 +41,26 @@ async def get_top_skills(db: AsyncSession = Depends(get_db)):
 @router.get("/active-users")
 async def get_active_users(db: AsyncSession = Depends(get_db)):
 
-    stmt = (
-        select(
-            User.username,
-            User.full_name,
-            func.count(Exchange.id).label("total_exchanges")
-        )
-        .select_from(User)
-        .join(Exchange, (User.id == Exchange.sender_id) | (User.id == Exchange.receiver_id))
-        .group_by(User.id, User.username, User.full_name)
-        .order_by(func.count(Exchange.id).desc())
+    # Лічильники по кожній ролі окремо: GROUP BY читає лише індекси (sender_id, ...)
+    # і (receiver_id, ...), замість JOIN по sender_id OR receiver_id. Обмінів із
+    # самим собою create_exchange не допускає, тож кожен обмін рахується раз
+    per_role = union_all(
+        select(Exchange.sender_id.label("user_id"), func.count().label("exchanges"))
+        .group_by(Exchange.sender_id),
+        select(Exchange.receiver_id, func.count())
+        .group_by(Exchange.receiver_id),
+    ).subquery()
+    top = (
+        select(per_role.c.user_id, func.sum(per_role.c.exchanges).label("total_exchanges"))
+        .group_by(per_role.c.user_id)
+        .order_by(func.sum(per_role.c.exchanges).desc())
         .limit(10)
+        .subquery()
+    )
+    stmt = (
+        select(User.username, User.full_name, top.c.total_exchanges)
+        .join(top, top.c.user_id == User.id)
+        .order_by(top.c.total_exchanges.desc())
     )
     
     result = await db.execute(stmt)
@@ -85,4 +97,19 @@ async def get_exchange_success_rate(db: AsyncSession = Depends(get_db)):
         "completed_exchanges": completed,
         "success_rate": round(success_rate, 2),
         "success_percentage": f"{success_rate:.2f}%"
-    }
\ No newline at end of file
+    }
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Лічильники кешу сутностей (влучання, промахи, витіснення)"""
+    return entity_cache.stats()
+
+@router.get("/events")
+async def get_events_stats():
+    """Підписки на події обмінів цього процесу і лічильники розсилки"""
+    return exchange_events.stats()
+
+@router.get("/exchange-counts")
+async def get_exchange_counts_stats():
+    """Фонова звірка лічильників обмінів: запуски і виправлені користувачі"""
+    return exchange_counts_reconciler.stats()
@@ -1,25 +1,77 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from settings import get_db
+from src.pagination import decode_cursor, encode_cursor
 from src.repository import users as repository_users
-from src.schemas import SkillResponse, UserCreate, UserResponse, UserUpdate
+from src.repository.exchange_counts import get_exchange_counts
+from src.repository.loaders import Loaders, get_loaders
+from src.schemas import ExchangeCountsResponse, SkillResponse, UserCreate, UserResponse, UserUpdate
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Максимальна кількість користувачів в одному запиті /users/batch
+MAX_BATCH_USERS = 100
+
 
 @router.get("/", response_model=List[UserResponse])
-async def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Отримати список користувачів."""
-    return await repository_users.get_users(db, skip, limit)
+async def read_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Отримати список користувачів.
+
+    Пагінація: **skip**/**limit** або **cursor** із заголовка `X-Next-Cursor` попередньої сторінки.
+    """
+    after_id = None
+    if cursor:
+        try:
+            (after_id,) = decode_cursor(cursor)
+            after_id = int(after_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некоректний cursor")
+
+    users = await repository_users.get_users(db, skip, limit, after_id)
+    if users and len(users) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(users[-1].id)
+    return users
+
+
+# Оголошено до /{user_id}, щоб "batch" не сприймався як ID
+@router.get("/batch")
+async def read_users_batch(
+    ids: List[int] = Query(..., description="ID користувачів"),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """
+    Отримати кількох користувачів одним запитом (один IN-запит до БД).
+
+    Повертає знайдених користувачів у порядку ids і список ID, яких немає.
+    """
+    if len(ids) > MAX_BATCH_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Можна передати не більше {MAX_BATCH_USERS} ID",
+        )
+
+    unique_ids = list(dict.fromkeys(ids))
+    users = await loaders.users.load_many(unique_ids)
+    return {
+        "users": [UserResponse.model_validate(user) for user in users if user is not None],
+        "not_found": [user_id for user_id, user in zip(unique_ids, users) if user is None],
+    }
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def read_user(user_id: int, db: Session = Depends(get_db)):
+async def read_user(user_id: int, loaders: Loaders = Depends(get_loaders)):
     """Отримати інформацію про користувача."""
-    user = await repository_users.get_user(db, user_id)
+    user = await loaders.users.load(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -29,22 +81,17 @@ async def read_user(user_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Створити нового користувача."""
-
-    # Перевіряємо чи існує користувач з таким email
-    if await repository_users.get_user_by_email(db, email=user.email):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email вже зареєстрований")
-
-    # Перевіряємо чи username зайнятий
-    if await repository_users.get_user_by_username(db, username=user.username):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username вже зайнятий")
-
-    return await repository_users.create_user(db, user)
+    # Зайнятість email і username перевіряє сама БД під час INSERT
+    try:
+        return await repository_users.create_user(db, user)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-async def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db)):
+async def update_user(user_id: int, user_update: UserUpdate, db: AsyncSession = Depends(get_db)):
     """Оновити дані користувача."""
     user = await repository_users.update_user(db, user_id, user_update)
     if not user:
@@ -55,8 +102,24 @@ async def update_user(user_id: int, user_update: UserUpdate, db: Session = Depen
     return user
 
 
+@router.get("/{user_id}/exchange-counts", response_model=ExchangeCountsResponse)
+async def read_user_exchange_counts(user_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Лічильники обмінів користувача для бейджів: вхідні та надіслані pending, прийняті.
+
+    Читається один рядок за первинним ключем - незалежно від кількості обмінів.
+    """
+    counts = await get_exchange_counts(db, user_id)
+    if counts is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Користувача з ID {user_id} не знайдено",
+        )
+    return counts
+
+
 @router.get("/{user_id}/skills", response_model=List[SkillResponse])
-async def read_user_skills(user_id: int, db: Session = Depends(get_db)):
+async def read_user_skills(user_id: int, db: AsyncSession = Depends(get_db)):
     """Отримати всі навички користувача."""
     skills = await repository_users.get_user_skills(db, user_id)
     if skills is None:
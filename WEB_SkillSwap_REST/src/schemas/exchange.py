@@ -16,12 +16,17 @@ class ExchangeUpdate(BaseModel):
     message: Optional[str] = Field(None, min_length=5, max_length=1000)
     hours_proposed: Optional[int] = Field(None, ge=1, le=100)
 
+class ExchangeStatusChange(BaseModel):
+    exchange_id: int = Field(..., description="ID обміну")
+    status: ExchangeStatus = Field(..., description="Новий статус")
+
 class ExchangeResponse(ExchangeBase):
     id: int
     sender_id: int
     receiver_id: int
     skill_id: int
     status: ExchangeStatus
+    version: int
     created_at: datetime
     updated_at: datetime
     
@@ -40,4 +45,12 @@ class ExchangeFilter(BaseModel):
 class ExchangeWithDetailsResponse(ExchangeResponse):
     sender_username: str
     receiver_username: str
-    skill_title: str
\ No newline at end of file
+    skill_title: str
+
+class ExchangeCountsResponse(BaseModel):
+    user_id: int
+    incoming_pending: int = Field(..., description="Вхідні запити, що чекають відповіді")
+    outgoing_pending: int = Field(..., description="Надіслані запити без відповіді")
+    accepted: int = Field(..., description="Прийняті обміни (відправник або отримувач)")
+
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
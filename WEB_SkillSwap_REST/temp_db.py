@@ -1,2 +0,0 @@
-skills_db = {}
-skill_counter = 0